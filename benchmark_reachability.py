@@ -0,0 +1,432 @@
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from csr_graph import CSRGraph, LazyIndex
+from instrumentation import peak_rss
+from root_reachability import RootReachability
+
+# Fractional drop in throughput, or growth in peak RSS, over the baseline
+# that counts as a regression.
+DEFAULT_THRESHOLD = 0.2
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+# Sizes added by --large. They take minutes and gigabytes per case, so they
+# are left out of the default run.
+LARGE_SIZES = (10000000,)
+
+DEFAULT_ENGINES = ("linear", "vectorized", "condensed")
+
+
+def chain_edges(m, rng):
+    """
+    Function to generate a single chain leading to the root, the worst case
+    for recursion depth.
+
+    Parameters
+    ----------
+    m : int
+        Number of edges.
+    rng : random.Random
+        Random number generator. Unused, the chain is fixed.
+
+    Returns
+    -------
+    n : int
+        Number of vertices.
+    sources, targets : array-like
+        Endpoints of the edges.
+    """
+
+    return m + 1, array("q", range(1, m + 1)), array("q", range(m))
+
+
+def cycle_edges(m, rng):
+    """
+    Function to generate a chain of long cycles, each cycle pointing into
+    the previous one, with the root on the first cycle.
+
+    Parameters
+    ----------
+    m : int
+        Approximate number of edges.
+    rng : random.Random
+        Random number generator. Unused, the cycles are fixed.
+
+    Returns
+    -------
+    n : int
+        Number of vertices.
+    sources, targets : array-like
+        Endpoints of the edges.
+    """
+
+    length = max(int(m ** 0.5), 2)
+    count = max(m // (length + 1), 1)
+    sources = array("q")
+    targets = array("q")
+    for c in range(count):
+        first = c * length
+        for i in range(length):
+            sources.append(first + i)
+            targets.append(first + (i + 1) % length)
+        if c:
+            sources.append(first)
+            targets.append(first - length)
+    return count * length, sources, targets
+
+
+def star_edges(m, rng):
+    """
+    Function to generate a star where every vertex points at the root.
+
+    Parameters
+    ----------
+    m : int
+        Number of edges.
+    rng : random.Random
+        Random number generator. Unused, the star is fixed.
+
+    Returns
+    -------
+    n : int
+        Number of vertices.
+    sources, targets : array-like
+        Endpoints of the edges.
+    """
+
+    return m + 1, array("q", range(1, m + 1)), array("q", [0]) * m
+
+
+def random_edges(m, rng):
+    """
+    Function to generate a uniform random sparse graph with three edges per
+    vertex on average.
+
+    Parameters
+    ----------
+    m : int
+        Number of edges.
+    rng : random.Random
+        Random number generator.
+
+    Returns
+    -------
+    n : int
+        Number of vertices.
+    sources, targets : array-like
+        Endpoints of the edges.
+    """
+
+    n = max(m // 3, 2)
+    sources = array("q", (rng.randrange(n) for _ in range(m)))
+    targets = array("q", (rng.randrange(n) for _ in range(m)))
+    return n, sources, targets
+
+
+def power_law_edges(m, rng):
+    """
+    Function to generate a graph whose in-degrees follow a heavy-tailed
+    distribution, so a few hubs receive most of the edges.
+
+    Parameters
+    ----------
+    m : int
+        Number of edges.
+    rng : random.Random
+        Random number generator.
+
+    Returns
+    -------
+    n : int
+        Number of vertices.
+    sources, targets : array-like
+        Endpoints of the edges.
+    """
+
+    n = max(m // 3, 2)
+    sources = array("q", (rng.randrange(n) for _ in range(m)))
+    targets = array("q", (int(n * rng.random() ** 4) for _ in range(m)))
+    return n, sources, targets
+
+
+def many_scc_edges(m, rng):
+    """
+    Function to generate many small strongly connected components, linked
+    by random edges towards lower-numbered components.
+
+    Parameters
+    ----------
+    m : int
+        Approximate number of edges.
+    rng : random.Random
+        Random number generator.
+
+    Returns
+    -------
+    n : int
+        Number of vertices.
+    sources, targets : array-like
+        Endpoints of the edges.
+    """
+
+    size = 4
+    count = max(m // (2 * size), 2)
+    sources = array("q")
+    targets = array("q")
+    for c in range(count):
+        first = c * size
+        for i in range(size):
+            sources.append(first + i)
+            targets.append(first + (i + 1) % size)
+    for _ in range(m - len(sources)):
+        c = rng.randrange(1, count)
+        sources.append(c * size + rng.randrange(size))
+        targets.append(rng.randrange(c) * size + rng.randrange(size))
+    return count * size, sources, targets
+
+
+GENERATORS = {"chain": chain_edges, "cycles": cycle_edges, "star": star_edges,
+              "random": random_edges, "power_law": power_law_edges,
+              "many_scc": many_scc_edges}
+
+
+def build_reachability(family, m, seed=0):
+    """
+    Function to generate a graph and wrap it in a RootReachability object.
+    Vertex ids are the integer positions and the root is vertex 0.
+
+    Parameters
+    ----------
+    family : str
+        Name of the generator.
+    m : int
+        Approximate number of edges.
+    seed : int, default=0
+        Seed of the random number generator.
+
+    Returns
+    -------
+    reachability : RootReachability
+        Object holding the reverse graph.
+
+    Raises
+    ------
+    ValueError
+        If the family is not recognized.
+    """
+
+    if family not in GENERATORS:
+        raise ValueError("Unknown graph family: {}. Allowed families are "
+                         "{}.".format(family, ", ".join(GENERATORS)))
+    n, sources, targets = GENERATORS[family](m, random.Random(seed))
+    ids = range(n)
+    # The reverse graph points from every vertex to its predecessors.
+    graph = CSRGraph.from_edges(ids, targets, sources, LazyIndex(ids, {0: 0}))
+    return RootReachability(input_from_user=False, graph=graph, root=0)
+
+
+def run_case(family, m, engine, repeat=3, seed=0):
+    """
+    Function to time one engine on one generated graph. Meant to be run in a
+    fresh process so that the peak RSS belongs to this case alone.
+
+    Parameters
+    ----------
+    family : str
+        Name of the generator.
+    m : int
+        Approximate number of edges.
+    engine : str
+        Engine passed to get_orphan_nodes.
+    repeat : int, default=3
+        Number of runs. The fastest one is reported.
+    seed : int, default=0
+        Seed of the random number generator.
+
+    Returns
+    -------
+    result : dict
+        Dictionary with the case, its size, the best time in seconds, the
+        throughput in edges per second, and the peak RSS in bytes after
+        building the graph and after running the engine.
+    """
+
+    rr = build_reachability(family, m, seed)
+    graph_rss = peak_rss()
+    best = float("inf")
+    for _ in range(repeat):
+        # Cached work would hide the cost of the engine after the first run.
+        rr.condensation = None
+        start = time.perf_counter()
+        rr.get_orphan_nodes(engine)
+        best = min(best, time.perf_counter() - start)
+    edges = rr.radj.num_edges()
+    return {"family": family, "size": m, "engine": engine,
+            "vertices": len(rr.radj), "edges": edges, "seconds": best,
+            "edges_per_second": edges / best if best else float("inf"),
+            "graph_rss": graph_rss, "peak_rss": peak_rss()}
+
+
+def case_key(result):
+    """
+    Function to get the key identifying a benchmark case.
+
+    Parameters
+    ----------
+    result : dict
+        Result of run_case.
+
+    Returns
+    -------
+    key : str
+        Family, size and engine joined by slashes.
+    """
+
+    return "{}/{}/{}".format(result["family"], result["size"],
+                             result["engine"])
+
+
+def run_suite(families, sizes, engines, repeat=3, seed=0, isolate=True):
+    """
+    Generator to run every combination of family, size and engine.
+
+    Parameters
+    ----------
+    families : array-like
+        Names of the generators.
+    sizes : array-like
+        Approximate numbers of edges.
+    engines : array-like
+        Engines passed to get_orphan_nodes.
+    repeat : int, default=3
+        Number of runs of every case.
+    seed : int, default=0
+        Seed of the random number generator.
+    isolate : bool, default=True
+        Whether to run every case in a new process, so that the peak RSS of
+        one case doesn't carry over to the next.
+
+    Yields
+    ------
+    result : dict
+        Result of run_case.
+    """
+
+    for family in families:
+        for m in sizes:
+            for engine in engines:
+                if not isolate:
+                    yield run_case(family, m, engine, repeat, seed)
+                    continue
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    yield pool.submit(run_case, family, m, engine, repeat,
+                                      seed).result()
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Function to compare results against a baseline.
+
+    Parameters
+    ----------
+    results : array-like
+        List of results of run_case.
+    baseline : dict
+        Dictionary mapping case keys to results of run_case.
+    threshold : float, default=DEFAULT_THRESHOLD
+        Allowed fractional drop in throughput or growth in peak RSS.
+
+    Returns
+    -------
+    regressions : array-like
+        List of messages, one per regression. Cases missing from the
+        baseline are skipped.
+    """
+
+    regressions = []
+    for result in results:
+        key = case_key(result)
+        if key not in baseline:
+            continue
+        old = baseline[key]
+        if result["edges_per_second"] < old["edges_per_second"] * (
+                1 - threshold):
+            regressions.append("{}: throughput {:.0f} edges/s, baseline "
+                               "{:.0f}".format(key, result["edges_per_second"],
+                                               old["edges_per_second"]))
+        if result["peak_rss"] > old["peak_rss"] * (1 + threshold):
+            regressions.append("{}: peak RSS {} bytes, baseline {}".format(
+                key, result["peak_rss"], old["peak_rss"]))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Function to run the benchmark suite from the command line.
+
+    Parameters
+    ----------
+    argv : array-like, default=None
+        Command line arguments. Defaults to sys.argv.
+
+    Returns
+    -------
+    status : int
+        0 if there is no regression, 1 otherwise.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the RootReachability engines on generated "
+                    "graphs.")
+    parser.add_argument("--families", nargs="+", default=list(GENERATORS),
+                        choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=list(DEFAULT_SIZES),
+                        help="Approximate numbers of edges.")
+    parser.add_argument("--large", action="store_true",
+                        help="Also run the sizes in LARGE_SIZES, up to 10M "
+                             "edges.")
+    parser.add_argument("--engines", nargs="+",
+                        default=list(DEFAULT_ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="Baseline JSON file to compare "
+                                           "against.")
+    parser.add_argument("--save-baseline", help="Write the results to this "
+                                                "baseline JSON file.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = []
+    sizes = args.sizes + [m for m in LARGE_SIZES if args.large and
+                          m not in args.sizes]
+    for result in run_suite(args.families, sizes, args.engines,
+                            args.repeat, args.seed):
+        results.append(result)
+        print("{:<32} {:>10.4f} s {:>14.0f} edges/s {:>8.1f} MB".format(
+            case_key(result), result["seconds"], result["edges_per_second"],
+            result["peak_rss"] / 2 ** 20))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({case_key(r): r for r in results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print("REGRESSION", message)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import math
+from functools import lru_cache
+
+# Characters separating the parts of a hydrate, as in CuSO4·5H2O.
+HYDRATE_SEPARATORS = "·•*."
+
+CLOSING = {"(": ")", "[": "]"}
+
+# Number of molar masses kept by molar_mass.
+CACHE_SIZE = 4096
+
+
+def read_count(formula, i):
+    """
+    Function to read an optional count at a position of a formula.
+
+    Parameters
+    ----------
+    formula : str
+        Formula being parsed.
+    i : int
+        Position to read from.
+
+    Returns
+    -------
+    count : int
+        Count read, 1 if there are no digits at the position.
+    i : int
+        Position after the count.
+
+    Raises
+    ------
+    ValueError
+        If the count is zero.
+    """
+
+    j = i
+    while j < len(formula) and formula[j].isdigit():
+        j += 1
+    if j == i:
+        return 1, i
+    count = int(formula[i:j])
+    if count == 0:
+        raise ValueError("Invalid count 0 in formula {}.".format(formula))
+    return count, j
+
+
+def parse_group(formula, i, table):
+    """
+    Function to parse a sequence of elements and bracketed groups, each
+    followed by an optional count, up to the end of the formula. Groups are
+    kept on an explicit stack, so any depth of nesting can be parsed.
+
+    Parameters
+    ----------
+    formula : str
+        Formula being parsed.
+    i : int
+        Position to start from.
+    table : ElementTable
+        Table used to recognize element symbols.
+
+    Returns
+    -------
+    counts : dict
+        Dictionary mapping atomic numbers to numbers of atoms.
+
+    Raises
+    ------
+    ValueError
+        If the formula is invalid.
+    """
+
+    # Counts of every open group, and the bracket closing it.
+    groups = [{}]
+    closing = [None]
+    while i < len(formula):
+        c = formula[i]
+        if c in CLOSING:
+            groups.append({})
+            closing.append(CLOSING[c])
+            i += 1
+            continue
+        if c == closing[-1] and groups[-1]:
+            inner = groups.pop()
+            closing.pop()
+            i += 1
+        elif c.isupper():
+            j = i + 1
+            if j < len(formula) and formula[j].islower():
+                j += 1
+            z = table.codes.get(formula[i:j])
+            if z is None or table.symbols[z] != formula[i:j]:
+                raise ValueError("Invalid element symbol {} in formula "
+                                 "{}.".format(formula[i:j], formula))
+            inner, i = {z: 1}, j
+        else:
+            break
+        count, i = read_count(formula, i)
+        counts = groups[-1]
+        for z, n in inner.items():
+            counts[z] = counts.get(z, 0) + n * count
+
+    if len(groups) > 1 or not groups[0] or i != len(formula):
+        raise ValueError("Couldn't parse formula {}.".format(formula))
+    return groups[0]
+
+
+def parse_formula(formula, table):
+    """
+    Function to count the atoms of every element in a chemical formula.
+    Formulas may contain nested groups in round or square brackets, and
+    hydrate parts with a leading coefficient separated by "·", "•", "*" or
+    ".", as in CuSO4·5H2O.
+
+    Parameters
+    ----------
+    formula : str
+        Chemical formula. Element symbols are case-sensitive.
+    table : ElementTable
+        Table used to recognize element symbols.
+
+    Returns
+    -------
+    counts : dict
+        Dictionary mapping atomic numbers to numbers of atoms.
+
+    Raises
+    ------
+    ValueError
+        If the formula is invalid.
+    """
+
+    parts = [formula.strip()]
+    for separator in HYDRATE_SEPARATORS:
+        parts = [p for part in parts for p in part.split(separator)]
+
+    counts = {}
+    for part in parts:
+        coefficient, i = read_count(part, 0)
+        inner = parse_group(part, i, table)
+        for z, n in inner.items():
+            counts[z] = counts.get(z, 0) + n * coefficient
+    return counts
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def molar_mass(formula, table):
+    """
+    Function to compute the molar mass of a chemical formula. Results are
+    kept in a bounded cache, so repeated formulas cost a single lookup.
+
+    Parameters
+    ----------
+    formula : str
+        Chemical formula.
+    table : ElementTable
+        Table holding the atomic weights.
+
+    Returns
+    -------
+    molar_mass : float
+        Molar mass in grams per mole.
+
+    Raises
+    ------
+    ValueError
+        If the formula is invalid.
+    """
+
+    counts = parse_formula(formula, table)
+    return math.fsum(n * table.weights[z] for z, n in sorted(counts.items()))
+
+
+def prewarm(formulas, table):
+    """
+    Function to compute and cache the molar masses of a catalog of
+    formulas ahead of time.
+
+    Parameters
+    ----------
+    formulas : array-like
+        Chemical formulas.
+    table : ElementTable
+        Table holding the atomic weights.
+
+    Returns
+    -------
+    invalid : array-like
+        List of the formulas that couldn't be parsed.
+    """
+
+    invalid = []
+    for formula in formulas:
+        try:
+            molar_mass(formula, table)
+        except ValueError:
+            invalid.append(formula)
+    return invalid
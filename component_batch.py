@@ -0,0 +1,447 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+from mass_calculator import MassCalculator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Batch file header: magic, version, record size, number of records, number
+# of lists, number of units and length of the formulas in bytes. The records
+# follow the header, then the table of unit factors and the formulas.
+BATCH_MAGIC = b"MASSBTCH"
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct("<8sIIqqqq")
+
+# Every record is an element code, a unit code, a list id and a mass. Element
+# codes are atomic numbers, or codes after the last element for the formulas
+# of the file. The mass comes last so that it stays 8-byte aligned.
+RECORD = struct.Struct("<HHId")
+RECORD_DTYPE = None if np is None else np.dtype(
+    [("element", "<u2"), ("units", "<u2"), ("list", "<u4"),
+     ("mass", "<f8")])
+
+# Every unit factor is the base factor, NaN for moles, and the scale.
+FACTOR = struct.Struct("<dd")
+
+MAX_CODE = 0xFFFF
+MAX_LIST = 0xFFFFFFFF
+
+
+class BatchWriter:
+    """Class to convert lists of components to a batch file, one list at a
+    time. Names and units are validated and encoded as they are added, so
+    reading the file back needs no parsing.
+
+    Attributes
+    ----------
+    path : str
+        Path of the batch file.
+    file : file
+        Binary stream the records are written to.
+    units : dict
+        Dictionary mapping unit spellings to unit codes.
+    factors : array-like
+        List of the base factor, or None for moles, and scale of every unit
+        code.
+    formulas : dict
+        Dictionary mapping formulas to element codes.
+    n_records : int
+        Number of records written.
+    n_lists : int
+        Number of lists written.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor to open a batch file for writing.
+
+        Parameters
+        ----------
+        path : str
+            Path of the batch file.
+        """
+
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(bytes(BATCH_HEADER.size))
+        self.units = {}
+        self.factors = []
+        self.formulas = {}
+        self.n_records = 0
+        self.n_lists = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Don't leave a partial file that would read as a valid batch.
+            self.file.close()
+            os.remove(self.path)
+
+    def encode_name(self, name):
+        """
+        Function to get the element code of a component name.
+
+        Parameters
+        ----------
+        name : str or int
+            Name, symbol or atomic number of the element, or chemical
+            formula.
+
+        Returns
+        -------
+        code : int
+            Atomic number of the element, or code of the formula.
+
+        Raises
+        ------
+        ValueError
+            If the name of the element is invalid.
+            If there are too many distinct formulas.
+        """
+
+        key, _ = MassCalculator.resolve_name(name)
+        if isinstance(key, int):
+            return key
+        code = self.formulas.get(key)
+        if code is None:
+            code = len(MassCalculator.element_table) + 1 + len(self.formulas)
+            if code > MAX_CODE:
+                raise ValueError("Too many distinct formulas for a batch "
+                                 "file.")
+            self.formulas[key] = code
+        return code
+
+    def encode_units(self, units):
+        """
+        Function to get the unit code of a unit spelling.
+
+        Parameters
+        ----------
+        units : str
+            Raw string containing the units of a component.
+
+        Returns
+        -------
+        code : int
+            Index of the unit factors.
+
+        Raises
+        ------
+        ValueError
+            If invalid units are specified.
+        """
+
+        code = self.units.get(units)
+        if code is None:
+            c_units = units.lower()
+            factors = MassCalculator.unit_table.get(c_units) or \
+                MassCalculator.resolve_units(c_units)
+            # Spellings of the same unit share a code.
+            if factors in self.factors:
+                code = self.factors.index(factors)
+            else:
+                code = len(self.factors)
+                self.factors.append(factors)
+            self.units[units] = code
+        return code
+
+    def add(self, components):
+        """
+        Function to validate a list of components and append it to the file.
+        Nothing is written if any component is invalid.
+
+        Parameters
+        ----------
+        components : array-like
+            List of components, in the format of the "components" key of the
+            MassCalculator input.
+
+        Returns
+        -------
+        list_id : int
+            Id of the list.
+
+        Raises
+        ------
+        ValueError
+            If any of the components is underspecified.
+            If the name of an element is invalid.
+            If invalid units are specified.
+            If there are too many lists.
+        Exception
+            If an invalid mass is specified.
+        """
+
+        if self.n_lists > MAX_LIST:
+            raise ValueError("Too many lists for a batch file.")
+        records = []
+        for comp in components:
+            if len(comp) < 3 or "name" not in comp or "mass" not in comp or \
+                    "units" not in comp:
+                raise ValueError("Underspecified component: {}. Please check "
+                                 "input and try again.".format(comp))
+            try:
+                mass = comp["mass"] * 1.0
+            except Exception:
+                raise Exception("Invalid mass specified: {}. Please check "
+                                "element mass and try again.".format(
+                                    str(comp["mass"])))
+            records.append(RECORD.pack(self.encode_name(comp["name"]),
+                                       self.encode_units(comp["units"]),
+                                       self.n_lists, mass))
+        self.file.write(b"".join(records))
+        self.n_records += len(records)
+        self.n_lists += 1
+        return self.n_lists - 1
+
+    def close(self):
+        """
+        Function to write the unit factors, the formulas and the header, and
+        close the file.
+        """
+
+        if self.file.closed:
+            return
+        for base, scale in self.factors:
+            self.file.write(FACTOR.pack(float("nan") if base is None else
+                                        base, scale))
+        formulas = json.dumps(list(self.formulas)).encode("utf-8")
+        self.file.write(formulas)
+        self.file.seek(0)
+        self.file.write(BATCH_HEADER.pack(
+            BATCH_MAGIC, BATCH_VERSION, RECORD.size, self.n_records,
+            self.n_lists, len(self.factors), len(formulas)))
+        self.file.close()
+
+
+def write_batch(component_lists, path):
+    """
+    Function to write lists of components to a batch file. List ids are the
+    positions of the lists.
+
+    Parameters
+    ----------
+    component_lists : array-like
+        List of lists of components, each in the format of the "components"
+        key of the MassCalculator input.
+    path : str
+        Path of the batch file.
+
+    Returns
+    -------
+    count : int
+        Number of lists written.
+
+    Raises
+    ------
+    ValueError
+        If any of the components is invalid.
+    Exception
+        If an invalid mass is specified.
+    """
+
+    with BatchWriter(path) as writer:
+        for components in component_lists:
+            writer.add(components)
+        return writer.n_lists
+
+
+def read_record(data):
+    """
+    Function to get the components of a {"components": [...]} record.
+
+    Parameters
+    ----------
+    data : dict
+        Parsed record. An "id" key is allowed and ignored.
+
+    Returns
+    -------
+    components : array-like
+        List of components.
+
+    Raises
+    ------
+    TypeError
+        If the record is not a dictionary.
+    ValueError
+        If the record is not of the specified format.
+    """
+
+    if not isinstance(data, dict):
+        raise TypeError("Expected input is a dictionary. Please check input "
+                        "and try again.")
+    if "components" not in data or len(set(data) - {"id"}) != 1:
+        raise ValueError("Expected key \"components\" not found in the input "
+                         "dictionary.")
+    return data["components"]
+
+
+def convert_json(infile, path):
+    """
+    Function to convert a JSON document, either one {"components": [...]}
+    record or an array of them, to a batch file.
+
+    Parameters
+    ----------
+    infile : file
+        Text stream with the JSON document.
+    path : str
+        Path of the batch file.
+
+    Returns
+    -------
+    count : int
+        Number of lists written.
+
+    Raises
+    ------
+    ValueError
+        If the document or any of its records is invalid.
+    TypeError
+        If a record is not a dictionary.
+    """
+
+    try:
+        data = json.load(infile)
+    except ValueError:
+        raise ValueError("Couldn't parse input properly. Please check input "
+                         "and try again.")
+    records = data if isinstance(data, list) else [data]
+    return write_batch((read_record(record) for record in records), path)
+
+
+def convert_ndjson(infile, path):
+    """
+    Function to convert an NDJSON stream of {"components": [...]} records to
+    a batch file, one list per non-blank line in input order. Records are
+    converted one at a time, so memory use doesn't depend on the size of the
+    stream.
+
+    Parameters
+    ----------
+    infile : file
+        Text stream with one JSON object per line.
+    path : str
+        Path of the batch file.
+
+    Returns
+    -------
+    count : int
+        Number of lists written.
+
+    Raises
+    ------
+    ValueError
+        If any of the records is invalid, with its line number.
+    """
+
+    with BatchWriter(path) as writer:
+        for number, line in enumerate(infile, 1):
+            if not line.strip():
+                continue
+            try:
+                writer.add(read_record(json.loads(line)))
+            except Exception as e:
+                raise ValueError("Line {}: {}".format(number, e))
+        return writer.n_lists
+
+
+def read_batch(path):
+    """
+    Function to open a batch file. The file is memory-mapped and the records
+    are a numpy view into it, so nothing is copied or parsed.
+
+    Parameters
+    ----------
+    path : str
+        Path of the batch file.
+
+    Returns
+    -------
+    records : numpy.ndarray
+        Structured array of the records, with fields "element", "units",
+        "list" and "mass".
+    factors : numpy.ndarray
+        Array of the base factor, NaN for moles, and the scale of every unit
+        code.
+    formulas : array-like
+        List of the formulas, in order of element code.
+    n_lists : int
+        Number of lists.
+
+    Raises
+    ------
+    ImportError
+        If numpy is not installed.
+    ValueError
+        If the file is not a batch file.
+    """
+
+    if np is None:
+        raise ImportError("numpy is required to read batch files.")
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size < BATCH_HEADER.size:
+            raise ValueError("{} is not a batch file.".format(path))
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, record_size, n_records, n_lists, n_units, \
+        formulas_length = BATCH_HEADER.unpack_from(mapping)
+    pos = BATCH_HEADER.size + n_records * record_size
+    if magic != BATCH_MAGIC or version != BATCH_VERSION or \
+            record_size != RECORD.size or \
+            pos + n_units * FACTOR.size + formulas_length != size:
+        raise ValueError("{} is not a batch file.".format(path))
+
+    records = np.frombuffer(mapping, dtype=RECORD_DTYPE, count=n_records,
+                            offset=BATCH_HEADER.size)
+    factors = np.frombuffer(mapping, dtype="<f8", count=2 * n_units,
+                            offset=pos).reshape(-1, 2)
+    pos += n_units * FACTOR.size
+    formulas = json.loads(mapping[pos:pos + formulas_length].decode("utf-8"))
+    return records, factors, formulas, n_lists
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert {\"components\": [...]} records to a binary "
+                    "batch file, or compute the mass of every list of a "
+                    "batch file.")
+    parser.add_argument("input", help="JSON or NDJSON file, or batch file "
+                                      "with --mass.")
+    parser.add_argument("-o", "--output",
+                        help="Batch file to write. Required unless --mass "
+                             "is given.")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Read one record per line.")
+    parser.add_argument("--mass", action="store_true",
+                        help="Write the mass of every list of the input "
+                             "batch file as one JSON result per line.")
+    args = parser.parse_args()
+
+    if args.mass:
+        mass_g, mass_lb = MassCalculator.calculate_mass_file(args.input)
+        for list_id, (g, lb) in enumerate(zip(mass_g, mass_lb)):
+            sys.stdout.write(json.dumps({"id": list_id,
+                                         "mass_g": "{:.2f}".format(g),
+                                         "mass_lb": "{:.2f}".format(lb)}))
+            sys.stdout.write("\n")
+    elif args.output is None:
+        parser.error("the following arguments are required: -o/--output")
+    else:
+        with open(args.input, encoding="utf-8") as infile:
+            if args.ndjson:
+                convert_ndjson(infile, args.output)
+            else:
+                convert_json(infile, args.output)
@@ -0,0 +1,257 @@
+from array import array
+
+from csr_graph import CSRGraph, LazyIndex
+from instrumentation import add_counters
+
+
+def strongly_connected_components(graph):
+    """
+    Function to find the strongly connected components of a graph with
+    Tarjan's algorithm, using an explicit stack instead of recursion.
+
+    Components are numbered in the order Tarjan's algorithm completes them:
+    if there is a path from component a to a different component b, then b is
+    numbered before a.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+        Graph to condense.
+
+    Returns
+    -------
+    component : array-like
+        Array indexed by vertex position with the component number of every
+        vertex.
+    count : int
+        Number of components.
+    """
+
+    n = len(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    order = array("q", [-1]) * n
+    low = array("q", [0]) * n
+    component = array("q", [-1]) * n
+    on_stack = bytearray(n)
+    stack = []
+    counter = 0
+    count = 0
+
+    for s in range(n):
+        if order[s] != -1:
+            continue
+        order[s] = low[s] = counter
+        counter += 1
+        stack.append(s)
+        on_stack[s] = 1
+        # Every frame holds a vertex and the position of the next edge to
+        # follow.
+        work = [[s, offsets[s]]]
+        while work:
+            frame = work[-1]
+            v, i = frame
+            if i < offsets[v + 1]:
+                frame[1] = i + 1
+                w = targets[i]
+                if order[w] == -1:
+                    order[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append([w, offsets[w]])
+                elif on_stack[w] and order[w] < low[v]:
+                    low[v] = order[w]
+                continue
+
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == order[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = count
+                    if w == v:
+                        break
+                count += 1
+
+    return component, count
+
+
+class ComponentDAG:
+    """Class to hold the condensation of a graph: its strongly connected
+    components and the acyclic graph between them. Reachability questions
+    about the graph can be answered on the usually much smaller component
+    graph and mapped back through the component of every vertex.
+
+    Components are numbered so that every edge of the component graph goes
+    from a higher number to a lower one.
+
+    Attributes
+    ----------
+    graph : CSRGraph
+        Condensed graph.
+    component : array-like
+        Array indexed by vertex position with the component of every vertex.
+    count : int
+        Number of components.
+    member_offsets : array-like
+        Array of length count + 1 with the start of the members of every
+        component in member_vertices.
+    member_vertices : array-like
+        Vertex positions grouped by component.
+    dag : CSRGraph
+        Component graph, without duplicate edges or self-loops. Its ids are
+        the component numbers.
+    order : array-like
+        Component numbers in topological order, so every edge goes from an
+        earlier component to a later one.
+    """
+
+    def __init__(self, graph):
+        """
+        Constructor to condense a graph.
+
+        Parameters
+        ----------
+        graph : CSRGraph
+            Graph to condense.
+        """
+
+        self.graph = graph
+        self.component, self.count = strongly_connected_components(graph)
+        self.member_offsets = array("q", [0]) * (self.count + 1)
+        self.member_vertices = array("q", [0]) * len(graph)
+        self.dag = None
+        self.order = array("q", range(self.count - 1, -1, -1))
+
+        self.group_members()
+        self.build_dag()
+
+    def group_members(self):
+        """
+        Function to group the vertex positions by component with a counting
+        sort.
+        """
+
+        offsets = self.member_offsets
+        for c in self.component:
+            offsets[c + 1] += 1
+        for c in range(self.count):
+            offsets[c + 1] += offsets[c]
+        fill = array("q", offsets)
+        for v, c in enumerate(self.component):
+            self.member_vertices[fill[c]] = v
+            fill[c] += 1
+
+    def build_dag(self):
+        """
+        Function to build the component graph. Every edge of the graph is
+        examined once, and a marker per component drops duplicate edges.
+        """
+
+        component = self.component
+        graph = self.graph
+        seen = array("q", [-1]) * self.count
+        typecode = CSRGraph.typecode(self.count)
+        offsets = array("q", [0])
+        targets = array(typecode)
+        for c in range(self.count):
+            seen[c] = c
+            for v in self.members(c):
+                for w in graph[v]:
+                    d = component[w]
+                    if seen[d] != c:
+                        seen[d] = c
+                        targets.append(d)
+            offsets.append(len(targets))
+        ids = range(self.count)
+        self.dag = CSRGraph(ids, offsets, targets, LazyIndex(ids))
+
+    def members(self, c):
+        """
+        Function to get the vertex positions of a component.
+
+        Parameters
+        ----------
+        c : int
+            Component number.
+
+        Returns
+        -------
+        members : array-like
+            Vertex positions.
+        """
+
+        return self.member_vertices[self.member_offsets[c]:
+                                    self.member_offsets[c + 1]]
+
+    def reachable_components(self, start, counters=None):
+        """
+        Function to mark the components reachable from a component.
+
+        Parameters
+        ----------
+        start : int
+            Component number to start from.
+        counters : dict, default=None
+            Dictionary to add the traversal counters to, as in add_counters.
+            Components and edges of the component graph are counted, and
+            the frontier is the queue of components not expanded yet.
+
+        Returns
+        -------
+        reached : bytearray
+            Flags indexed by component number. Non-zero if the component is
+            reachable.
+        """
+
+        dag = self.dag
+        reached = bytearray(self.count)
+        reached[start] = 1
+        queue = [start]
+        if counters is None:
+            for c in queue:
+                for d in dag[c]:
+                    if not reached[d]:
+                        reached[d] = 1
+                        queue.append(d)
+            return reached
+
+        relaxed = widest = 0
+        for i, c in enumerate(queue):
+            widest = max(widest, len(queue) - i)
+            targets = dag[c]
+            relaxed += len(targets)
+            for d in targets:
+                if not reached[d]:
+                    reached[d] = 1
+                    queue.append(d)
+        add_counters(counters, len(queue), relaxed, widest)
+        return reached
+
+    def reachable_vertices(self, v, counters=None):
+        """
+        Function to mark the vertices of the condensed graph reachable from a
+        vertex, by traversing the component graph.
+
+        Parameters
+        ----------
+        v : int
+            Vertex position to start from.
+        counters : dict, default=None
+            Dictionary to add the traversal counters to, as in
+            reachable_components.
+
+        Returns
+        -------
+        reached : bytearray
+            Flags indexed by vertex position. Non-zero if the vertex is
+            reachable.
+        """
+
+        components = self.reachable_components(self.component[v], counters)
+        return bytearray(components[c] for c in self.component)
@@ -0,0 +1,448 @@
+import mmap
+import os
+import struct
+import tempfile
+import weakref
+from array import array
+from collections.abc import Mapping, Sequence
+
+# Snapshot header: magic, version, target item size, number of vertices,
+# number of edges, root position and size of the id blob.
+SNAPSHOT_MAGIC = b"CSRGRAPH"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sIIqqqq")
+
+
+class PackedIds(Sequence):
+    """Class to read vertex ids on demand from a packed UTF-8 blob, so that a
+    snapshot can be opened without decoding every id.
+
+    Attributes
+    ----------
+    offsets : array-like
+        Array of length V + 1 with the byte offset of every id in blob.
+    blob : memoryview
+        Concatenated UTF-8 encoded ids.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class LazyIndex(Mapping):
+    """Class to map vertex ids to positions, building the full dictionary
+    only when an id that isn't known up front is looked up.
+
+    Attributes
+    ----------
+    ids : array-like
+        List of vertex ids indexed by integer vertex position.
+    known : dict
+        Dictionary of positions known without building the full dictionary,
+        such as the root.
+    full : dict
+        Dictionary mapping every id to its position, or None until needed.
+    """
+
+    def __init__(self, ids, known=None):
+        self.ids = ids
+        self.known = dict(known or {})
+        self.full = None
+
+    def build(self):
+        """
+        Function to build the full dictionary if it doesn't exist yet.
+
+        Returns
+        -------
+        full : dict
+            Dictionary mapping every id to its position.
+        """
+
+        if self.full is None:
+            self.full = {}
+            for i, v in enumerate(self.ids):
+                self.full.setdefault(v, i)
+        return self.full
+
+    def __getitem__(self, v):
+        if v in self.known:
+            return self.known[v]
+        return self.build()[v]
+
+    def __contains__(self, v):
+        return v in self.known or v in self.build()
+
+    def __iter__(self):
+        return iter(self.build())
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class CSRGraph:
+    """Class to store a directed graph in compressed sparse row form, with
+    integer vertex positions.
+
+    The vertices that vertex v points to are
+    targets[offsets[v]:offsets[v + 1]]. Indexing the graph with a vertex
+    position returns that slice, so a CSRGraph can be used wherever a list of
+    adjacency lists is expected.
+
+    Attributes
+    ----------
+    ids : array-like
+        List of vertex ids indexed by integer vertex position.
+    index : dict
+        Dictionary mapping every vertex id to its integer position.
+    offsets : array-like
+        Array of length V + 1 with the start of the targets of every vertex.
+    targets : array-like
+        Array of length E with the vertex positions edges point to.
+    mapping : mmap.mmap
+        Memory map backing the arrays of a loaded snapshot, or None.
+    path : str
+        Path of a snapshot file holding the arrays, or None.
+    """
+
+    def __init__(self, ids, offsets, targets, index=None):
+        """
+        Constructor to wrap existing arrays.
+
+        Parameters
+        ----------
+        ids : array-like
+            List of vertex ids indexed by integer vertex position.
+        offsets : array-like
+            Array of length V + 1 with the start of the targets of every
+            vertex.
+        targets : array-like
+            Array of length E with the vertex positions edges point to.
+        index : dict, default=None
+            Dictionary mapping every vertex id to its integer position. Built
+            from ids if not provided.
+        """
+
+        if index is None:
+            index = {v: i for i, v in enumerate(ids)}
+        self.ids = ids
+        self.index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.mapping = None
+        self.path = None
+
+    @staticmethod
+    def typecode(n):
+        """
+        Function to choose the smallest array typecode able to hold vertex
+        positions.
+
+        Parameters
+        ----------
+        n : int
+            Number of vertices.
+
+        Returns
+        -------
+        typecode : str
+            Typecode for the array module.
+        """
+
+        return "i" if n < 2 ** 31 else "q"
+
+    @classmethod
+    def from_edges(cls, ids, sources, targets, index=None):
+        """
+        Function to build a graph from parallel lists of edge endpoints with
+        a counting sort. Edges keep their relative order.
+
+        Parameters
+        ----------
+        ids : array-like
+            List of vertex ids indexed by integer vertex position.
+        sources : array-like
+            Positions of the vertices the edges start from.
+        targets : array-like
+            Positions of the vertices the edges point to.
+        index : dict, default=None
+            Dictionary mapping every vertex id to its integer position.
+
+        Returns
+        -------
+        graph : CSRGraph
+            New graph.
+        """
+
+        n = len(ids)
+        offsets = array("q", bytes(8 * (n + 1)))
+        for s in sources:
+            offsets[s + 1] += 1
+        for v in range(n):
+            offsets[v + 1] += offsets[v]
+
+        fill = array("q", offsets)
+        packed = array(cls.typecode(n), bytes(array(cls.typecode(n)).itemsize
+                                              * len(targets)))
+        for s, t in zip(sources, targets):
+            packed[fill[s]] = t
+            fill[s] += 1
+        return cls(ids, offsets, packed, index)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, v):
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def num_edges(self):
+        """
+        Function to get the number of edges.
+
+        Returns
+        -------
+        num_edges : int
+            Number of edges.
+        """
+
+        return len(self.targets)
+
+    def edges(self):
+        """
+        Function to iterate over the edges.
+
+        Returns
+        -------
+        edges : iterator
+            Iterator over (from, to) pairs of vertex positions.
+        """
+
+        offsets = self.offsets
+        targets = self.targets
+        for v in range(len(self)):
+            for i in range(offsets[v], offsets[v + 1]):
+                yield v, targets[i]
+
+    def transpose(self):
+        """
+        Function to build the graph with every edge reversed.
+
+        Returns
+        -------
+        graph : CSRGraph
+            New graph sharing the id table.
+        """
+
+        typecode = CSRGraph.typecode(len(self))
+        sources = array(typecode)
+        targets = array(typecode)
+        for v, w in self.edges():
+            sources.append(w)
+            targets.append(v)
+        return CSRGraph.from_edges(self.ids, sources, targets, self.index)
+
+    def has_edge(self, v, w):
+        """
+        Function to check whether there is an edge from v to w.
+
+        Parameters
+        ----------
+        v : int
+            Position of the vertex the edge starts from.
+        w : int
+            Position of the vertex the edge points to.
+
+        Returns
+        -------
+        has_edge : bool
+            True if the edge exists.
+        """
+
+        return w in self[v]
+
+    def numpy_arrays(self):
+        """
+        Function to view the offset and target arrays as numpy arrays without
+        copying them.
+
+        Returns
+        -------
+        offsets : numpy.ndarray
+            Offsets array.
+        targets : numpy.ndarray
+            Targets array.
+        """
+
+        import numpy as np
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        targets = np.frombuffer(self.targets,
+                                dtype=np.dtype(self.item_format()))
+        return offsets, targets
+
+    def item_format(self):
+        """
+        Function to get the format character of the targets array.
+
+        Returns
+        -------
+        format : str
+            Either "i" or "q".
+        """
+
+        if isinstance(self.targets, memoryview):
+            return self.targets.format
+        return self.targets.typecode
+
+    def nbytes(self):
+        """
+        Function to get the memory used by the offset and target arrays.
+
+        Returns
+        -------
+        nbytes : int
+            Number of bytes.
+        """
+
+        return (len(self.offsets) * self.offsets.itemsize +
+                len(self.targets) * self.targets.itemsize)
+
+    def save(self, path, root=None):
+        """
+        Function to write the graph to a binary snapshot that can be opened
+        with load. The layout is the header, the id offsets, the offsets and
+        the targets, padded to 8 bytes, followed by the UTF-8 encoded ids.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+        root : str, default=None
+            Root node stored along with the graph.
+
+        Raises
+        ------
+        ValueError
+            If the root is not a vertex of the graph.
+        """
+
+        root_position = -1
+        if root is not None:
+            if root not in self.index:
+                raise ValueError("Root {} doesn't exist in the input "
+                                 "structure.".format(root))
+            root_position = self.index[root]
+
+        id_offsets = array("q", [0])
+        encoded = []
+        for v in self.ids:
+            data = v.encode("utf-8")
+            encoded.append(data)
+            id_offsets.append(id_offsets[-1] + len(data))
+
+        item_format = self.item_format()
+        with open(path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                struct.calcsize(item_format), len(self), self.num_edges(),
+                root_position, id_offsets[-1]))
+            f.write(id_offsets.tobytes())
+            f.write(bytes(self.offsets))
+            data = bytes(self.targets)
+            f.write(data)
+            f.write(bytes(-len(data) % 8))
+            for data in encoded:
+                f.write(data)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Function to open a snapshot written by save. The file is memory-mapped
+        and the arrays are views into it, so nothing is copied or decoded up
+        front, and processes opening the same snapshot share its pages.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+
+        Returns
+        -------
+        graph : CSRGraph
+            Graph backed by the memory map.
+        root : str
+            Root node, or None if none was stored.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a snapshot.
+        """
+
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        if len(view) < SNAPSHOT_HEADER.size:
+            raise ValueError("{} is not a graph snapshot.".format(path))
+        magic, version, itemsize, n, m, root_position, blob_size = \
+            SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("{} is not a graph snapshot.".format(path))
+
+        pos = SNAPSHOT_HEADER.size
+        id_offsets = view[pos:pos + 8 * (n + 1)].cast("q")
+        pos += 8 * (n + 1)
+        offsets = view[pos:pos + 8 * (n + 1)].cast("q")
+        pos += 8 * (n + 1)
+        targets = view[pos:pos + itemsize * m].cast("i" if itemsize == 4
+                                                     else "q")
+        pos += itemsize * m
+        pos += -pos % 8
+        ids = PackedIds(id_offsets, view[pos:pos + blob_size])
+
+        root = None
+        known = {}
+        if root_position != -1:
+            root = ids[root_position]
+            known[root] = root_position
+        graph = cls(ids, offsets, targets, LazyIndex(ids, known))
+        graph.mapping = mapping
+        graph.path = path
+        return graph, root
+
+    def shared_path(self):
+        """
+        Function to get the path of a snapshot holding the offset and target
+        arrays, so that other processes can map them instead of receiving a
+        copy. Graphs not loaded from a snapshot are written to a temporary
+        file the first time, without their ids, and the file is removed
+        along with the graph.
+
+        Returns
+        -------
+        path : str
+            Path of the snapshot file.
+        """
+
+        if self.path is None:
+            fd, path = tempfile.mkstemp(suffix=".csr")
+            os.close(fd)
+            try:
+                CSRGraph([""] * len(self), self.offsets, self.targets,
+                         {}).save(path)
+            except BaseException:
+                os.remove(path)
+                raise
+            self.path = path
+            weakref.finalize(self, os.remove, path)
+        return self.path
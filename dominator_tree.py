@@ -0,0 +1,336 @@
+class DominatorTree:
+    """Class to answer "which nodes get orphaned if this edge or node is
+    deleted" queries on the graph of a RootReachability object.
+
+    The dominator tree is computed over the reverse graph, rooted at the
+    root. A vertex d dominates a vertex v if every path from v to the root
+    goes through d. Deleting a vertex therefore orphans exactly its dominator
+    subtree. Deleting an edge orphans the dominator subtree of its source
+    vertex if the edge is the only way out of that subtree, and nothing
+    otherwise.
+
+    Attributes
+    ----------
+    reachability : RootReachability
+        Object holding the graph.
+    ids : array-like
+        List of vertex ids indexed by integer vertex position.
+    idom : array-like
+        List of immediate dominator positions indexed by vertex position.
+        -1 for the root and for vertices that cannot reach the root.
+    order : array-like
+        Vertex positions in dominator tree preorder. Every dominator subtree
+        is a contiguous slice.
+    start : array-like
+        Position of every vertex in order. -1 for vertices that cannot reach
+        the root.
+    size : array-like
+        Size of the dominator subtree of every vertex.
+    entry : array-like
+        For every vertex v, the position of the vertex w such that the edge
+        from v to w is the only edge leaving the dominator subtree of v. -1 if
+        there is no such edge.
+    """
+
+    def __init__(self, reachability):
+        """
+        Constructor to build the dominator tree.
+
+        Parameters
+        ----------
+        reachability : RootReachability
+            Object holding the graph. Its reverse graph is used.
+        """
+
+        self.reachability = reachability
+        self.ids = reachability.radj.ids
+
+        self.idom = []
+        self.order = []
+        self.start = []
+        self.size = []
+        self.entry = []
+
+        self.compute_dominators()
+        self.compute_preorder()
+        self.compute_entries()
+
+    def compute_dominators(self):
+        """
+        Function to compute the immediate dominators with the
+        Lengauer-Tarjan algorithm. Both the depth-first numbering and the
+        path compression use explicit stacks.
+        """
+
+        radj = self.reachability.radj
+        n = len(radj)
+        r = self.reachability.vertex_index[self.reachability.root]
+
+        # Depth-first numbering from the root over the reverse edges.
+        # Everything below works on depth-first numbers.
+        dfnum = [-1] * n
+        vertex = []
+        parent = []
+        stack = [(r, -1)]
+        while stack:
+            v, p = stack.pop()
+            if dfnum[v] != -1:
+                continue
+            dfnum[v] = len(vertex)
+            vertex.append(v)
+            parent.append(p)
+            for w in radj[v]:
+                if dfnum[w] == -1:
+                    stack.append((w, dfnum[v]))
+
+        count = len(vertex)
+        pred = [[] for _ in range(count)]
+        for v in vertex:
+            dv = dfnum[v]
+            for w in radj[v]:
+                pred[dfnum[w]].append(dv)
+
+        semi = list(range(count))
+        label = list(range(count))
+        ancestor = [-1] * count
+        idom = [0] * count
+        bucket = [[] for _ in range(count)]
+
+        def evaluate(v):
+            if ancestor[v] == -1:
+                return v
+            # Compress the ancestor path of v, starting from the top.
+            path = []
+            x = v
+            while ancestor[ancestor[x]] != -1:
+                path.append(x)
+                x = ancestor[x]
+            while path:
+                y = path.pop()
+                a = ancestor[y]
+                if semi[label[a]] < semi[label[y]]:
+                    label[y] = label[a]
+                ancestor[y] = ancestor[a]
+            return label[v]
+
+        for w in range(count - 1, 0, -1):
+            for v in pred[w]:
+                u = evaluate(v)
+                if semi[u] < semi[w]:
+                    semi[w] = semi[u]
+            bucket[semi[w]].append(w)
+            p = parent[w]
+            ancestor[w] = p
+            for v in bucket[p]:
+                u = evaluate(v)
+                idom[v] = u if semi[u] < semi[v] else p
+            bucket[p] = []
+
+        for w in range(1, count):
+            if idom[w] != semi[w]:
+                idom[w] = idom[idom[w]]
+
+        self.idom = [-1] * n
+        for w in range(1, count):
+            self.idom[vertex[w]] = vertex[idom[w]]
+
+    def compute_preorder(self):
+        """
+        Function to lay out the dominator tree in preorder and compute the
+        subtree sizes.
+        """
+
+        n = len(self.idom)
+        r = self.reachability.vertex_index[self.reachability.root]
+        children = [[] for _ in range(n)]
+        for v, d in enumerate(self.idom):
+            if d != -1:
+                children[d].append(v)
+
+        self.order = []
+        self.start = [-1] * n
+        stack = [r]
+        while stack:
+            v = stack.pop()
+            self.start[v] = len(self.order)
+            self.order.append(v)
+            stack.extend(children[v])
+
+        self.size = [1] * n
+        for v in reversed(self.order):
+            d = self.idom[v]
+            if d != -1:
+                self.size[d] += self.size[v]
+
+    def dominates(self, d, v):
+        """
+        Function to check whether vertex d dominates vertex v.
+
+        Parameters
+        ----------
+        d : int
+            Position of the candidate dominator.
+        v : int
+            Position of the vertex.
+
+        Returns
+        -------
+        dominates : bool
+            True if every path from v to the root goes through d.
+        """
+
+        s = self.start[d]
+        return s != -1 and s <= self.start[v] < s + self.size[d]
+
+    def compute_entries(self):
+        """
+        Function to find, for every vertex, the only edge leaving its
+        dominator subtree, if there is exactly one. Every edge is examined
+        once.
+        """
+
+        radj = self.reachability.radj
+        n = len(radj)
+        leaving = [0] * n
+        self.entry = [-1] * n
+        for w in self.order:
+            for v in radj[w]:
+                # The edge goes from v to w. It leaves the dominator subtree
+                # of v unless v dominates w.
+                if not self.dominates(v, w):
+                    leaving[v] += 1
+                    self.entry[v] = w
+        for v in range(n):
+            if leaving[v] != 1:
+                self.entry[v] = -1
+
+    def position(self, v):
+        """
+        Function to get the integer position of a vertex.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        position : int
+            Integer vertex position.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist in the graph.
+        """
+
+        if v not in self.reachability.vertex_index:
+            raise ValueError("Vertex {} doesn't exist in the input "
+                             "structure.".format(v))
+        return self.reachability.vertex_index[v]
+
+    def subtree(self, v, include_self=True):
+        """
+        Function to get the ids of the vertices in the dominator subtree of a
+        vertex. Costs the size of the subtree.
+
+        Parameters
+        ----------
+        v : int
+            Position of the vertex.
+        include_self : bool, default=True
+            Whether to include the vertex itself.
+
+        Returns
+        -------
+        vertices : array-like
+            List of vertex ids.
+        """
+
+        s = self.start[v]
+        if s == -1:
+            return []
+        if not include_self:
+            s += 1
+        return [self.ids[w] for w in self.order[s:self.start[v] +
+                                                self.size[v]]]
+
+    def orphans_if_node_deleted(self, node):
+        """
+        Function to get the nodes that would be orphaned if a node were
+        deleted, not counting the node itself or the nodes that are already
+        orphans.
+
+        Parameters
+        ----------
+        node : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        orphan_nodes : array-like
+            List of nodes that would no longer reach the root.
+
+        Raises
+        ------
+        ValueError
+            If the node doesn't exist in the graph or is the root.
+        """
+
+        v = self.position(node)
+        if v == self.reachability.vertex_index[self.reachability.root]:
+            raise ValueError("The root cannot be deleted.")
+        return self.subtree(v, include_self=False)
+
+    def orphans_if_edge_deleted(self, _from, _to):
+        """
+        Function to get the nodes that would be orphaned if an edge were
+        deleted, not counting the nodes that are already orphans.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex the edge starts from.
+        _to : str
+            String denoting the id of the vertex the edge points to.
+
+        Returns
+        -------
+        orphan_nodes : array-like
+            List of nodes that would no longer reach the root.
+
+        Raises
+        ------
+        ValueError
+            If the edge doesn't exist in the graph.
+        """
+
+        v = self.position(_from)
+        w = self.position(_to)
+        if not self.reachability.radj.has_edge(w, v):
+            raise ValueError("Edge from {} to {} doesn't exist in the "
+                             "input structure. Please correct input and "
+                             "try again.".format(_from, _to))
+        if self.entry[v] != w:
+            return []
+        return self.subtree(v)
+
+    def edge_impact_report(self):
+        """
+        Function to compute the number of nodes orphaned by the deletion of
+        every edge in the graph. Takes time linear in the number of edges.
+
+        Returns
+        -------
+        report : array-like
+            List of dictionaries with the keys "from", "to" and "orphaned",
+            one per edge.
+        """
+
+        report = []
+        for w, v in self.reachability.radj.edges():
+            # The reverse edge from w to v is the edge from v to w.
+            orphaned = self.size[v] if self.entry[v] == w else 0
+            report.append({"from": self.ids[v], "to": self.ids[w],
+                           "orphaned": orphaned})
+        return report
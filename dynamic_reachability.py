@@ -0,0 +1,460 @@
+class DynamicReachability:
+    """Class to keep track of the nodes that cannot reach the root node while
+    edges and nodes are inserted and deleted.
+
+    Every vertex that can reach the root keeps a parent, which is a vertex it
+    points to that also reaches the root. The parents form a tree over the
+    reverse graph, rooted at the root. Insertions only extend the tree from
+    the new edge. Deletions that don't cut a tree edge change nothing.
+    Deleting a tree edge first looks for another parent among the out-edges
+    of its source, and only re-examines the subtree that hung below it if
+    there is none.
+
+    Every vertex in the tree also has a depth label, greater than the label
+    of its parent. Labels are only a bound on the tree depth, which is
+    enough to tell that a vertex is not below another one.
+
+    Attributes
+    ----------
+    vertices : dict
+        Dictionary with the vertex ids as keys, in insertion order.
+    out : dict
+        Dictionary containing vertices as keys and a dictionary mapping the
+        vertices they point to to the edge multiplicity as the values.
+    inc : dict
+        Dictionary containing vertices as keys and a dictionary mapping the
+        vertices pointing to them to the edge multiplicity as the values.
+    root : str
+        Root node.
+    parent : dict
+        Dictionary containing every non-root vertex that can reach the root
+        as keys and its parent in the tree as the values.
+    children : dict
+        Dictionary containing vertices as keys and the set of vertices whose
+        parent they are as the values.
+    depth : dict
+        Dictionary containing every vertex that can reach the root as keys
+        and its depth label as the values.
+    orphan_nodes : set
+        Set of nodes that do not have a path to the root.
+    visited : int
+        Number of vertices visited by the last update.
+    """
+
+    def __init__(self, vertices, edges, root):
+        """
+        Constructor to initialize the graph and compute the orphan nodes.
+
+        Parameters
+        ----------
+        vertices : array-like
+            List of vertex ids.
+        edges : array-like
+            List of (from, to) pairs of vertex ids.
+        root : str
+            Root node. Added to the vertices if it is not one of them.
+
+        Raises
+        ------
+        ValueError
+            If an edge refers to a vertex that doesn't exist.
+        """
+
+        self.vertices = {}
+        self.out = {}
+        self.inc = {}
+        self.root = root
+        self.parent = {}
+        self.children = {}
+        self.depth = {root: 0}
+        self.orphan_nodes = set()
+        self.visited = 0
+
+        for v in vertices:
+            self.insert_vertex(v)
+        self.insert_vertex(root)
+        self.orphan_nodes.discard(root)
+
+        for _from, _to in edges:
+            self.check_vertex(_from)
+            self.check_vertex(_to)
+            self.insert_edge(_from, _to)
+
+        self.attach_from([root])
+
+    @classmethod
+    def from_reachability(cls, reachability):
+        """
+        Function to build the structure from the reverse graph of a
+        RootReachability object.
+
+        Parameters
+        ----------
+        reachability : RootReachability
+            Object holding the graph.
+
+        Returns
+        -------
+        dynamic : DynamicReachability
+            New object holding a copy of the graph.
+        """
+
+        radj = reachability.radj
+        ids = radj.ids
+        edges = [(ids[v], ids[w]) for w, v in radj.edges()]
+        return cls(reachability.vertices, edges, reachability.root)
+
+    def check_vertex(self, v):
+        """
+        Function to check that a vertex exists.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist.
+        """
+
+        if v not in self.vertices:
+            raise ValueError("Vertex {} doesn't exist in the "
+                             "structure.".format(v))
+
+    def insert_vertex(self, v):
+        """
+        Function to add an isolated vertex without any further checks.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+        """
+
+        if v in self.vertices:
+            return
+        self.vertices[v] = None
+        self.out[v] = {}
+        self.inc[v] = {}
+        self.children[v] = set()
+        self.orphan_nodes.add(v)
+
+    def insert_edge(self, _from, _to):
+        """
+        Function to add an edge to the edge lists without updating
+        reachability.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex the edge starts from.
+        _to : str
+            String denoting the id of the vertex the edge points to.
+        """
+
+        targets = self.out[_from]
+        targets[_to] = targets.get(_to, 0) + 1
+        sources = self.inc[_to]
+        sources[_from] = sources.get(_from, 0) + 1
+
+    def is_reached(self, v):
+        """
+        Function to check whether a vertex can currently reach the root.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        reached : bool
+            True if the vertex is the root or has a parent.
+        """
+
+        return v == self.root or v in self.parent
+
+    def attach(self, v, p):
+        """
+        Function to make p the parent of v.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+        p : str
+            String denoting the id of the parent vertex.
+        """
+
+        self.parent[v] = p
+        self.children[p].add(v)
+        self.depth[v] = self.depth[p] + 1
+        self.orphan_nodes.discard(v)
+
+    def attach_from(self, queue):
+        """
+        Function to extend the tree over the reverse edges, starting from a
+        list of vertices that already reach the root. Only vertices that
+        don't reach the root yet are visited.
+
+        Parameters
+        ----------
+        queue : array-like
+            List of vertex ids that reach the root. Extended in place.
+        """
+
+        inc = self.inc
+        # The queue grows while we iterate over it.
+        for v in queue:
+            self.visited += 1
+            for u in inc[v]:
+                if not self.is_reached(u):
+                    self.attach(u, v)
+                    queue.append(u)
+
+    def repair(self, tops):
+        """
+        Function to recompute reachability for the subtrees below a list of
+        vertices that have just lost their parent. Vertices of these subtrees
+        are re-attached if they point to a vertex outside them that still
+        reaches the root, directly or through other re-attached vertices.
+        Everything else becomes an orphan.
+
+        Parameters
+        ----------
+        tops : array-like
+            List of vertex ids without a parent.
+        """
+
+        # Collect and detach the affected region.
+        region = list(tops)
+        for v in region:
+            for c in self.children[v]:
+                region.append(c)
+        self.visited += len(region)
+        for v in region:
+            p = self.parent.pop(v, None)
+            if p is not None:
+                self.children[p].discard(v)
+            self.depth.pop(v, None)
+            self.orphan_nodes.add(v)
+
+        queue = []
+        for v in region:
+            for w in self.out[v]:
+                if self.is_reached(w):
+                    self.attach(v, w)
+                    queue.append(v)
+                    break
+        self.attach_from(queue)
+
+    def is_below(self, w, v):
+        """
+        Function to check whether a vertex is in the subtree of another one,
+        by walking up from it while the depth labels are greater.
+
+        Parameters
+        ----------
+        w : str
+            String denoting the id of a vertex in the tree.
+        v : str
+            String denoting the id of the vertex whose subtree is checked.
+
+        Returns
+        -------
+        below : bool
+            True if v is w or one of its ancestors.
+        """
+
+        depth = self.depth
+        d = depth[v]
+        while w != v and w != self.root and depth[w] > d:
+            self.visited += 1
+            w = self.parent[w]
+        return w == v
+
+    def reattach(self, v):
+        """
+        Function to give a vertex that has just lost its parent another one
+        among the vertices it points to, without touching its subtree. A
+        vertex qualifies if it reaches the root and is not below v.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the id of the vertex without a parent.
+
+        Returns
+        -------
+        reattached : bool
+            Whether a new parent was found.
+        """
+
+        depth = self.depth
+        d = depth[v]
+        deeper = []
+        for w in self.out[v]:
+            self.visited += 1
+            if not self.is_reached(w):
+                continue
+            # Vertices below v have greater labels, so a smaller label rules
+            # them out and keeps the labels of the subtree valid.
+            if depth[w] < d:
+                self.parent[v] = w
+                self.children[w].add(v)
+                return True
+            deeper.append(w)
+
+        for w in deeper:
+            if self.is_below(w, v):
+                continue
+            self.attach(v, w)
+            # Push the labels down the subtree, only as far as they need to
+            # grow.
+            queue = [v]
+            for x in queue:
+                for c in self.children[x]:
+                    if depth[c] <= depth[x]:
+                        self.visited += 1
+                        depth[c] = depth[x] + 1
+                        queue.append(c)
+            return True
+        return False
+
+    def add_node(self, v):
+        """
+        Function to add a new vertex. It is an orphan until an edge is added.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Raises
+        ------
+        ValueError
+            If the vertex already exists.
+        """
+
+        if v in self.vertices:
+            raise ValueError("Vertex {} already exists in the "
+                             "structure.".format(v))
+        self.visited = 0
+        self.insert_vertex(v)
+
+    def remove_node(self, v):
+        """
+        Function to delete a vertex along with all of its edges. Only the
+        subtree below the vertex is re-examined.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist or is the root.
+        """
+
+        self.check_vertex(v)
+        if v == self.root:
+            raise ValueError("The root cannot be deleted.")
+
+        self.visited = 0
+        p = self.parent.pop(v, None)
+        if p is not None:
+            self.children[p].discard(v)
+        self.depth.pop(v, None)
+        tops = list(self.children.pop(v))
+        for c in tops:
+            del self.parent[c]
+
+        for w in self.out.pop(v):
+            del self.inc[w][v]
+        for u in self.inc.pop(v):
+            del self.out[u][v]
+        del self.vertices[v]
+        self.orphan_nodes.discard(v)
+
+        self.repair(tops)
+
+    def add_edge(self, _from, _to):
+        """
+        Function to add an edge. Only vertices that can reach the root
+        because of the new edge are visited.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex the edge starts from.
+        _to : str
+            String denoting the id of the vertex the edge points to.
+
+        Raises
+        ------
+        ValueError
+            If either vertex doesn't exist.
+        """
+
+        self.check_vertex(_from)
+        self.check_vertex(_to)
+        self.visited = 0
+        self.insert_edge(_from, _to)
+        if self.is_reached(_to) and not self.is_reached(_from):
+            self.attach(_from, _to)
+            self.attach_from([_from])
+
+    def remove_edge(self, _from, _to):
+        """
+        Function to delete one occurrence of an edge. Unless the edge is the
+        tree edge of its source vertex, nothing else is visited. Otherwise
+        the source is given another parent among its out-edges if possible,
+        and its subtree is only re-examined if there is none.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex the edge starts from.
+        _to : str
+            String denoting the id of the vertex the edge points to.
+
+        Raises
+        ------
+        ValueError
+            If the edge doesn't exist.
+        """
+
+        targets = self.out.get(_from, {})
+        if _to not in targets:
+            raise ValueError("Edge from {} to {} doesn't exist in the "
+                             "structure.".format(_from, _to))
+
+        self.visited = 0
+        targets[_to] -= 1
+        self.inc[_to][_from] -= 1
+        if targets[_to]:
+            return
+        del targets[_to]
+        del self.inc[_to][_from]
+
+        if self.parent.get(_from) == _to:
+            del self.parent[_from]
+            self.children[_to].discard(_from)
+            if not self.reattach(_from):
+                self.repair([_from])
+
+    def get_orphan_nodes(self):
+        """
+        Function to get the list of orphan nodes that cannot reach the root.
+
+        Returns
+        -------
+        orphan_nodes : array-like
+            List of nodes that cannot reach the root, in insertion order.
+        """
+
+        return [v for v in self.vertices if v in self.orphan_nodes]
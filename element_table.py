@@ -0,0 +1,176 @@
+from array import array
+from numbers import Integral
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Element symbols in order of atomic number.
+SYMBOLS = ("H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne", "Na", "Mg",
+           "Al", "Si", "P", "S", "Cl", "Ar", "K", "Ca", "Sc", "Ti", "V", "Cr",
+           "Mn", "Fe", "Co", "Ni", "Cu", "Zn", "Ga", "Ge", "As", "Se", "Br",
+           "Kr", "Rb", "Sr", "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd",
+           "Ag", "Cd", "In", "Sn", "Sb", "Te", "I", "Xe", "Cs", "Ba", "La",
+           "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er",
+           "Tm", "Yb", "Lu", "Hf", "Ta", "W", "Re", "Os", "Ir", "Pt", "Au",
+           "Hg", "Tl", "Pb", "Bi", "Po", "At", "Rn", "Fr", "Ra", "Ac", "Th",
+           "Pa", "U", "Np", "Pu", "Am", "Cm", "Bk", "Cf", "Es", "Fm", "Md",
+           "No", "Lr", "Rf", "Db", "Sg", "Bh", "Hs", "Mt", "Ds", "Rg", "Cn",
+           "Nh", "Fl", "Mc", "Lv", "Ts", "Og")
+
+
+class ElementTable:
+    """Class to look elements up by name, symbol or atomic number and get
+    their atomic weights from a contiguous array.
+
+    Every element is identified by its atomic number, which is used as an
+    index into the weights. Names are matched case-insensitively and
+    ignoring surrounding whitespace, symbols only in their exact case, since
+    "Co" and "CO" mean different things, and numbers either as integers or
+    as strings of digits.
+
+    Attributes
+    ----------
+    names : array-like
+        List of lowercase element names indexed by atomic number. Entry 0 is
+        an empty placeholder.
+    symbols : array-like
+        List of element symbols indexed by atomic number.
+    weights : array-like
+        Array of float64 atomic weights in grams per mole indexed by atomic
+        number. Entry 0 is NaN.
+    codes : dict
+        Dictionary mapping every exact name, symbol and number spelling to
+        its atomic number.
+    """
+
+    def __init__(self, atomic_weights, symbols=SYMBOLS):
+        """
+        Constructor to build the table.
+
+        Parameters
+        ----------
+        atomic_weights : dict
+            Dictionary mapping lowercase element names to atomic weights, in
+            order of atomic number.
+        symbols : array-like, default=SYMBOLS
+            Element symbols in order of atomic number.
+
+        Raises
+        ------
+        ValueError
+            If the number of names and symbols don't match.
+        """
+
+        if len(atomic_weights) != len(symbols):
+            raise ValueError("Expected one symbol per element, got {} "
+                             "symbols for {} elements.".format(
+                                 len(symbols), len(atomic_weights)))
+        self.names = [""] + list(atomic_weights)
+        self.symbols = [""] + list(symbols)
+        self.weights = array("d", [float("nan")])
+        self.weights.extend(float(w) for w in atomic_weights.values())
+
+        self.codes = {}
+        for z in range(1, len(self.names)):
+            self.codes[self.names[z]] = z
+            self.codes[self.symbols[z]] = z
+            self.codes[z] = z
+            self.codes[str(z)] = z
+
+    def __len__(self):
+        return len(self.names) - 1
+
+    def lookup(self, key):
+        """
+        Function to get the atomic number of an element.
+
+        Parameters
+        ----------
+        key : str or int
+            Name, symbol or atomic number of the element. Numbers that aren't
+            integers never denote an element.
+
+        Returns
+        -------
+        z : int
+            Atomic number, or None if the key doesn't denote an element.
+        """
+
+        if not isinstance(key, str):
+            # Floats and booleans hash like the integers they equal, so they
+            # have to be turned away before the dictionary lookup.
+            if isinstance(key, bool) or not isinstance(key, Integral):
+                return None
+            return self.codes.get(int(key))
+        z = self.codes.get(key)
+        if z is None:
+            # Symbols are all capitalized, so lowering the key can only make
+            # it match a name.
+            stripped = key.strip()
+            z = self.codes.get(stripped) or self.codes.get(stripped.lower())
+        return z
+
+    def weight(self, key):
+        """
+        Function to get the atomic weight of an element.
+
+        Parameters
+        ----------
+        key : str or int
+            Name, symbol or atomic number of the element.
+
+        Returns
+        -------
+        weight : float
+            Atomic weight in grams per mole.
+
+        Raises
+        ------
+        ValueError
+            If the key doesn't denote an element.
+        """
+
+        z = self.lookup(key)
+        if z is None:
+            raise ValueError("Invalid element name specified: {}. Please "
+                             "check element name and try again.".format(key))
+        return self.weights[z]
+
+    def lookup_many(self, keys):
+        """
+        Function to get the atomic numbers of many elements.
+
+        Parameters
+        ----------
+        keys : array-like
+            Names, symbols or atomic numbers.
+
+        Returns
+        -------
+        codes : array-like
+            Array of atomic numbers, 0 for keys that don't denote an element.
+        """
+
+        return array("q", (self.lookup(key) or 0 for key in keys))
+
+    def numpy_weights(self):
+        """
+        Function to get the weights as a numpy array sharing memory with the
+        table.
+
+        Returns
+        -------
+        weights : numpy.ndarray
+            Array of float64 atomic weights indexed by atomic number.
+
+        Raises
+        ------
+        ImportError
+            If numpy is not installed.
+        """
+
+        if np is None:
+            raise ImportError("numpy is required for numpy_weights.")
+        return np.frombuffer(self.weights, dtype=np.float64)
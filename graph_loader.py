@@ -0,0 +1,754 @@
+import io
+import json
+import re
+from array import array
+
+from csr_graph import CSRGraph
+from root_reachability import RootReachability
+
+
+class GraphBuilder:
+    """Class to build the reverse graph of a RootReachability object one node
+    and edge at a time, without holding the input document.
+
+    Vertex ids are given integer positions the first time they are seen, so
+    edges may come before the nodes they refer to. Once the input is
+    exhausted, edges that refer to ids which were never declared as nodes
+    are dropped, like RootReachability does.
+
+    Attributes
+    ----------
+    ids : array-like
+        List of vertex ids indexed by integer vertex position.
+    index : dict
+        Dictionary mapping every vertex id seen so far to its position.
+    declared : bytearray
+        Flags indexed by vertex position. Non-zero if the id was declared as
+        a node.
+    nodes : array-like
+        Positions of the declared nodes, in declaration order. The built
+        graph numbers its vertices in this order.
+    sources : array-like
+        Positions of the vertices the edges start from.
+    targets : array-like
+        Positions of the vertices the edges point to.
+    root : str
+        Root node.
+    """
+
+    def __init__(self):
+        """
+        Constructor to initialize an empty graph.
+        """
+
+        self.ids = []
+        self.index = {}
+        self.declared = bytearray()
+        self.nodes = array("q")
+        self.sources = array("q")
+        self.targets = array("q")
+        self.root = None
+
+    def position(self, v):
+        """
+        Function to get the position of a vertex id, giving it a new one if
+        it hasn't been seen yet.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        position : int
+            Integer vertex position.
+        """
+
+        i = self.index.get(v)
+        if i is None:
+            i = len(self.ids)
+            self.index[v] = i
+            self.ids.append(v)
+            self.declared.append(0)
+        return i
+
+    def add_node(self, v):
+        """
+        Function to declare a node.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+        """
+
+        i = self.position(v)
+        if not self.declared[i]:
+            self.declared[i] = 1
+            self.nodes.append(i)
+
+    def add_edge(self, _from, _to):
+        """
+        Function to add an edge.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex the edge starts from.
+        _to : str
+            String denoting the id of the vertex the edge points to.
+        """
+
+        self.sources.append(self.position(_from))
+        self.targets.append(self.position(_to))
+
+    def add_record(self, record):
+        """
+        Function to add a node, an edge or the root from a dictionary in the
+        format used by RootReachability.
+
+        Parameters
+        ----------
+        record : dict
+            Dictionary with either an "id" key, "from" and "to" keys, or a
+            "root" key.
+
+        Raises
+        ------
+        ValueError
+            If the dictionary format is invalid.
+        """
+
+        if not isinstance(record, dict):
+            raise ValueError("Expected record is a dictionary: "
+                             "{}.".format(record))
+        if "id" in record:
+            self.add_node(record["id"])
+        elif "from" in record and "to" in record:
+            self.add_edge(record["from"], record["to"])
+        elif "root" in record:
+            self.root = record["root"]
+        else:
+            raise ValueError("Record is in an invalid format: "
+                             "{}.".format(record))
+
+    def delete_edge(self, _from, _to):
+        """
+        Function to delete one occurrence of an edge.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex the edge starts from.
+        _to : str
+            String denoting the id of the vertex the edge points to.
+
+        Raises
+        ------
+        ValueError
+            If the edge doesn't exist.
+        """
+
+        s = self.index.get(_from)
+        t = self.index.get(_to)
+        if s is not None and t is not None:
+            for i in range(len(self.sources)):
+                if self.sources[i] == s and self.targets[i] == t:
+                    # Move the last edge into the hole. Edge order doesn't
+                    # matter for reachability.
+                    self.sources[i] = self.sources[-1]
+                    self.targets[i] = self.targets[-1]
+                    del self.sources[-1]
+                    del self.targets[-1]
+                    return
+        raise ValueError("Edge from {} to {} doesn't exist in the "
+                         "input structure. Please correct input and "
+                         "try again.".format(_from, _to))
+
+    def build(self):
+        """
+        Function to build the reverse graph.
+
+        Returns
+        -------
+        graph : CSRGraph
+            Reverse graph. Entry i holds the positions of the vertices that
+            point to vertex i.
+
+        Raises
+        ------
+        ValueError
+            If no root was given.
+        """
+
+        if self.root is None:
+            raise ValueError("No root specified in the input structure.")
+        # The root is allowed to be missing from the list of nodes.
+        self.add_node(self.root)
+
+        ids = self.ids
+        index = self.index
+        sources = self.sources
+        targets = self.targets
+        if len(self.nodes) != len(ids) or any(i != v for i, v in
+                                               enumerate(self.nodes)):
+            # Renumber the vertices in declaration order and drop the edges
+            # touching ids that were never declared.
+            remap = array("q", [-1]) * len(ids)
+            for new, old in enumerate(self.nodes):
+                remap[old] = new
+            ids = [self.ids[i] for i in self.nodes]
+            index = {v: i for i, v in enumerate(ids)}
+            sources = array("q")
+            targets = array("q")
+            for s, t in zip(self.sources, self.targets):
+                if remap[s] != -1 and remap[t] != -1:
+                    sources.append(remap[s])
+                    targets.append(remap[t])
+
+        return CSRGraph.from_edges(ids, targets, sources, index)
+
+    def reachability(self, edge_to_delete=None):
+        """
+        Function to build a RootReachability object from the graph.
+
+        Parameters
+        ----------
+        edge_to_delete : dict, default=None
+            Dictionary containing the from and to vertices of an edge to be
+            deleted first.
+
+        Returns
+        -------
+        reachability : RootReachability
+            Object holding the reverse graph.
+        """
+
+        if edge_to_delete is not None:
+            self.delete_edge(edge_to_delete["from"], edge_to_delete["to"])
+        return RootReachability(input_from_user=False, graph=self.build(),
+                                root=self.root)
+
+
+def open_source(source):
+    """
+    Function to open a path, or wrap a file object, as a text stream.
+
+    Parameters
+    ----------
+    source : str or file
+        Path of the file, or a file object open in text or binary mode.
+
+    Returns
+    -------
+    stream : file
+        Text stream.
+    close : bool
+        Whether the caller opened the stream and should close it.
+    """
+
+    if isinstance(source, str):
+        return open(source, encoding="utf-8"), True
+    if isinstance(source, io.TextIOBase):
+        return source, False
+    return io.TextIOWrapper(source, encoding="utf-8"), False
+
+
+def load_ndjson(source, edge_to_delete=None):
+    """
+    Function to load a graph from newline-delimited JSON. Every line holds
+    one node {"id": ...}, one edge {"from": ..., "to": ...} or the root
+    {"root": ...}.
+
+    Parameters
+    ----------
+    source : str or file
+        Path of the file, or a file object.
+    edge_to_delete : dict, default=None
+        Dictionary containing the from and to vertices of an edge to be
+        deleted.
+
+    Returns
+    -------
+    reachability : RootReachability
+        Object holding the reverse graph.
+
+    Raises
+    ------
+    ValueError
+        If a line couldn't be parsed properly.
+    """
+
+    builder = GraphBuilder()
+    stream, close = open_source(source)
+    try:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError("Couldn't parse line properly: {}. Please "
+                                 "check input and try again.".format(line))
+            builder.add_record(record)
+    finally:
+        if close:
+            stream.close()
+    return builder.reachability(edge_to_delete)
+
+
+def load_edge_list(source, root, delimiter="\t", edge_to_delete=None):
+    """
+    Function to load a graph from a delimited edge list. Every line holds
+    the ids of the two vertices of an edge, or a single id for an isolated
+    node. Empty lines and lines starting with # are skipped. Every id that
+    appears is a node.
+
+    Parameters
+    ----------
+    source : str or file
+        Path of the file, or a file object.
+    root : str
+        Root node.
+    delimiter : str, default="\\t"
+        String separating the two ids.
+    edge_to_delete : dict, default=None
+        Dictionary containing the from and to vertices of an edge to be
+        deleted.
+
+    Returns
+    -------
+    reachability : RootReachability
+        Object holding the reverse graph.
+
+    Raises
+    ------
+    ValueError
+        If a line holds more than two fields.
+    """
+
+    builder = GraphBuilder()
+    builder.root = root
+    stream, close = open_source(source)
+    try:
+        for line in stream:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split(delimiter)
+            if len(fields) == 1:
+                builder.add_node(fields[0])
+            elif len(fields) == 2:
+                builder.add_node(fields[0])
+                builder.add_node(fields[1])
+                builder.add_edge(fields[0], fields[1])
+            else:
+                raise ValueError("Couldn't parse line properly: {}. Please "
+                                 "check input and try again.".format(line))
+    finally:
+        if close:
+            stream.close()
+    return builder.reachability(edge_to_delete)
+
+
+class JSONStream:
+    """Class to read the values of a JSON document one at a time from a text
+    stream, holding only a small window of the text.
+
+    Attributes
+    ----------
+    stream : file
+        Text stream.
+    chunk_size : int
+        Number of characters read at a time.
+    buf : str
+        Text read but not consumed yet, starting at pos.
+    pos : int
+        Position of the next character in buf.
+    eof : bool
+        Whether the stream is exhausted.
+    """
+
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"\s*")
+    # A value cut off by the end of the window fails to decode within a few
+    # characters of the end (a literal, number or escape sequence), or as an
+    # unterminated string. Any other error is in the text itself.
+    truncation_margin = 16
+
+    def __init__(self, stream, chunk_size=1 << 16):
+        """
+        Constructor to initialize the window.
+
+        Parameters
+        ----------
+        stream : file
+            Text stream.
+        chunk_size : int, default=65536
+            Number of characters read at a time.
+        """
+
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """
+        Function to read another chunk, dropping the consumed text.
+
+        Parameters
+        ----------
+        size : int, default=None
+            Number of characters to read. Defaults to chunk_size.
+
+        Returns
+        -------
+        filled : bool
+            False if the stream is exhausted.
+        """
+
+        chunk = self.stream.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self):
+        """
+        Function to build the error raised on malformed input.
+
+        Returns
+        -------
+        error : ValueError
+            Error to raise.
+        """
+
+        return ValueError("Couldn't parse input properly. Please check input "
+                          "and try again.")
+
+    def peek(self):
+        """
+        Function to skip whitespace and get the next character without
+        consuming it.
+
+        Returns
+        -------
+        c : str
+            Next character.
+
+        Raises
+        ------
+        ValueError
+            If the stream ends.
+        """
+
+        while True:
+            self.pos = self.whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise self.error()
+
+    def expect(self, c):
+        """
+        Function to consume the next non-whitespace character.
+
+        Parameters
+        ----------
+        c : str
+            Expected character.
+
+        Raises
+        ------
+        ValueError
+            If the next character is different.
+        """
+
+        if self.peek() != c:
+            raise self.error()
+        self.pos += 1
+
+    def truncated(self, e):
+        """
+        Function to check whether a decoding error may only be due to the
+        value continuing past the end of the window.
+
+        Parameters
+        ----------
+        e : json.JSONDecodeError
+            Decoding error.
+
+        Returns
+        -------
+        truncated : bool
+            False if the value is malformed whatever follows.
+        """
+
+        return e.pos + self.truncation_margin >= len(self.buf) or \
+            e.msg.startswith("Unterminated string")
+
+    def value(self):
+        """
+        Function to decode the next complete JSON value, reading more text
+        until it is complete. Every retry reads twice as much as the one
+        before, so a long value is decoded a bounded number of times.
+
+        Returns
+        -------
+        value : object
+            Decoded value.
+
+        Raises
+        ------
+        ValueError
+            If the value is malformed.
+        """
+
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.truncated(e) and self.fill(size):
+                    size *= 2
+                    continue
+                raise self.error()
+            # A number at the end of the window may continue in the next
+            # chunk.
+            if end == len(self.buf) and not self.eof and self.fill(size):
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def separator(self, close):
+        """
+        Function to consume the separator after a member or an element.
+
+        Parameters
+        ----------
+        close : str
+            Character closing the enclosing object or array.
+
+        Returns
+        -------
+        more : bool
+            True if another member or element follows.
+
+        Raises
+        ------
+        ValueError
+            If the separator is neither a comma nor close.
+        """
+
+        c = self.peek()
+        self.pos += 1
+        if c == close:
+            return False
+        if c != ",":
+            raise self.error()
+        return True
+
+    def elements(self):
+        """
+        Function to iterate over the elements of the array starting at the
+        next character.
+
+        Returns
+        -------
+        elements : iterator
+            Iterator over the decoded elements.
+
+        Raises
+        ------
+        ValueError
+            If the array is malformed.
+        """
+
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        decode = self.decoder.raw_decode
+        skip = self.whitespace.match
+        while True:
+            # Fast path for elements that are complete and followed by their
+            # separator within the window.
+            buf = self.buf
+            pos = skip(buf, self.pos).end()
+            try:
+                value, end = decode(buf, pos)
+            except ValueError:
+                end = -1
+            if end != -1:
+                sep = skip(buf, end).end()
+                if sep < len(buf):
+                    c = buf[sep]
+                    if c != "," and c != "]":
+                        raise self.error()
+                    self.pos = sep + 1
+                    yield value
+                    if c == "]":
+                        return
+                    continue
+            self.pos = pos
+            yield self.value()
+            if not self.separator("]"):
+                return
+
+
+class StringStream:
+    """Class to read a string in chunks like a text stream. Unlike
+    io.StringIO, the string is not copied up front.
+
+    Attributes
+    ----------
+    text : str
+        String to read.
+    pos : int
+        Position of the next character to read.
+    """
+
+    def __init__(self, text):
+        """
+        Constructor to start reading at the beginning of a string.
+
+        Parameters
+        ----------
+        text : str
+            String to read.
+        """
+
+        self.text = text
+        self.pos = 0
+
+    def read(self, size=-1):
+        """
+        Function to read the next characters.
+
+        Parameters
+        ----------
+        size : int, default=-1
+            Number of characters to read. All of them if negative.
+
+        Returns
+        -------
+        chunk : str
+            Characters read, empty at the end of the string.
+        """
+
+        start = self.pos
+        self.pos = len(self.text) if size < 0 else min(start + size,
+                                                       len(self.text))
+        return self.text[start:self.pos]
+
+
+def parse_json(stream, builder, chunk_size=1 << 16):
+    """
+    Function to add the nodes, edges and root of a JSON document in the
+    format used by RootReachability to a graph builder, one at a time.
+
+    Parameters
+    ----------
+    stream : file
+        Text stream with the JSON document.
+    builder : GraphBuilder
+        Builder to add the graph to.
+    chunk_size : int, default=65536
+        Number of characters read at a time.
+
+    Raises
+    ------
+    ValueError
+        If the document couldn't be parsed properly.
+    """
+
+    doc = JSONStream(stream, chunk_size)
+    doc.expect("{")
+    if doc.peek() == "}":
+        doc.pos += 1
+        return
+    more = True
+    while more:
+        key = doc.value()
+        doc.expect(":")
+        if key in ("nodes", "edges") and doc.peek() == "[":
+            for record in doc.elements():
+                builder.add_record(record)
+        else:
+            value = doc.value()
+            if key == "root":
+                builder.root = value
+        more = doc.separator("}")
+
+
+def load_json(source, edge_to_delete=None, chunk_size=1 << 16):
+    """
+    Function to load a graph from a JSON document in the format used by
+    RootReachability, parsing the nodes and edges one at a time so that the
+    whole document is never held in memory.
+
+    Parameters
+    ----------
+    source : str or file
+        Path of the file, or a file object.
+    edge_to_delete : dict, default=None
+        Dictionary containing the from and to vertices of an edge to be
+        deleted.
+    chunk_size : int, default=65536
+        Number of characters read at a time.
+
+    Returns
+    -------
+    reachability : RootReachability
+        Object holding the reverse graph.
+
+    Raises
+    ------
+    ValueError
+        If the document couldn't be parsed properly.
+    """
+
+    builder = GraphBuilder()
+    stream, close = open_source(source)
+    try:
+        parse_json(stream, builder, chunk_size)
+    finally:
+        if close:
+            stream.close()
+    return builder.reachability(edge_to_delete)
+
+
+def load_snapshot(path):
+    """
+    Function to open a binary snapshot written by
+    RootReachability.save_snapshot. The graph is memory-mapped, so opening it
+    doesn't depend on its size.
+
+    Parameters
+    ----------
+    path : str
+        Path of the snapshot file.
+
+    Returns
+    -------
+    reachability : RootReachability
+        Object holding the reverse graph.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a snapshot or has no root.
+    """
+
+    graph, root = CSRGraph.load(path)
+    if root is None:
+        raise ValueError("No root specified in snapshot {}.".format(path))
+    return RootReachability(input_from_user=False, graph=graph, root=root)
@@ -0,0 +1,189 @@
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Returned by disabled phases, so that timing a phase costs a single
+# attribute check when instrumentation is off.
+NO_PHASE = nullcontext()
+
+
+def peak_rss():
+    """
+    Function to get the peak resident set size of the current process.
+
+    Returns
+    -------
+    peak_rss : int
+        Peak resident set size in bytes, or 0 if the platform doesn't report
+        it.
+    """
+
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def add_counters(counters, visited, relaxed, frontier):
+    """
+    Function to add the work of a traversal to the counters kept by the
+    traversal engines.
+
+    Parameters
+    ----------
+    counters : dict
+        Dictionary holding the "vertices_visited", "edges_relaxed" and
+        "max_frontier" counters, updated in place. Missing counters start
+        at 0.
+    visited : int
+        Number of vertices visited.
+    relaxed : int
+        Number of edges relaxed.
+    frontier : int
+        Size of the largest frontier.
+    """
+
+    counters["vertices_visited"] = counters.get("vertices_visited", 0) + \
+        visited
+    counters["edges_relaxed"] = counters.get("edges_relaxed", 0) + relaxed
+    counters["max_frontier"] = max(counters.get("max_frontier", 0), frontier)
+
+
+class Instrumentation:
+    """Class to collect per-phase wall time and counters from a
+    RootReachability object, and to pass them on to hooks as they are
+    recorded.
+
+    Every hook is called as hook(kind, name, value), where kind is "phase"
+    for a phase time in seconds and "counter" for a counter value.
+
+    Attributes
+    ----------
+    phases : dict
+        Dictionary mapping phase names to their total wall time in seconds.
+    counters : dict
+        Dictionary mapping counter names to their values.
+    hooks : array-like
+        List of callables to notify.
+    """
+
+    def __init__(self, hooks=None):
+        """
+        Constructor to start with no measurements.
+
+        Parameters
+        ----------
+        hooks : array-like, default=None
+            List of callables to notify.
+        """
+
+        self.phases = {}
+        self.counters = {}
+        self.hooks = list(hooks or [])
+
+    def add_hook(self, hook):
+        """
+        Function to add a hook.
+
+        Parameters
+        ----------
+        hook : callable
+            Callable taking the kind, name and value of a measurement.
+        """
+
+        self.hooks.append(hook)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager to time a phase. Time spent in a phase entered more
+        than once is added up. The peak RSS is sampled when the phase ends.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            self.notify("phase", name, elapsed)
+            self.maximum("peak_rss", peak_rss())
+
+    def count(self, name, value=1):
+        """
+        Function to add to a counter.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter.
+        value : int, default=1
+            Amount to add.
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + value
+        self.notify("counter", name, self.counters[name])
+
+    def maximum(self, name, value):
+        """
+        Function to raise a counter to a value if the value is larger.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter.
+        value : int
+            Candidate value.
+        """
+
+        if value > self.counters.get(name, value - 1):
+            self.counters[name] = value
+            self.notify("counter", name, value)
+
+    def notify(self, kind, name, value):
+        """
+        Function to pass a measurement to every hook.
+
+        Parameters
+        ----------
+        kind : str
+            "phase" or "counter".
+        name : str
+            Name of the phase or counter.
+        value : float or int
+            Measured value.
+        """
+
+        for hook in self.hooks:
+            hook(kind, name, value)
+
+    def report(self):
+        """
+        Function to get all the measurements.
+
+        Returns
+        -------
+        report : dict
+            Dictionary with copies of the phases and counters.
+        """
+
+        return {"phases": dict(self.phases), "counters": dict(self.counters)}
+
+    def reset(self):
+        """
+        Function to drop all the measurements. Hooks are kept.
+        """
+
+        self.phases = {}
+        self.counters = {}
@@ -1,5 +1,16 @@
+import argparse
 import json
+import sys
 from ast import literal_eval
+from functools import lru_cache
+
+from chemical_formula import molar_mass
+from element_table import ElementTable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class MassCalculator:
     """Class to compute the mass of a given list of components.
@@ -14,6 +25,13 @@ class MassCalculator:
         orders of magnitude as keys and values respectively.
     allowed_units : array-like
         List of allowed mass units for the components.
+    element_table : ElementTable
+        Table of the elements, looked up by name, symbol or atomic number.
+    unit_table : dict
+        Dictionary mapping every lowercase spelling of a valid unit, with
+        or without a prefix and a plural ending, to its base factor and
+        scale. The base factor is None for moles, which are converted with
+        the atomic weight of the element.
     components : array-like
         List of components.
     """
@@ -79,7 +97,8 @@ class MassCalculator:
 
     allowed_units = ["gram", "ounce", "pound", "mol"]
 
-    def __init__(self, input_from_user=True, json_input=None):
+    def __init__(self, input_from_user=True, json_input=None,
+                 components=None):
         """
         Class constructor to initialize fields.
 
@@ -90,6 +109,8 @@ class MassCalculator:
             unit tests.
         json_input : str
             Input JSON string containing a list of components.
+        components : array-like, default=None
+            Already parsed list of components, used as is.
 
         Raises
         ------
@@ -102,6 +123,8 @@ class MassCalculator:
             self.get_data()
         elif json_input is not None:
             self.get_data(json_input)
+        elif components is not None:
+            self.components = components
         else:
             raise ValueError("No input provided. Initialize class to either "
                              "accept input from user to provide a JSON "
@@ -190,11 +213,9 @@ class MassCalculator:
 
             c_name = comp["name"]
 
-            # Check if the name of the element is valid.
-            if c_name.strip().lower() not in self.atomic_weights:
-                raise ValueError("Invalid element name specified: {}. Please "
-                                 "check element name and try again.".format(
-                    comp["name"]))
+            # Check if the name of the element is valid. Symbols, atomic
+            # numbers and chemical formulas are accepted too.
+            _, weight = self.resolve_name(c_name)
 
             c_mass = comp["mass"]
 
@@ -208,42 +229,19 @@ class MassCalculator:
                                 "element mass and try again.".format(str(
                     c_mass)))
 
+            # Resolve the units with a single lookup in the table of every
+            # valid spelling. Other spellings go through the original
+            # checks, memoized.
             c_units = comp["units"].lower()
-
-            # Check if the units of mass are valid and come from the allowed
-            # list of units.
-            valid_unit = False
-            for unit in self.allowed_units:
-                if unit in c_units:
-                    valid_unit = True
-                    break
-
-            if not valid_unit:
-                raise ValueError("Invalid units specified: {}. Please check "
-                                "element mass units and try again. Allowed "
-                                "units are gram, ounce, pound and "
-                                "mol.".format(c_units))
-
-            # We have only checked if the unit specified contains in-part,
-            # any of the strings in the list of allowed units. We need to
-            # further process it to identify the order of magnitude and the
-            # precise unit. Here, I'm assuming that if there are any
-            # trailing unescaped special characters, I should simply delete
-            # them and process the units as though they were not present.
-            order, allowed_unit = self.process_units(c_units)
-            # print c_name, order, allowed_unit
+            base, scale = self.unit_table.get(c_units) or \
+                self.resolve_units(c_units)
 
             # Unit conversion.
-            if allowed_unit == "gram":
-                c_mass *= 1.0
-            elif allowed_unit == "mol":
-                c_mass *= self.atomic_weights[c_name]
-            elif allowed_unit == "ounce":
-                c_mass *= 28.349523125
-            else: # allowed_unit == "pound"
-                c_mass *= 453.59237
-
-            c_mass *= (10 ** order)
+            if base is None:
+                # Moles are converted with the atomic or molar weight.
+                base = weight
+            c_mass *= base
+            c_mass *= scale
             total_mass_g += c_mass
 
         total_mass_lb = total_mass_g / 453.59237
@@ -253,7 +251,497 @@ class MassCalculator:
         return mass_g, mass_lb
 
 
-    def process_units(self, units):
+    @classmethod
+    def resolve_component(cls, name, units):
+        """
+        Function to validate the name and units of a component and find the
+        factors converting its mass to grams, with the same checks and
+        conversions as calculate_mass.
+
+        Parameters
+        ----------
+        name : str or int
+            Name, symbol or atomic number of the element, or chemical
+            formula.
+        units : str
+            Raw string containing the units of the component.
+
+        Returns
+        -------
+        key : int or str
+            Atomic number of the element, or the formula without surrounding
+            whitespace, as returned by resolve_name.
+        base : float
+            Factor converting the unit without its prefix to grams.
+        scale : float
+            Factor of the order of magnitude prefix.
+
+        Raises
+        ------
+        ValueError
+            If the name of the element is invalid.
+            If invalid units are specified.
+        """
+
+        key, weight = cls.resolve_name(name)
+        c_units = units.lower()
+        base, scale = cls.unit_table.get(c_units) or cls.resolve_units(
+            c_units)
+        if base is None:
+            base = weight
+        return key, base, scale
+
+    @classmethod
+    def resolve_name(cls, name):
+        """
+        Function to identify the substance of a component and get its molar
+        mass. The name is tried as an element name, symbol and atomic
+        number, in that order, and then as a chemical formula such as H2SO4,
+        Ca(OH)2 or CuSO4·5H2O.
+
+        Parameters
+        ----------
+        name : str or int
+            Element name, symbol or atomic number, or chemical formula.
+
+        Returns
+        -------
+        key : int or str
+            Atomic number of the element, or the formula without surrounding
+            whitespace.
+        weight : float
+            Atomic or molar mass in grams per mole.
+
+        Raises
+        ------
+        ValueError
+            If the name denotes neither an element nor a valid formula.
+        """
+
+        z = cls.element_table.lookup(name)
+        if z is not None:
+            return z, cls.element_table.weights[z]
+        if isinstance(name, str):
+            formula = name.strip()
+            try:
+                return formula, molar_mass(formula, cls.element_table)
+            except ValueError:
+                pass
+        raise ValueError("Invalid element name specified: {}. Please "
+                         "check element name and try again.".format(name))
+
+    @classmethod
+    def build_unit_table(cls):
+        """
+        Function to build the table of unit spellings by running
+        resolve_units on every combination of prefix, unit and plural
+        ending, and keeping the spellings it accepts.
+
+        Returns
+        -------
+        unit_table : dict
+            Dictionary mapping spellings to base factors and scales.
+        """
+
+        table = {}
+        for prefix in [""] + list(cls.order_prefix):
+            for unit in cls.allowed_units:
+                for ending in ("", "s", "es"):
+                    spelling = prefix + unit + ending
+                    try:
+                        table[spelling] = cls.resolve_units(spelling)
+                    except ValueError:
+                        pass
+        return table
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def resolve_units(cls, units):
+        """
+        Function to validate lowercase units and find their conversion
+        factors by scanning for the allowed units and processing the
+        prefix. Results are memoized for spellings missing from the unit
+        table.
+
+        Parameters
+        ----------
+        units : str
+            Lowercase string containing the units of a component.
+
+        Returns
+        -------
+        base : float
+            Factor converting the unit without its prefix to grams, or None
+            for moles.
+        scale : float
+            Factor of the order of magnitude prefix.
+
+        Raises
+        ------
+        ValueError
+            If invalid units are specified.
+            If the prefix term in the order of magnitude is not valid.
+        """
+
+        # Check if the units of mass are valid and come from the allowed
+        # list of units.
+        if not any(unit in units for unit in cls.allowed_units):
+            raise ValueError("Invalid units specified: {}. Please check "
+                             "element mass units and try again. Allowed "
+                             "units are gram, ounce, pound and "
+                             "mol.".format(units))
+
+        # We have only checked if the unit specified contains in-part, any of
+        # the strings in the list of allowed units. We need to further
+        # process it to identify the order of magnitude and the precise unit.
+        order, allowed_unit = cls.process_units(units)
+        return cls.gram_conversion.get(allowed_unit), float(10 ** order)
+
+    @classmethod
+    def calculate_mass_columns(cls, names, masses, units, groups=None,
+                               n_groups=None):
+        """
+        Function to compute the total masses of many components given as
+        columns. Every distinct name and unit spelling is resolved once, the
+        masses are validated like in calculate_mass, and the conversion and
+        the sums are done with numpy. Every mass is converted with the same
+        operations as calculate_mass, and the totals are accumulated in row
+        order, so they match calculate_mass exactly.
+
+        Parameters
+        ----------
+        names : array-like
+            Name, symbol or atomic number of the element, or chemical
+            formula, of every component. An integer numpy array is taken as
+            atomic numbers directly.
+        masses : array-like
+            Mass of every component.
+        units : array-like
+            Units of every component.
+        groups : array-like, default=None
+            Index of the list every component belongs to. If None, all the
+            components belong to a single list.
+        n_groups : int, default=None
+            Number of lists. Defaults to one more than the largest index.
+
+        Returns
+        -------
+        mass_g : numpy.ndarray
+            Total mass in grams of every list.
+        mass_lb : numpy.ndarray
+            Total mass in pounds of every list.
+
+        Raises
+        ------
+        ImportError
+            If numpy is not installed.
+        ValueError
+            If the columns have different lengths.
+            If the name of an element is invalid.
+            If invalid units are specified.
+        Exception
+            If an invalid mass is specified.
+        """
+
+        if np is None:
+            raise ImportError("numpy is required for batch mass "
+                              "computations.")
+        if not len(names) == len(masses) == len(units):
+            raise ValueError("Columns of names, masses and units must have "
+                             "the same length.")
+        masses = cls.check_masses(masses)
+
+        table = cls.element_table
+        weights = table.numpy_weights()
+        if isinstance(names, np.ndarray) and names.dtype.kind in "iu":
+            z = names.astype(np.intp)
+        else:
+            keys, inverse = cls.factorize(names)
+            codes = np.empty(len(keys), dtype=np.intp)
+            # Names that aren't elements are formulas. They get codes after
+            # the elements, with their molar masses appended to the weights.
+            formulas = []
+            for k, name in enumerate(keys):
+                key, weight = cls.resolve_name(name)
+                if isinstance(key, int):
+                    codes[k] = key
+                else:
+                    codes[k] = len(weights) + len(formulas)
+                    formulas.append(weight)
+            z = codes[inverse]
+            if formulas:
+                weights = np.concatenate([weights, np.array(
+                    formulas, dtype=np.float64)])
+        invalid = (z < 1) | (z >= len(weights))
+        if invalid.any():
+            raise ValueError("Invalid element name specified: {}. Please "
+                             "check element name and try again.".format(
+                                 names[int(np.argmax(invalid))]))
+
+        keys, rows = cls.factorize(units)
+        factors = []
+        for c_units in keys:
+            c_units = c_units.lower()
+            base, scale = cls.unit_table.get(c_units) or \
+                cls.resolve_units(c_units)
+            factors.append((np.nan if base is None else base, scale))
+        factors = np.array(factors, dtype=np.float64).reshape(-1, 2)
+        if groups is not None:
+            groups = np.asarray(groups, dtype=np.intp)
+        return cls.sum_masses(z, masses, rows, factors, weights, groups,
+                              n_groups)
+
+    @classmethod
+    def factorize(cls, values):
+        """
+        Function to number the distinct values of a column, so that each of
+        them only has to be resolved once. Numpy arrays of strings are
+        numbered with numpy.unique. Other columns are numbered with a
+        dictionary, which is faster than converting them to an array first.
+
+        Parameters
+        ----------
+        values : array-like
+            Column of values.
+
+        Returns
+        -------
+        keys : array-like
+            List of the distinct values.
+        inverse : numpy.ndarray
+            Index into the keys of every value.
+        """
+
+        if isinstance(values, np.ndarray) and values.dtype.kind in "US":
+            keys, inverse = np.unique(values, return_inverse=True)
+            return list(keys), inverse.reshape(-1)
+        codes = {}
+        inverse = np.empty(len(values), dtype=np.intp)
+        for i, value in enumerate(values):
+            inverse[i] = codes.setdefault(value, len(codes))
+        return list(codes), inverse
+
+    @classmethod
+    def check_masses(cls, masses):
+        """
+        Function to validate a column of masses the same way as
+        calculate_mass, by multiplying every mass by 1.0, and convert it to
+        float64. Numeric arrays are converted directly.
+
+        Parameters
+        ----------
+        masses : array-like
+            Column of masses.
+
+        Returns
+        -------
+        masses : numpy.ndarray
+            Array of float64 masses.
+
+        Raises
+        ------
+        Exception
+            If an invalid mass is specified.
+        """
+
+        column = np.asarray(masses)
+        if column.ndim == 1 and column.dtype.kind in "biuf":
+            return column.astype(np.float64)
+        converted = []
+        for mass in masses:
+            try:
+                converted.append(mass * 1.0)
+            except Exception:
+                raise Exception("Invalid mass specified: {}. Please check "
+                                "element mass and try again.".format(
+                                    str(mass)))
+        return np.array(converted, dtype=np.float64)
+
+    @classmethod
+    def sum_masses(cls, z, masses, rows, factors, weights, groups=None,
+                   n_groups=None):
+        """
+        Function to convert encoded components to grams and add them up per
+        list, in row order.
+
+        Parameters
+        ----------
+        z : numpy.ndarray
+            Index into the weights of every component.
+        masses : numpy.ndarray
+            Mass of every component.
+        rows : numpy.ndarray
+            Index into the factors of every component.
+        factors : numpy.ndarray
+            Array of the base factor, NaN for moles, and the scale of every
+            unit.
+        weights : numpy.ndarray
+            Atomic or molar weights.
+        groups : numpy.ndarray, default=None
+            Index of the list every component belongs to. If None, all the
+            components belong to a single list.
+        n_groups : int, default=None
+            Number of lists. Defaults to one more than the largest index.
+
+        Returns
+        -------
+        mass_g : numpy.ndarray
+            Total mass in grams of every list.
+        mass_lb : numpy.ndarray
+            Total mass in pounds of every list.
+        """
+
+        # Moles are converted with the atomic or molar weight.
+        base = factors[rows, 0]
+        mol = np.isnan(base)
+        base[mol] = weights[z[mol]]
+        mass = masses * base
+        mass *= factors[rows, 1]
+        if groups is None:
+            groups = np.zeros(len(mass), dtype=np.intp)
+            n_groups = 1
+        # bincount returns integers when there are no components at all.
+        mass_g = np.bincount(groups, weights=mass, minlength=n_groups or 0
+                             ).astype(np.float64, copy=False)
+        return mass_g, mass_g / 453.59237
+
+    @classmethod
+    def calculate_mass_records(cls, records, factors, formulas=(),
+                               n_lists=None):
+        """
+        Function to compute the total masses of the lists of a batch file in
+        one vectorized pass over its records. Names and units are already
+        encoded, so no component is looked at individually. Totals match
+        calculate_mass exactly.
+
+        Parameters
+        ----------
+        records : numpy.ndarray
+            Structured array with fields "element", "units", "list" and
+            "mass", as returned by component_batch.read_batch.
+        factors : numpy.ndarray
+            Array of the base factor, NaN for moles, and the scale of every
+            unit code.
+        formulas : array-like, default=()
+            Formulas of the element codes after the last element, in order.
+        n_lists : int, default=None
+            Number of lists. Defaults to one more than the largest list id.
+
+        Returns
+        -------
+        mass_g : numpy.ndarray
+            Total mass in grams of every list.
+        mass_lb : numpy.ndarray
+            Total mass in pounds of every list.
+
+        Raises
+        ------
+        ImportError
+            If numpy is not installed.
+        ValueError
+            If a record has an invalid element or unit code.
+            If a formula is invalid.
+        """
+
+        if np is None:
+            raise ImportError("numpy is required for batch mass "
+                              "computations.")
+        weights = cls.element_table.numpy_weights()
+        if len(formulas):
+            weights = np.concatenate([weights, np.array(
+                [molar_mass(f, cls.element_table) for f in formulas],
+                dtype=np.float64)])
+        z = records["element"]
+        rows = records["units"]
+        if len(records) and (z.min() < 1 or z.max() >= len(weights) or
+                             rows.max() >= len(factors)):
+            raise ValueError("Invalid element or unit code in batch records.")
+        return cls.sum_masses(z, records["mass"], rows, factors, weights,
+                              records["list"], n_lists)
+
+    @classmethod
+    def calculate_mass_file(cls, path):
+        """
+        Function to compute the total mass of every list of a batch file
+        written by component_batch. The file is memory-mapped and read
+        without copying or parsing.
+
+        Parameters
+        ----------
+        path : str
+            Path of the batch file.
+
+        Returns
+        -------
+        mass_g : numpy.ndarray
+            Total mass in grams of every list.
+        mass_lb : numpy.ndarray
+            Total mass in pounds of every list.
+
+        Raises
+        ------
+        ImportError
+            If numpy is not installed.
+        ValueError
+            If the file is not a valid batch file.
+        """
+
+        # component_batch imports this module to encode components.
+        from component_batch import read_batch
+
+        records, factors, formulas, n_lists = read_batch(path)
+        return cls.calculate_mass_records(records, factors, formulas,
+                                          n_lists)
+
+    @classmethod
+    def calculate_mass_batch(cls, component_lists):
+        """
+        Function to compute the total masses of many lists of components at
+        once.
+
+        Parameters
+        ----------
+        component_lists : array-like
+            List of lists of components, each in the format of the
+            "components" key of the input.
+
+        Returns
+        -------
+        mass_g : numpy.ndarray
+            Total mass in grams of every list.
+        mass_lb : numpy.ndarray
+            Total mass in pounds of every list.
+
+        Raises
+        ------
+        ValueError
+            If any of the components is underspecified.
+            If the name of an element is invalid.
+            If invalid units are specified.
+        Exception
+            If an invalid mass is specified.
+        """
+
+        names = []
+        masses = []
+        units = []
+        groups = []
+        for group, components in enumerate(component_lists):
+            for comp in components:
+                if len(comp) < 3 or "name" not in comp or "mass" not in \
+                        comp or "units" not in comp:
+                    raise ValueError("Underspecified component: {}. Please "
+                                     "check input and try again.".format(
+                                         comp))
+                names.append(comp["name"])
+                masses.append(comp["mass"])
+                units.append(comp["units"])
+                groups.append(group)
+        return cls.calculate_mass_columns(names, masses, units, groups,
+                                          len(component_lists))
+
+    @classmethod
+    def process_units(cls, units):
         """
         Function to process the units of a component.
 
@@ -291,22 +779,123 @@ class MassCalculator:
         # Now, we are left with exactly one of the allowed units with an
         # order of magnitude prefix.
         prefix = ""
-        for u in self.allowed_units:
+        for u in cls.allowed_units:
             if u in unit:
                 prefix = unit[:-len(u)]
                 unit = u
                 break
 
         if prefix:
-            if prefix in self.order_prefix:
-                order = self.order_prefix[prefix]
+            if prefix in cls.order_prefix:
+                order = cls.order_prefix[prefix]
             else:
                 raise ValueError("Prefix term for the order of magnitude is "
                                 "not specified correctly. Please check "
                                 "unit: {} and try again.".format(units))
         return order, unit
 
+MassCalculator.element_table = ElementTable(MassCalculator.atomic_weights)
+MassCalculator.unit_table = MassCalculator.build_unit_table()
+
+
+def process_record(line, number):
+    """
+    Function to compute the mass of one NDJSON record.
+
+    Parameters
+    ----------
+    line : str
+        JSON object with a "components" key and an optional "id" key.
+    number : int
+        Line number, used as the id of records without one.
+
+    Returns
+    -------
+    result : dict
+        Dictionary with the id and either the masses in grams and pounds or
+        the error.
+    """
+
+    result = {"id": number}
+    try:
+        try:
+            data = json.loads(line)
+        except ValueError:
+            raise ValueError("Couldn't parse input properly. Please check "
+                             "input and try again.")
+        if not isinstance(data, dict):
+            raise TypeError("Expected input is a dictionary. Please check "
+                            "input and try again.")
+        result["id"] = data.get("id", number)
+        if "components" not in data or len(set(data) - {"id"}) != 1:
+            raise ValueError("Expected key \"components\" not found in the "
+                             "input dictionary.")
+        mc = MassCalculator(input_from_user=False,
+                            components=data["components"])
+        result["mass_g"], result["mass_lb"] = mc.calculate_mass()
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def process_ndjson(infile, outfile):
+    """
+    Function to compute the mass of every record of an NDJSON stream and
+    write one result per line. Records are processed one at a time, so
+    memory use doesn't depend on the size of the stream.
+
+    Parameters
+    ----------
+    infile : file
+        Text stream with one JSON object per line.
+    outfile : file
+        Text stream to write the results to.
+
+    Returns
+    -------
+    count : int
+        Number of records processed.
+    """
+
+    count = 0
+    for number, line in enumerate(infile, 1):
+        if not line.strip():
+            continue
+        outfile.write(json.dumps(process_record(line, number)))
+        outfile.write("\n")
+        count += 1
+    return count
+
+
 if __name__ == "__main__":
-    mc = MassCalculator()
-    mg, mlb = mc.calculate_mass()
-    print("Mass of the list of components: {} g, {} lbs. ".format(mg, mlb))
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Compute the mass of a list of components. Without "
+                    "arguments the list is read interactively.")
+    parser.add_argument("--ndjson", nargs="?", const="-", metavar="FILE",
+                        help="Read one {\"components\": [...]} record per "
+                             "line from FILE, or stdin, and write one JSON "
+                             "result per line.")
+    parser.add_argument("-o", "--output", default="-",
+                        help="File to write the results to. Defaults to "
+                             "stdout.")
+    args = parser.parse_args()
+
+    if args.ndjson is None:
+        mc = MassCalculator()
+        mg, mlb = mc.calculate_mass()
+        print("Mass of the list of components: {} g, {} lbs. ".format(mg,
+                                                                       mlb))
+    else:
+        buffer_size = 1 << 20
+        infile = sys.stdin if args.ndjson == "-" else open(
+            args.ndjson, encoding="utf-8", buffering=buffer_size)
+        outfile = sys.stdout if args.output == "-" else open(
+            args.output, "w", encoding="utf-8", buffering=buffer_size)
+        try:
+            process_ndjson(infile, outfile)
+        finally:
+            outfile.flush()
+            if infile is not sys.stdin:
+                infile.close()
+            if outfile is not sys.stdout:
+                outfile.close()
\ No newline at end of file
@@ -0,0 +1,408 @@
+from mass_calculator import MassCalculator
+
+
+class CompensatedSum:
+    """Class to keep a running sum of floats with Neumaier's compensated
+    summation, so that long sequences of additions and removals don't
+    accumulate rounding errors.
+
+    Attributes
+    ----------
+    total : float
+        Naive running sum.
+    compensation : float
+        Running sum of the rounding errors of the additions.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, x):
+        """
+        Function to add a value.
+
+        Parameters
+        ----------
+        x : float
+            Value to add. Subtract by adding the negated value.
+        """
+
+        t = self.total + x
+        if abs(self.total) >= abs(x):
+            self.compensation += (self.total - t) + x
+        else:
+            self.compensation += (x - t) + self.total
+        self.total = t
+
+    def reset(self):
+        """
+        Function to set the sum back to zero.
+        """
+
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def value(self):
+        """
+        Function to get the compensated sum.
+
+        Returns
+        -------
+        value : float
+            Sum of all the values added.
+        """
+
+        return self.total + self.compensation
+
+
+class Mixture:
+    """Class to hold a mutable list of components and keep its total mass up
+    to date as components are added, removed, updated or rescaled, each in
+    constant time. Subtotals per element or compound are kept as well.
+
+    Components are validated and converted to grams the same way as in
+    MassCalculator.calculate_mass.
+
+    Attributes
+    ----------
+    components : dict
+        Dictionary mapping the key of every component to the atomic number
+        of its element (or its formula), its name, its mass, its units and
+        its mass in grams.
+    total : CompensatedSum
+        Total mass in grams.
+    element_totals : dict
+        Dictionary mapping atomic numbers and formulas to the mass in grams
+        of their components.
+    element_counts : dict
+        Dictionary mapping atomic numbers and formulas to their number of
+        components.
+    next_key : int
+        Key given to the next component added.
+    """
+
+    def __init__(self, components=None):
+        """
+        Constructor to start a mixture.
+
+        Parameters
+        ----------
+        components : array-like, default=None
+            List of components to add, in the format of the "components" key
+            of the MassCalculator input.
+
+        Raises
+        ------
+        ValueError
+            If any of the components is invalid.
+        """
+
+        self.components = {}
+        self.total = CompensatedSum()
+        self.element_totals = {}
+        self.element_counts = {}
+        self.next_key = 0
+        for comp in components or []:
+            if len(comp) < 3 or "name" not in comp or "mass" not in comp or \
+                    "units" not in comp:
+                raise ValueError("Underspecified component: {}. Please check "
+                                 "input and try again.".format(comp))
+            self.add(comp["name"], comp["mass"], comp["units"])
+
+    def __len__(self):
+        return len(self.components)
+
+    def __contains__(self, key):
+        return key in self.components
+
+    def convert(self, name, mass, units):
+        """
+        Function to validate a component and convert its mass to grams.
+
+        Parameters
+        ----------
+        name : str or int
+            Name, symbol or atomic number of the element.
+        mass : float
+            Mass in the given units.
+        units : str
+            Units of the mass.
+
+        Returns
+        -------
+        z : int
+            Atomic number of the element, or the formula of the compound.
+        grams : float
+            Mass in grams.
+
+        Raises
+        ------
+        ValueError
+            If the name of the element is invalid.
+            If invalid units are specified.
+        Exception
+            If invalid mass is specified.
+        """
+
+        z, base, scale = MassCalculator.resolve_component(name, units)
+        try:
+            grams = mass * 1.0
+        except Exception:
+            raise Exception("Invalid mass specified: {}. Please check "
+                            "element mass and try again.".format(str(mass)))
+        grams *= base
+        grams *= scale
+        return z, grams
+
+    def include(self, key, z, name, mass, units, grams):
+        """
+        Function to store a converted component and add it to the totals.
+
+        Parameters
+        ----------
+        key : int
+            Key of the component.
+        z : int
+            Atomic number of the element, or the formula of the compound.
+        name : str or int
+            Element as given.
+        mass : float
+            Mass in the given units.
+        units : str
+            Units of the mass.
+        grams : float
+            Mass in grams.
+        """
+
+        self.components[key] = (z, name, mass, units, grams)
+        self.total.add(grams)
+        if z not in self.element_totals:
+            self.element_totals[z] = CompensatedSum()
+            self.element_counts[z] = 0
+        self.element_totals[z].add(grams)
+        self.element_counts[z] += 1
+
+    def exclude(self, key):
+        """
+        Function to remove a stored component from the totals.
+
+        Parameters
+        ----------
+        key : int
+            Key of the component.
+
+        Returns
+        -------
+        component : tuple
+            Atomic number, name, mass, units and mass in grams of the
+            component.
+
+        Raises
+        ------
+        KeyError
+            If there is no component with the key.
+        """
+
+        if key not in self.components:
+            raise KeyError("No component with key {}.".format(key))
+        component = self.components.pop(key)
+        z, grams = component[0], component[4]
+        self.element_counts[z] -= 1
+        if self.element_counts[z]:
+            self.element_totals[z].add(-grams)
+        else:
+            # Nothing left to sum, so don't keep the residual rounding.
+            del self.element_counts[z]
+            del self.element_totals[z]
+        if self.components:
+            self.total.add(-grams)
+        else:
+            self.total.reset()
+        return component
+
+    def add(self, name, mass, units):
+        """
+        Function to add a component.
+
+        Parameters
+        ----------
+        name : str or int
+            Name, symbol or atomic number of the element.
+        mass : float
+            Mass in the given units.
+        units : str
+            Units of the mass.
+
+        Returns
+        -------
+        key : int
+            Key of the new component.
+
+        Raises
+        ------
+        ValueError
+            If the name of the element is invalid.
+            If invalid units are specified.
+        Exception
+            If invalid mass is specified.
+        """
+
+        z, grams = self.convert(name, mass, units)
+        key = self.next_key
+        self.next_key += 1
+        self.include(key, z, name, mass, units, grams)
+        return key
+
+    def remove(self, key):
+        """
+        Function to remove a component.
+
+        Parameters
+        ----------
+        key : int
+            Key of the component.
+
+        Raises
+        ------
+        KeyError
+            If there is no component with the key.
+        """
+
+        self.exclude(key)
+
+    def update(self, key, name=None, mass=None, units=None):
+        """
+        Function to change a component. The component is left unchanged if
+        the new values are invalid.
+
+        Parameters
+        ----------
+        key : int
+            Key of the component.
+        name : str or int, default=None
+            New element. Unchanged if None.
+        mass : float, default=None
+            New mass. Unchanged if None.
+        units : str, default=None
+            New units. Unchanged if None.
+
+        Raises
+        ------
+        KeyError
+            If there is no component with the key.
+        ValueError
+            If the name of the element is invalid.
+            If invalid units are specified.
+        Exception
+            If invalid mass is specified.
+        """
+
+        if key not in self.components:
+            raise KeyError("No component with key {}.".format(key))
+        _, old_name, old_mass, old_units, _ = self.components[key]
+        name = old_name if name is None else name
+        mass = old_mass if mass is None else mass
+        units = old_units if units is None else units
+        z, grams = self.convert(name, mass, units)
+        self.exclude(key)
+        self.include(key, z, name, mass, units, grams)
+
+    def scale(self, key, factor):
+        """
+        Function to multiply the mass of a component by a factor.
+
+        Parameters
+        ----------
+        key : int
+            Key of the component.
+        factor : float
+            Factor to multiply the mass by.
+
+        Raises
+        ------
+        KeyError
+            If there is no component with the key.
+        """
+
+        if key not in self.components:
+            raise KeyError("No component with key {}.".format(key))
+        self.update(key, mass=self.components[key][2] * factor)
+
+    def mass_g(self):
+        """
+        Function to get the total mass.
+
+        Returns
+        -------
+        mass_g : float
+            Total mass in grams.
+        """
+
+        return self.total.value()
+
+    def element_mass_g(self, name):
+        """
+        Function to get the mass of the components of one element or
+        compound.
+
+        Parameters
+        ----------
+        name : str or int
+            Name, symbol or atomic number of the element, or chemical
+            formula. Atomic numbers and formulas already stored as keys of
+            element_totals are used without being resolved again.
+
+        Returns
+        -------
+        mass_g : float
+            Mass in grams, 0 if the mixture has no such component.
+
+        Raises
+        ------
+        ValueError
+            If the name of the element is invalid.
+        """
+
+        # Floats and booleans hash like atomic numbers, so only exact ints
+        # and strings are looked up directly.
+        if type(name) in (int, str) and name in self.element_totals:
+            return self.element_totals[name].value()
+        z, _ = MassCalculator.resolve_name(name)
+        if z not in self.element_totals:
+            return 0.0
+        return self.element_totals[z].value()
+
+    def element_masses_g(self):
+        """
+        Function to get the mass of every element and compound in the
+        mixture.
+
+        Returns
+        -------
+        masses : dict
+            Dictionary mapping element names and formulas to masses in grams.
+        """
+
+        names = MassCalculator.element_table.names
+        return {names[z] if isinstance(z, int) else z: s.value() for z, s in
+                self.element_totals.items()}
+
+    def calculate_mass(self):
+        """
+        Function to get the total mass formatted like
+        MassCalculator.calculate_mass.
+
+        Returns
+        -------
+        mass_g : str
+            String representation of the total mass in grams rounded to 2
+            decimal places.
+        mass_lb : str
+            String representation of the total mass in pounds rounded to 2
+            decimal places.
+        """
+
+        total_mass_g = self.mass_g()
+        return "{:.2f}".format(total_mass_g), "{:.2f}".format(
+            total_mass_g / 453.59237)
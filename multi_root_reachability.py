@@ -0,0 +1,192 @@
+from vectorized_reachability import check_numpy, expand_frontier
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class MultiRootReachability:
+    """Class to find, for every vertex, the set of roots it can reach, for
+    any number of roots in a single pass.
+
+    The graph is condensed into its strongly connected components. Every
+    component gets a packed bitset with one bit per root, 64 roots to a
+    word. The bitsets are propagated over the component graph one
+    topological level at a time with array operations.
+
+    Attributes
+    ----------
+    reachability : RootReachability
+        Object holding the graph.
+    roots : array-like
+        List of root ids. Bit k of a bitset stands for roots[k].
+    condensation : ComponentDAG
+        Condensation of the reverse graph.
+    component : numpy.ndarray
+        Component number of every vertex, indexed by vertex position.
+    bits : numpy.ndarray
+        Array of shape (components, words) of uint64 with the bitset of
+        every component.
+    """
+
+    def __init__(self, reachability, roots):
+        """
+        Constructor to compute the bitsets.
+
+        Parameters
+        ----------
+        reachability : RootReachability
+            Object holding the graph. Its reverse graph is used.
+        roots : array-like
+            List of root ids.
+
+        Raises
+        ------
+        ValueError
+            If a root is not a vertex of the graph.
+        """
+
+        check_numpy()
+        self.reachability = reachability
+        self.roots = list(roots)
+        for r in self.roots:
+            if r not in reachability.vertex_index:
+                raise ValueError("Root {} doesn't exist in the input "
+                                 "structure.".format(r))
+
+        self.condensation = reachability.condense()
+        self.component = np.frombuffer(self.condensation.component,
+                                       dtype=np.int64)
+        words = max((len(self.roots) + 63) // 64, 1)
+        self.bits = np.zeros((self.condensation.count, words),
+                             dtype=np.uint64)
+        for k, r in enumerate(self.roots):
+            c = self.component[reachability.vertex_index[r]]
+            self.bits[c, k // 64] |= np.uint64(1 << (k % 64))
+
+        self.propagate()
+
+    def propagate(self):
+        """
+        Function to propagate the bitsets over the component graph. Reverse
+        edges go from a vertex to the vertices pointing to it, so the roots
+        reached by a component flow along them. Components are processed one
+        level at a time, in topological order of the reverse graph.
+        """
+
+        count = len(self.bits)
+        dag_offsets, dst = self.condensation.dag.numpy_arrays()
+        src = np.repeat(np.arange(count), np.diff(dag_offsets))
+
+        indegree = np.bincount(dst, minlength=count)
+        frontier = np.flatnonzero(indegree == 0)
+        while frontier.size:
+            # Every component in the frontier has received the bits of all
+            # of its predecessors.
+            starts = dag_offsets[frontier]
+            lengths = dag_offsets[frontier + 1] - starts
+            first = np.cumsum(lengths) - lengths
+            idx = np.repeat(starts - first, lengths) + np.arange(
+                int(lengths.sum()))
+            np.bitwise_or.at(self.bits, dst[idx], self.bits[src[idx]])
+            successors = expand_frontier(dag_offsets, dst, frontier)
+            np.subtract.at(indegree, successors, 1)
+            successors = np.unique(successors)
+            frontier = successors[indegree[successors] == 0]
+
+    def vertex_bits(self, v):
+        """
+        Function to get the bitset of a vertex.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        bits : numpy.ndarray
+            Array of uint64 words.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist in the graph.
+        """
+
+        if v not in self.reachability.vertex_index:
+            raise ValueError("Vertex {} doesn't exist in the input "
+                             "structure.".format(v))
+        return self.bits[self.component[self.reachability.vertex_index[v]]]
+
+    def roots_reached(self, v):
+        """
+        Function to get the roots a vertex can reach.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        roots : array-like
+            List of root ids, in the order they were given.
+        """
+
+        flags = np.unpackbits(self.vertex_bits(v).view(np.uint8),
+                              bitorder="little")
+        return [self.roots[k] for k in np.flatnonzero(flags[:len(
+            self.roots)])]
+
+    def reach_matrix(self):
+        """
+        Function to get a boolean matrix telling which roots every vertex can
+        reach.
+
+        Returns
+        -------
+        matrix : numpy.ndarray
+            Boolean array of shape (vertices, roots).
+        """
+
+        rows = self.bits[self.component].view(np.uint8)
+        flags = np.unpackbits(rows, axis=1, bitorder="little")
+        return flags[:, :len(self.roots)].astype(bool)
+
+    def get_orphan_nodes(self, root=None):
+        """
+        Function to get the list of orphan nodes that cannot reach a root.
+
+        Parameters
+        ----------
+        root : str, default=None
+            Root to check. If None, the nodes that cannot reach any of the
+            roots are returned.
+
+        Returns
+        -------
+        orphan_nodes : array-like
+            List of nodes that cannot reach the root, or any root.
+
+        Raises
+        ------
+        ValueError
+            If the root is not one of the roots.
+        """
+
+        if root is None:
+            reached = self.bits.any(axis=1)
+            excluded = set(self.roots)
+        else:
+            if root not in self.roots:
+                raise ValueError("{} is not one of the roots.".format(root))
+            k = self.roots.index(root)
+            reached = (self.bits[:, k // 64] >> np.uint64(k % 64)) & \
+                np.uint64(1)
+            excluded = {root}
+        reached = reached[self.component].astype(bool)
+        index = self.reachability.vertex_index
+        return [v for v in self.reachability.vertices if
+                not reached[index[v]] and v not in excluded]
@@ -0,0 +1,317 @@
+import argparse
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from mass_calculator import process_record
+
+# Default number of bytes per shard. Large enough that the cost of sending a
+# shard's results back is small next to the work done on it.
+DEFAULT_CHUNK_SIZE = 16 << 20
+
+# Passed to process_record as the line number, to tell the records whose id
+# is their line number, which only the parent knows, from the others.
+LINE_ID = object()
+
+
+def shard_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Function to split a file into byte ranges of roughly chunk_size bytes
+    that start and end on line boundaries.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    chunk_size : int, default=DEFAULT_CHUNK_SIZE
+        Target number of bytes per shard.
+
+    Returns
+    -------
+    shards : array-like
+        List of (start, end) byte offsets.
+
+    Raises
+    ------
+    ValueError
+        If chunk_size is not positive.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive.")
+    size = os.path.getsize(path)
+    shards = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + chunk_size
+            if end < size:
+                # Move the end past the next newline.
+                f.seek(end)
+                end += len(f.readline())
+            end = min(end, size)
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def read_shard(path, start, end):
+    """
+    Function to read the bytes of a shard.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    start, end : int
+        Byte offsets of the shard.
+
+    Returns
+    -------
+    data : bytes
+        Contents of the shard.
+    """
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def count_lines(data):
+    """
+    Function to count the lines of a shard the way universal newlines split
+    them, without decoding it. Much cheaper than processing the shard.
+
+    Parameters
+    ----------
+    data : bytes
+        Contents of the shard. Shards end on a line boundary, so a carriage
+        return and line feed pair is never split between two shards.
+
+    Returns
+    -------
+    lines : int
+        Number of line endings.
+    """
+
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+
+
+def process_shard(shard):
+    """
+    Function run in a worker process to compute the mass of every record of
+    a shard. Lines are split with universal newlines, as in process_ndjson.
+    The results are returned already encoded, so that the only work left to
+    the parent is to fill in the ids of the records without one, which are
+    their line numbers and depend on the lines of the shards before.
+
+    Parameters
+    ----------
+    shard : tuple
+        (path, start, end) of the shard.
+
+    Returns
+    -------
+    pieces : array-like
+        List of encoded NDJSON fragments, one more than the holes. The
+        output of the shard is the fragments with the line number of every
+        hole in between.
+    holes : array-like
+        Line numbers, counted from 0 within the shard, of the records whose
+        id is their line number.
+    count : int
+        Number of records processed.
+    lines : int
+        Number of lines in the shard.
+    """
+
+    text = io.TextIOWrapper(io.BytesIO(read_shard(*shard)), encoding="utf-8")
+    pieces = []
+    holes = []
+    piece = []
+    count = 0
+    lines = 0
+    for number, line in enumerate(text):
+        lines += 1
+        if not line.strip():
+            continue
+        count += 1
+        result = process_record(line, LINE_ID)
+        if result["id"] is LINE_ID:
+            del result["id"]
+            # Same text as json.dumps with the id first.
+            piece.append('{"id": ')
+            pieces.append("".join(piece).encode("utf-8"))
+            holes.append(number)
+            piece = [", ", json.dumps(result)[1:], "\n"]
+        else:
+            piece.extend((json.dumps(result), "\n"))
+    pieces.append("".join(piece).encode("utf-8"))
+    return pieces, holes, count, lines
+
+
+def write_shard(outfile, result, first_line):
+    """
+    Function to write the output of a shard, with the line numbers of the
+    records without an id filled in.
+
+    Parameters
+    ----------
+    outfile : file
+        Binary stream to write the results to.
+    result : tuple
+        Value returned by process_shard.
+    first_line : int
+        Line number of the first line of the shard.
+
+    Returns
+    -------
+    count : int
+        Number of records written.
+    lines : int
+        Number of lines in the shard.
+    """
+
+    pieces, holes, count, lines = result
+    parts = [pieces[0]]
+    for number, piece in zip(holes, pieces[1:]):
+        parts.append(str(first_line + number).encode("ascii"))
+        parts.append(piece)
+    outfile.write(b"".join(parts))
+    return count, lines
+
+
+def write_completed(outfile, pending):
+    """
+    Function to wait for at least one shard to finish, and write the output
+    of every finished shard.
+
+    Parameters
+    ----------
+    outfile : file
+        Binary stream to write the results to.
+    pending : dict
+        Dictionary mapping the futures of the shards submitted but not
+        written yet to the line numbers of their first lines. Written
+        shards are removed.
+
+    Returns
+    -------
+    count : int
+        Number of records written.
+    """
+
+    count = 0
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        count += write_shard(outfile, future.result(), pending.pop(future))[0]
+    return count
+
+
+def process_file_parallel(path, outfile, workers=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE, window=None,
+                          ordered=True):
+    """
+    Function to compute the mass of every record of an NDJSON file over a
+    process pool. The file is split into byte-range shards that the workers
+    read on their own, so only offsets go out and encoded results come back.
+    At most window shards are in flight at a time, and results are written
+    as soon as they are ready, so memory use doesn't depend on the size of
+    the file. Results have the same format and record ids as
+    process_ndjson.
+
+    Parameters
+    ----------
+    path : str
+        Path of the NDJSON file.
+    outfile : file
+        Binary stream to write the results to.
+    workers : int, default=None
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_size : int, default=DEFAULT_CHUNK_SIZE
+        Target number of bytes per shard.
+    window : int, default=None
+        Largest number of shards submitted but not written yet. Defaults to
+        twice the number of workers.
+    ordered : bool, default=True
+        Whether to write the results in input order. Otherwise the output of
+        every shard is written as soon as it is done, and the parent counts
+        the lines of every shard while it is submitted to know the line
+        number of its first line up front.
+
+    Returns
+    -------
+    count : int
+        Number of records processed.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    window = window or 2 * workers
+    count = 0
+    # Line number of the first line of the next shard to submit when
+    # unordered, or to write when ordered.
+    first_line = 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if not ordered:
+            pending = {}
+            for start, end in shard_file(path, chunk_size):
+                if len(pending) >= window:
+                    count += write_completed(outfile, pending)
+                pending[pool.submit(process_shard, (path, start, end))] = \
+                    first_line
+                first_line += count_lines(read_shard(path, start, end))
+            while pending:
+                count += write_completed(outfile, pending)
+            return count
+
+        pending = deque()
+        for start, end in shard_file(path, chunk_size):
+            pending.append(pool.submit(process_shard, (path, start, end)))
+            if len(pending) >= window:
+                records, lines = write_shard(outfile,
+                                             pending.popleft().result(),
+                                             first_line)
+                count += records
+                first_line += lines
+        while pending:
+            records, lines = write_shard(outfile, pending.popleft().result(),
+                                         first_line)
+            count += records
+            first_line += lines
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute the mass of every {\"components\": [...]} record "
+                    "of an NDJSON file over a process pool.")
+    parser.add_argument("input", help="NDJSON file.")
+    parser.add_argument("-o", "--output", default="-",
+                        help="File to write the results to. Defaults to "
+                             "stdout.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes. Defaults to the "
+                             "number of CPUs.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Target number of bytes per shard.")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Largest number of shards in flight. Defaults "
+                             "to twice the number of workers.")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Write results as shards finish instead of in "
+                             "input order.")
+    args = parser.parse_args()
+
+    if args.output == "-":
+        process_file_parallel(args.input, sys.stdout.buffer, args.workers,
+                              args.chunk_size, args.window,
+                              not args.unordered)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "wb") as out:
+            process_file_parallel(args.input, out, args.workers,
+                                  args.chunk_size, args.window,
+                              not args.unordered)
@@ -0,0 +1,186 @@
+"""Parallel breadth-first search over the compressed sparse row graphs of
+csr_graph.
+
+The speedup over the vectorized engine is unverified. It has only been
+measured on a single CPU, where it is slower: on a random graph with 1M
+vertices and 5M edges, the vectorized engine takes 0.97s and two workers take
+1.75s on the first call, which writes the snapshot, and 1.34s afterwards.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from csr_graph import CSRGraph
+from instrumentation import add_counters
+from vectorized_reachability import check_numpy, expand_frontier, \
+    reachable_mask
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Graphs with fewer edges than this are traversed serially by default. Below
+# this size starting the workers costs more than the traversal.
+MIN_PARALLEL_EDGES = 1000000
+
+# Frontiers smaller than this are expanded by the parent process.
+MIN_PARALLEL_FRONTIER = 4096
+
+# Arrays attached by every worker process.
+worker_arrays = {}
+
+
+def attach_worker(path, mask_name, length):
+    """
+    Function run once in every worker process to map the graph snapshot and
+    attach the shared visited mask.
+
+    Parameters
+    ----------
+    path : str
+        Path of the graph snapshot.
+    mask_name : str
+        Name of the shared memory block holding the visited mask.
+    length : int
+        Number of vertices.
+    """
+
+    graph, _ = CSRGraph.load(path)
+    # The graph holds the memory map the arrays are views of.
+    worker_arrays["graph"] = graph
+    worker_arrays["offsets"], worker_arrays["targets"] = graph.numpy_arrays()
+    block = shared_memory.SharedMemory(name=mask_name)
+    worker_arrays["mask_block"] = block
+    worker_arrays["mask"] = np.ndarray((length,), dtype=np.uint8,
+                                       buffer=block.buf)
+
+
+def expand_chunk(chunk):
+    """
+    Function run in a worker process to expand part of a frontier. The new
+    vertices are marked as visited in the shared mask right away, so the
+    other workers skip most of them.
+
+    Parameters
+    ----------
+    chunk : numpy.ndarray
+        Positions of the vertices to expand.
+
+    Returns
+    -------
+    neighbors : numpy.ndarray
+        Unique positions of the targets of the chunk that were unvisited.
+    """
+
+    mask = worker_arrays["mask"]
+    neighbors = expand_frontier(worker_arrays["offsets"],
+                                worker_arrays["targets"], chunk)
+    neighbors = np.unique(neighbors[mask[neighbors] == 0])
+    mask[neighbors] = 1
+    return neighbors
+
+
+def parallel_reachable_mask(graph, root, workers=None,
+                            min_edges=MIN_PARALLEL_EDGES, counters=None):
+    """
+    Function to mark the vertices reachable from a root with a
+    level-synchronous breadth-first search spread over a process pool. The
+    workers map the graph snapshot, written once for graphs not loaded from
+    one, and share the visited mask, so only frontiers and newly found
+    vertices are sent between processes.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+        Graph to traverse. Pass the reverse graph to find the vertices that
+        can reach the root.
+    root : int
+        Position of the vertex to start from.
+    workers : int, default=None
+        Number of worker processes. Defaults to the number of CPUs.
+    min_edges : int, default=MIN_PARALLEL_EDGES
+        Graphs with fewer edges are traversed serially.
+    counters : dict, default=None
+        Dictionary to add the traversal counters to, as in add_counters.
+
+    Returns
+    -------
+    mask : numpy.ndarray
+        Boolean array indexed by vertex position. True if the vertex is
+        reachable from the root.
+    """
+
+    check_numpy()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or graph.num_edges() < min_edges:
+        return reachable_mask(graph, root, counters)
+
+    block = shared_memory.SharedMemory(create=True, size=max(len(graph), 1))
+    try:
+        return traverse_shared(graph, root, workers, block, counters)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def traverse_shared(graph, root, workers, block, counters=None):
+    """
+    Function to run the parallel traversal with the visited mask in a shared
+    memory block. The block is only referenced from this function, so it
+    can be closed once it returns.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+        Graph to traverse.
+    root : int
+        Position of the vertex to start from.
+    workers : int
+        Number of worker processes.
+    block : multiprocessing.shared_memory.SharedMemory
+        Block of at least one byte per vertex for the visited mask.
+    counters : dict, default=None
+        Dictionary to add the traversal counters to, as in add_counters.
+
+    Returns
+    -------
+    mask : numpy.ndarray
+        Boolean array indexed by vertex position. True if the vertex is
+        reachable from the root.
+    """
+
+    offsets, targets = graph.numpy_arrays()
+    mask = np.ndarray((len(graph),), dtype=np.uint8, buffer=block.buf)
+    mask[:] = 0
+    mask[root] = 1
+    # Position of every vertex in the frontier being built, to drop the
+    # vertices found by two workers without sorting.
+    slot = np.zeros(len(graph), dtype=np.int64)
+    frontier = np.array([root], dtype=np.int64)
+
+    visited = relaxed = widest = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker,
+                             initargs=(graph.shared_path(), block.name,
+                                       len(graph))) as pool:
+        while frontier.size:
+            visited += frontier.size
+            widest = max(widest, frontier.size)
+            relaxed += int((offsets[frontier + 1] - offsets[frontier]).sum())
+            if frontier.size < MIN_PARALLEL_FRONTIER:
+                neighbors = expand_frontier(offsets, targets, frontier)
+                frontier = np.unique(neighbors[mask[neighbors] == 0])
+                mask[frontier] = 1
+                continue
+            # Workers only mark vertices, so a vertex is in the results of
+            # two chunks only if both read the mask before either marked it.
+            chunks = np.array_split(frontier, workers)
+            frontier = np.concatenate(list(pool.map(expand_chunk, chunks)))
+            positions = np.arange(frontier.size)
+            slot[frontier] = positions
+            frontier = frontier[slot[frontier] == positions]
+    if counters is not None:
+        add_counters(counters, visited, relaxed, widest)
+    return mask.astype(bool)
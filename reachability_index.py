@@ -0,0 +1,379 @@
+import mmap
+import struct
+import time
+import zlib
+from array import array
+
+from csr_graph import CSRGraph
+
+# Index file header: magic, version, label item size, number of vertices,
+# number of components, number of in-labels, number of out-labels and the
+# fingerprint of the graph the index was built for.
+INDEX_MAGIC = b"REACHIDX"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<8sIIqqqqq")
+
+
+def graph_fingerprint(graph):
+    """
+    Function to compute a checksum of the structure of a graph, used to tell
+    whether a saved index belongs to it.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+        Graph to checksum.
+
+    Returns
+    -------
+    fingerprint : int
+        CRC32 of the number of vertices, the offsets and the targets.
+    """
+
+    fingerprint = zlib.crc32(struct.pack("<q", len(graph)))
+    fingerprint = zlib.crc32(graph.offsets, fingerprint)
+    return zlib.crc32(graph.targets, fingerprint)
+
+
+def labels_intersect(labels_a, labels_b):
+    """
+    Function to check whether two sorted label lists share a label.
+
+    Parameters
+    ----------
+    labels_a, labels_b : array-like
+        Sorted landmark ranks.
+
+    Returns
+    -------
+    intersect : bool
+        True if a rank appears in both lists.
+    """
+
+    i = j = 0
+    len_a = len(labels_a)
+    len_b = len(labels_b)
+    while i < len_a and j < len_b:
+        a = labels_a[i]
+        b = labels_b[j]
+        if a == b:
+            return True
+        if a < b:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+class ReachabilityIndex:
+    """Class to answer "can X reach Y" queries for any pair of vertices of
+    the graph of a RootReachability object without a traversal per query.
+
+    The graph is condensed into its strongly connected components and the
+    component graph is labelled with pruned landmark labels. Every component
+    c gets an out-label, the landmarks reachable from c, and an in-label, the
+    landmarks that reach c. c reaches d if and only if the out-label of c and
+    the in-label of d share a landmark. Landmarks are processed in order of
+    decreasing degree, and a traversal from a landmark stops at every
+    component whose reachability is already covered by earlier landmarks,
+    which keeps the labels small.
+
+    Components are numbered in topological order, which rejects most
+    unreachable pairs before the labels are looked at.
+
+    Attributes
+    ----------
+    reachability : RootReachability
+        Object holding the graph.
+    component : array-like
+        Array indexed by vertex position with the component of every vertex.
+    count : int
+        Number of components.
+    in_offsets, in_labels : array-like
+        In-labels of the components, as offsets and sorted landmark ranks.
+    out_offsets, out_labels : array-like
+        Out-labels of the components, as offsets and sorted landmark ranks.
+    fingerprint : int
+        Fingerprint of the graph the index was built for.
+    build_seconds : float
+        Time taken to build the index, or to load it.
+    mapping : mmap.mmap
+        Memory map backing the arrays if the index was loaded, else None.
+    """
+
+    def __init__(self, reachability, path=None):
+        """
+        Constructor to build the index, or to load it from a file written by
+        save.
+
+        Parameters
+        ----------
+        reachability : RootReachability
+            Object holding the graph.
+        path : str, default=None
+            Path of a saved index. If None, the index is built.
+
+        Raises
+        ------
+        ValueError
+            If the file is not an index, or was built for a different graph.
+        """
+
+        self.reachability = reachability
+        self.component = None
+        self.count = 0
+        self.in_offsets = None
+        self.in_labels = None
+        self.out_offsets = None
+        self.out_labels = None
+        self.fingerprint = graph_fingerprint(reachability.radj)
+        self.mapping = None
+
+        start = time.perf_counter()
+        if path is None:
+            self.build()
+        else:
+            self.load(path)
+        self.build_seconds = time.perf_counter() - start
+
+    def build(self):
+        """
+        Function to compute the pruned landmark labels of the component
+        graph.
+
+        Edges of the reverse graph point from a vertex to the vertices that
+        point to it, so component c reaches component d in the component
+        graph when the vertices of d can reach the vertices of c.
+        """
+
+        condensation = self.reachability.condense()
+        dag = condensation.dag
+        rdag = dag.transpose()
+        count = condensation.count
+        self.component = condensation.component
+        self.count = count
+
+        landmarks = sorted(range(count), key=lambda c: -(len(dag[c]) + 1) *
+                           (len(rdag[c]) + 1))
+        in_labels = [[] for _ in range(count)]
+        out_labels = [[] for _ in range(count)]
+        visited = array("q", [-1]) * count
+
+        stamp = 0
+        for rank, c in enumerate(landmarks):
+            # Components reachable from c get c in their in-label, components
+            # reaching c get it in their out-label.
+            for labels, other, graph in ((in_labels, out_labels[c], dag),
+                                         (out_labels, in_labels[c], rdag)):
+                stamp += 1
+                visited[c] = stamp
+                queue = [c]
+                for d in queue:
+                    if d != c and labels_intersect(other, labels[d]):
+                        continue
+                    labels[d].append(rank)
+                    for e in graph[d]:
+                        if visited[e] != stamp:
+                            visited[e] = stamp
+                            queue.append(e)
+
+        self.in_offsets, self.in_labels = self.pack(in_labels)
+        self.out_offsets, self.out_labels = self.pack(out_labels)
+
+    def pack(self, labels):
+        """
+        Function to pack a list of label lists into flat arrays.
+
+        Parameters
+        ----------
+        labels : array-like
+            List of sorted landmark ranks for every component.
+
+        Returns
+        -------
+        offsets : array-like
+            Array of length count + 1 with the start of every label.
+        flat : array-like
+            Concatenated labels.
+        """
+
+        offsets = array("q", [0])
+        flat = array(CSRGraph.typecode(self.count))
+        for label in labels:
+            flat.extend(label)
+            offsets.append(len(flat))
+        return offsets, flat
+
+    def position(self, v):
+        """
+        Function to get the integer position of a vertex.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        position : int
+            Integer position of the vertex.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist in the graph.
+        """
+
+        if v not in self.reachability.vertex_index:
+            raise ValueError("Vertex {} doesn't exist in the input "
+                             "structure.".format(v))
+        return self.reachability.vertex_index[v]
+
+    def component_reaches(self, c, d):
+        """
+        Function to check whether component c reaches component d in the
+        component graph of the reverse graph.
+
+        Parameters
+        ----------
+        c, d : int
+            Component numbers.
+
+        Returns
+        -------
+        reaches : bool
+            True if there is a path from c to d.
+        """
+
+        if c == d:
+            return True
+        # Every edge goes from a higher component number to a lower one.
+        if c < d:
+            return False
+        return labels_intersect(
+            self.out_labels[self.out_offsets[c]:self.out_offsets[c + 1]],
+            self.in_labels[self.in_offsets[d]:self.in_offsets[d + 1]])
+
+    def reaches(self, _from, _to):
+        """
+        Function to check whether there is a path from one vertex to another
+        along the edges of the graph.
+
+        Parameters
+        ----------
+        _from : str
+            String denoting the id of the vertex to start from.
+        _to : str
+            String denoting the id of the vertex to reach.
+
+        Returns
+        -------
+        reaches : bool
+            True if _to can be reached from _from.
+
+        Raises
+        ------
+        ValueError
+            If either vertex doesn't exist in the graph.
+        """
+
+        component = self.component
+        return self.component_reaches(component[self.position(_to)],
+                                      component[self.position(_from)])
+
+    def num_labels(self):
+        """
+        Function to get the total number of landmark entries in the labels.
+
+        Returns
+        -------
+        num_labels : int
+            Number of in-label and out-label entries.
+        """
+
+        return len(self.in_labels) + len(self.out_labels)
+
+    def nbytes(self):
+        """
+        Function to get the memory taken by the index arrays.
+
+        Returns
+        -------
+        nbytes : int
+            Number of bytes.
+        """
+
+        return sum(memoryview(a).nbytes for a in (
+            self.component, self.in_offsets, self.in_labels, self.out_offsets,
+            self.out_labels))
+
+    def save(self, path):
+        """
+        Function to write the index to a file that can be opened by passing
+        its path to the constructor. The layout is the header, the component
+        of every vertex, the in and out offsets and the in and out labels,
+        every label array padded to 8 bytes.
+
+        Parameters
+        ----------
+        path : str
+            Path of the index file.
+        """
+
+        itemsize = memoryview(self.in_labels).itemsize
+        with open(path, "wb") as f:
+            f.write(INDEX_HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION, itemsize, len(self.component),
+                self.count, len(self.in_labels), len(self.out_labels),
+                self.fingerprint))
+            f.write(bytes(self.component))
+            f.write(bytes(self.in_offsets))
+            f.write(bytes(self.out_offsets))
+            for labels in (self.in_labels, self.out_labels):
+                data = bytes(labels)
+                f.write(data)
+                f.write(bytes(-len(data) % 8))
+
+    def load(self, path):
+        """
+        Function to open an index written by save. The file is memory-mapped
+        and the arrays are views into it.
+
+        Parameters
+        ----------
+        path : str
+            Path of the index file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not an index, or was built for a different graph.
+        """
+
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        if len(view) < INDEX_HEADER.size:
+            raise ValueError("{} is not a reachability index.".format(path))
+        magic, version, itemsize, n, count, n_in, n_out, fingerprint = \
+            INDEX_HEADER.unpack_from(view)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("{} is not a reachability index.".format(path))
+        if fingerprint != self.fingerprint:
+            raise ValueError("{} was built for a different graph."
+                             .format(path))
+
+        typecode = "i" if itemsize == 4 else "q"
+        pos = INDEX_HEADER.size
+        self.component = view[pos:pos + 8 * n].cast("q")
+        pos += 8 * n
+        self.in_offsets = view[pos:pos + 8 * (count + 1)].cast("q")
+        pos += 8 * (count + 1)
+        self.out_offsets = view[pos:pos + 8 * (count + 1)].cast("q")
+        pos += 8 * (count + 1)
+        self.in_labels = view[pos:pos + itemsize * n_in].cast(typecode)
+        pos += itemsize * n_in
+        pos += -pos % 8
+        self.out_labels = view[pos:pos + itemsize * n_out].cast(typecode)
+        self.count = count
+        self.mapping = mapping
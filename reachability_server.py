@@ -0,0 +1,417 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from dominator_tree import DominatorTree
+from graph_loader import load_json, load_ndjson, load_snapshot
+
+
+def load_graph(path):
+    """
+    Function to load a graph file, picking the loader from the extension:
+    ".json" files are read with load_json, ".ndjson" and ".jsonl" files with
+    load_ndjson, and anything else is opened as a binary snapshot.
+
+    Parameters
+    ----------
+    path : str
+        Path of the graph file.
+
+    Returns
+    -------
+    reachability : RootReachability
+        Object holding the reverse graph.
+    """
+
+    if path.endswith(".json"):
+        return load_json(path)
+    if path.endswith((".ndjson", ".jsonl")):
+        return load_ndjson(path)
+    return load_snapshot(path)
+
+
+class GraphState:
+    """Class to hold one version of the resident graph along with everything
+    precomputed to answer queries on it. A state is never modified once
+    built, so queries in flight keep a consistent view while a reload swaps
+    in a new one.
+
+    Attributes
+    ----------
+    version : int
+        Version number, incremented on every reload.
+    path : str
+        Path the graph was loaded from.
+    reachability : RootReachability
+        Object holding the graph.
+    dominators : DominatorTree
+        Dominator tree used for deletion queries.
+    orphan_nodes : array-like
+        List of nodes that cannot reach the root.
+    load_seconds : float
+        Time taken to load the graph and build the dominator tree.
+    """
+
+    def __init__(self, path, version):
+        """
+        Constructor to load a graph and precompute its dominator tree and
+        shortest path tree, so that no query has to traverse the graph.
+
+        Parameters
+        ----------
+        path : str
+            Path of the graph file.
+        version : int
+            Version number.
+        """
+
+        start = time.perf_counter()
+        self.version = version
+        self.path = path
+        self.reachability = load_graph(path)
+        self.dominators = DominatorTree(self.reachability)
+        self.reachability.mark_reachable(track_parents=True)
+        self.orphan_nodes = self.reachability.get_orphan_nodes()
+        self.load_seconds = time.perf_counter() - start
+
+
+class ReachabilityServer:
+    """Class to keep a graph resident and answer reachability queries over a
+    Unix socket or TCP with one JSON object per line.
+
+    Every request is an object with an "op" key and an optional "id" that is
+    echoed back. The operations are:
+
+    - "orphans": the nodes that cannot reach the root.
+    - "delete_edge" with "from" and "to": the nodes that would be orphaned
+      if the edge were deleted.
+    - "delete_node" with "node": the nodes that would be orphaned if the
+      node were deleted.
+    - "path" with "node": a shortest path from the node to the root.
+    - "reload" with an optional "path": load the graph again, or a new
+      graph, without dropping clients. The path must be the graph file the
+      server was started with or lie in one of the reload directories.
+    - "stats": the version, size and load time of the graph.
+
+    Every response has "ok", "version" and "latency_ms" keys, and "result"
+    or "error".
+
+    Attributes
+    ----------
+    state : GraphState
+        Current version of the graph.
+    reload_lock : asyncio.Lock
+        Lock serializing reloads.
+    server : asyncio.AbstractServer
+        Listening server, once started.
+    clients : dict
+        Dictionary mapping the tasks serving the connected clients to their
+        streams.
+    reload_paths : set
+        Real paths of the files that can be reloaded besides those in the
+        reload directories.
+    reload_dirs : array-like
+        List of real paths of the directories graphs can be reloaded from.
+    """
+
+    def __init__(self, path, reload_dirs=()):
+        """
+        Constructor to load the graph.
+
+        Parameters
+        ----------
+        path : str
+            Path of the graph file.
+        reload_dirs : array-like, default=()
+            List of directories graphs can be reloaded from, besides the
+            graph file itself.
+        """
+
+        self.state = GraphState(path, 1)
+        self.reload_lock = asyncio.Lock()
+        self.server = None
+        self.clients = {}
+        self.reload_paths = {os.path.realpath(path)}
+        self.reload_dirs = [os.path.realpath(d) for d in reload_dirs]
+
+    async def start(self, host="127.0.0.1", port=0, socket_path=None):
+        """
+        Function to start listening.
+
+        Parameters
+        ----------
+        host : str, default="127.0.0.1"
+            Address to listen on.
+        port : int, default=0
+            Port to listen on. 0 picks a free port.
+        socket_path : str, default=None
+            Path of a Unix socket to listen on instead of TCP.
+
+        Returns
+        -------
+        server : asyncio.AbstractServer
+            Listening server.
+        """
+
+        if socket_path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client,
+                                                          socket_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host,
+                                                     port)
+        return self.server
+
+    async def close(self):
+        """
+        Function to stop listening, disconnect the clients and wait for
+        their handlers to finish.
+        """
+
+        self.server.close()
+        # Closing the stream ends the handler at its next read.
+        for writer in self.clients.values():
+            writer.close()
+        await asyncio.gather(*self.clients, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """
+        Function to serve one client until it disconnects. Requests are
+        answered in the order they arrive on the connection.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Stream to read requests from.
+        writer : asyncio.StreamWriter
+            Stream to write responses to.
+        """
+
+        task = asyncio.current_task()
+        self.clients[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[task]
+            writer.close()
+
+    async def handle_line(self, line):
+        """
+        Function to answer a single request line.
+
+        Parameters
+        ----------
+        line : bytes
+            JSON encoded request.
+
+        Returns
+        -------
+        response : dict
+            Response to send back.
+        """
+
+        start = time.perf_counter()
+        # Queries answered while a reload is running use the old graph.
+        state = self.state
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise TypeError("Expected input is a dictionary!")
+            op = request.get("op")
+            if op == "reload":
+                state = await self.reload(request.get("path"))
+                result = self.stats(state)
+            else:
+                result = self.query(state, op, request)
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            # A bad request must never take the connection down.
+            response = {"ok": False, "error": str(e)}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        response["version"] = state.version
+        response["latency_ms"] = (time.perf_counter() - start) * 1000
+        return response
+
+    def query(self, state, op, request):
+        """
+        Function to answer a query against one version of the graph.
+
+        Parameters
+        ----------
+        state : GraphState
+            Version of the graph to query.
+        op : str
+            Name of the operation.
+        request : dict
+            Request holding the arguments of the operation.
+
+        Returns
+        -------
+        result : object
+            JSON serializable result.
+
+        Raises
+        ------
+        KeyError
+            If an argument is missing.
+        ValueError
+            If the operation is not recognized or a vertex or edge doesn't
+            exist in the graph.
+        """
+
+        if op == "orphans":
+            return state.orphan_nodes
+        if op == "delete_edge":
+            return state.dominators.orphans_if_edge_deleted(request["from"],
+                                                            request["to"])
+        if op == "delete_node":
+            return state.dominators.orphans_if_node_deleted(request["node"])
+        if op == "path":
+            return state.reachability.path_to_root(request["node"])
+        if op == "stats":
+            return self.stats(state)
+        raise ValueError("Unknown operation: {}.".format(op))
+
+    def stats(self, state):
+        """
+        Function to describe one version of the graph.
+
+        Parameters
+        ----------
+        state : GraphState
+            Version of the graph.
+
+        Returns
+        -------
+        stats : dict
+            Version, path, number of vertices, edges and orphan nodes, and
+            load time.
+        """
+
+        radj = state.reachability.radj
+        return {"version": state.version, "path": state.path,
+                "vertices": len(radj), "edges": radj.num_edges(),
+                "orphans": len(state.orphan_nodes),
+                "load_seconds": state.load_seconds}
+
+    async def reload(self, path=None):
+        """
+        Function to load a new version of the graph in a worker thread and
+        swap it in once it is ready. Clients stay connected, and queries
+        keep being answered from the old version in the meantime.
+
+        Parameters
+        ----------
+        path : str, default=None
+            Path of the graph file. Defaults to the current one.
+
+        Returns
+        -------
+        state : GraphState
+            New version of the graph.
+
+        Raises
+        ------
+        ValueError
+            If the path is not allowed or the graph couldn't be loaded.
+        """
+
+        async with self.reload_lock:
+            if path is None:
+                path = self.state.path
+            self.check_reload_path(path)
+            loop = asyncio.get_running_loop()
+            try:
+                state = await loop.run_in_executor(None, GraphState, path,
+                                                   self.state.version + 1)
+            except Exception:
+                # Loader errors quote the file contents, which are not sent
+                # back to clients.
+                raise ValueError("Couldn't load graph {}.".format(path))
+            self.state = state
+            return state
+
+    def check_reload_path(self, path):
+        """
+        Function to check that a graph file can be reloaded.
+
+        Parameters
+        ----------
+        path : str
+            Path of the graph file.
+
+        Raises
+        ------
+        ValueError
+            If the path is not the graph file the server was started with
+            and doesn't lie in one of the reload directories.
+        """
+
+        if not isinstance(path, str):
+            raise ValueError("Expected path is a string.")
+        real = os.path.realpath(path)
+        if real in self.reload_paths:
+            return
+        for d in self.reload_dirs:
+            if os.path.commonpath([d, real]) == d:
+                return
+        raise ValueError("Reloading {} is not allowed.".format(path))
+
+
+async def serve(path, host="127.0.0.1", port=8765, socket_path=None,
+                reload_dirs=()):
+    """
+    Function to load a graph and serve it until cancelled.
+
+    Parameters
+    ----------
+    path : str
+        Path of the graph file.
+    host : str, default="127.0.0.1"
+        Address to listen on.
+    port : int, default=8765
+        Port to listen on.
+    socket_path : str, default=None
+        Path of a Unix socket to listen on instead of TCP.
+    reload_dirs : array-like, default=()
+        List of directories graphs can be reloaded from.
+    """
+
+    reachability_server = ReachabilityServer(path, reload_dirs)
+    server = await reachability_server.start(host, port, socket_path)
+    try:
+        await server.serve_forever()
+    finally:
+        await reachability_server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Keep a graph resident and answer reachability queries "
+                    "sent as JSON lines.")
+    parser.add_argument("graph", help="Graph file: .json, .ndjson or a "
+                                      "binary snapshot.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Unix socket path to listen on "
+                                         "instead of TCP.")
+    parser.add_argument("--reload-dir", action="append", default=[],
+                        help="Directory graphs can be reloaded from. May be "
+                             "given more than once.")
+    args = parser.parse_args()
+    asyncio.run(serve(args.graph, args.host, args.port, args.socket,
+                      args.reload_dir))
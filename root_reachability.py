@@ -1,5 +1,14 @@
 import json
+from array import array
 from ast import literal_eval
+from itertools import islice
+from condensation import ComponentDAG
+from csr_graph import CSRGraph
+from instrumentation import NO_PHASE, add_counters
+
+# States of a vertex in the explicit-stack dfs engine. Unknown vertices are 0.
+REACHES_ROOT = 1
+ORPHAN = 2
 
 class RootReachability:
     """Class to identify the group of nodes that cannot reach the root node
@@ -11,9 +20,30 @@ class RootReachability:
         Dictionary containing the strucutre.
     vertices : array-like
         List of vertex ids.
+    vertex_index : dict
+        Dictionary mapping every vertex id (including the root) to its
+        integer position.
     adj : dict
         Dictionary containing vertices as keys and the list of vertices to
         which they point as the values. Edge list.
+    radj : CSRGraph
+        Reverse graph indexed by integer vertex position. Entry i holds the
+        positions of the vertices that point to vertex i.
+    condensation : ComponentDAG
+        Strongly connected components of the reverse graph, computed on
+        first use and reused afterwards.
+    parent : array-like
+        Breadth-first search parent of every vertex in the reverse graph,
+        indexed by integer vertex position, recorded by the "linear" engine.
+        The parent is the next vertex on a shortest path to the root. -1 for
+        the root and for orphan nodes. None until the pass has run.
+    depth : array-like
+        Number of edges on a shortest path from every vertex to the root,
+        indexed by integer vertex position. -1 for orphan nodes. None until
+        the pass has run.
+    compact : bool
+        Whether only the reverse graph is kept, without the parsed input and
+        the edge lists.
     root : str
         Root node.
     non_orphan_nodes : array-like
@@ -22,10 +52,14 @@ class RootReachability:
         List of nodes that do not have a path to the root.
     done : bool
         Whether the root can be reached from a single vertex.
+    instrumentation : Instrumentation
+        Collector of phase times and traversal counters, or None when
+        instrumentation is disabled.
     """
 
     def __init__(self, input_from_user=True, json_input=None,
-                 edge_to_delete=None):
+                 edge_to_delete=None, compact=False, graph=None, root=None,
+                 instrumentation=None):
         """
         Constructor to initialize the graph variables.
 
@@ -36,14 +70,35 @@ class RootReachability:
             unit tests.
         json_input : str
             Input JSON string containing a list of components.
-        edge_to_delete : dict
+        edge_to_delete : dict, default=None
             Dictionary containing the from and to vertices of the edge to be
-            deleted.
+            deleted. If None with json_input, no edge is deleted.
+        compact : bool, default=False
+            Whether to keep only the compressed sparse row arrays. A JSON
+            string is then parsed straight into them, without holding the
+            parsed input or the edge lists. Input from the user is parsed
+            as usual and released once the reverse graph has been built.
+            The "dfs" engine is not available in this mode.
+        graph : CSRGraph, default=None
+            Prebuilt reverse graph, for example from one of the loaders in
+            graph_loader. Implies compact mode.
+        root : str, default=None
+            Root node. Required with graph.
+        instrumentation : Instrumentation, default=None
+            Collector of phase times and traversal counters. Nothing is
+            measured if None.
         """
 
+        self.instrumentation = instrumentation
+        self.compact = compact
         self.data = {}
         self.vertices = []
+        self.vertex_index = {}
         self.adj = {}
+        self.radj = CSRGraph([], array("q", [0]), array("i"))
+        self.condensation = None
+        self.parent = None
+        self.depth = None
         self.root = ""
         self.non_orphan_nodes = []
         self.orphan_nodes = []
@@ -51,8 +106,10 @@ class RootReachability:
 
         if input_from_user:
             self.get_data()
-        elif json_input is not None and edge_to_delete is not None:
+        elif json_input is not None:
             self.get_data(json_input, edge_to_delete)
+        elif graph is not None:
+            self.set_graph(graph, root)
         else:
             raise ValueError("No input provided. Initialize class to either "
                              "accept input from user to provide a JSON "
@@ -67,7 +124,9 @@ class RootReachability:
             Input JSON string containing a list of components.
         edge_to_delete : dict
             Dictionary containing the from and to vertices of the edge to be
-            deleted.
+            deleted, as a string. If None and json_input is given, no edge is
+            deleted. If None and json_input is None, the edge is read from
+            the user along with the structure.
 
         Returns
         -------
@@ -81,6 +140,9 @@ class RootReachability:
             If edge to be deleted doesn't exist in the graph.
             If dictionary format is invalid.
         """
+        if json_input is not None and self.compact:
+            self.load_compact(json_input, edge_to_delete)
+            return
         if json_input is None:
             text = """Please input the list of components as a dictionary in 
             a SINGLE LINE.\nFor example:\n
@@ -90,14 +152,21 @@ class RootReachability:
             data = literal_eval(input(text))
         else:
             # Try parsing the string.
-            try:
-                data = json.loads(json_input)
-            except ValueError:
-                raise ValueError("Couldn't parse input properly. Please check "
-                                 "input and try again.")
+            with self.phase("parse"):
+                try:
+                    data = json.loads(json_input)
+                except ValueError:
+                    raise ValueError("Couldn't parse input properly. Please "
+                                     "check input and try again.")
 
         self.data = data
-        self.construct_adjacency_lists()
+        with self.phase("adjacency"):
+            self.construct_adjacency_lists()
+        if edge_to_delete is None and json_input is not None:
+            with self.phase("reverse_adjacency"):
+                self.construct_reverse_adjacency_lists()
+            self.release()
+            return
         if edge_to_delete is None:
             text = """"Please input the edge to be deleted in the form of a 
                     dictionary in a SINGLE LINE.\n For example: {"from": "M01","to": "M02"}\nEnter input: """
@@ -106,17 +175,7 @@ class RootReachability:
         else:
             deleted_edge = literal_eval(edge_to_delete)
 
-        if not isinstance(deleted_edge, dict):
-            raise TypeError("Expected input is a dictionary!")
-
-        if "from" in deleted_edge and "to" in deleted_edge and len(
-                deleted_edge) == 2:
-            deleted_from = deleted_edge["from"]
-            deleted_to = deleted_edge["to"]
-        else:
-            raise ValueError(
-                "Dictionary representing edge to be deleted is "
-                "in an invalid format.")
+        deleted_from, deleted_to = self.check_edge(deleted_edge)
         if deleted_from in self.adj and deleted_to in self.adj[
             deleted_from]:
             self.adj[deleted_from].remove(deleted_to)
@@ -126,6 +185,167 @@ class RootReachability:
                              "try again.".format(deleted_from,
                                                  deleted_to))
 
+        with self.phase("reverse_adjacency"):
+            self.construct_reverse_adjacency_lists()
+        self.release()
+
+    def check_edge(self, deleted_edge):
+        """
+        Function to check the format of the edge to be deleted.
+
+        Parameters
+        ----------
+        deleted_edge : dict
+            Dictionary containing the from and to vertices of the edge.
+
+        Returns
+        -------
+        deleted_from : str
+            Vertex the edge starts from.
+        deleted_to : str
+            Vertex the edge points to.
+
+        Raises
+        ------
+        TypeError
+            If the edge is not a dictionary.
+        ValueError
+            If the dictionary format is invalid.
+        """
+
+        if not isinstance(deleted_edge, dict):
+            raise TypeError("Expected input is a dictionary!")
+
+        if "from" in deleted_edge and "to" in deleted_edge and len(
+                deleted_edge) == 2:
+            return deleted_edge["from"], deleted_edge["to"]
+        raise ValueError(
+            "Dictionary representing edge to be deleted is "
+            "in an invalid format.")
+
+    def load_compact(self, json_input, edge_to_delete=None):
+        """
+        Function to build the reverse graph straight from the JSON string in
+        compact mode, one node and edge at a time, so that neither the parsed
+        document nor the edge lists are ever held alongside it.
+
+        Parameters
+        ----------
+        json_input : str
+            Input JSON string containing the graph.
+        edge_to_delete : str, default=None
+            Dictionary containing the from and to vertices of the edge to be
+            deleted, as a string. If None, no edge is deleted.
+
+        Raises
+        ------
+        TypeError
+            If the edge to be deleted is not a dictionary.
+        ValueError
+            If the JSON string couldn't be parsed properly.
+            If the edge to be deleted doesn't exist in the graph.
+            If no root is specified.
+        """
+
+        # graph_loader builds on this module, so it is imported here.
+        from graph_loader import GraphBuilder, StringStream, parse_json
+
+        builder = GraphBuilder()
+        with self.phase("parse"):
+            parse_json(StringStream(json_input), builder)
+        if edge_to_delete is not None:
+            builder.delete_edge(*self.check_edge(literal_eval(edge_to_delete)))
+        with self.phase("reverse_adjacency"):
+            graph = builder.build()
+        self.set_graph(graph, builder.root)
+
+    def release(self):
+        """
+        Function to drop the parsed input and the edge lists in compact mode,
+        once the reverse graph has been built.
+        """
+
+        if self.compact:
+            self.data = {}
+            self.adj = {}
+            self.vertices = self.radj.ids
+
+    def phase(self, name):
+        """
+        Function to time a phase if instrumentation is enabled.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase.
+
+        Returns
+        -------
+        context : context manager
+            Context manager timing the phase, or one doing nothing.
+        """
+
+        if self.instrumentation is None:
+            return NO_PHASE
+        return self.instrumentation.phase(name)
+
+    def record_traversal(self, counters):
+        """
+        Function to record the counters kept by a traversal engine.
+
+        Parameters
+        ----------
+        counters : dict
+            Dictionary with the "vertices_visited", "edges_relaxed" and
+            "max_frontier" counters of the traversal.
+        """
+
+        self.instrumentation.count("vertices_visited",
+                                   counters["vertices_visited"])
+        self.instrumentation.count("edges_relaxed", counters["edges_relaxed"])
+        self.instrumentation.maximum("max_frontier", counters["max_frontier"])
+
+    def set_graph(self, graph, root):
+        """
+        Function to use a prebuilt reverse graph. Only the compressed sparse
+        row arrays are kept.
+
+        Parameters
+        ----------
+        graph : CSRGraph
+            Reverse graph. Entry i holds the positions of the vertices that
+            point to vertex i.
+        root : str
+            Root node.
+
+        Raises
+        ------
+        ValueError
+            If the root is not a vertex of the graph.
+        """
+
+        if root not in graph.index:
+            raise ValueError("Root {} doesn't exist in the input "
+                             "structure.".format(root))
+        self.compact = True
+        self.radj = graph
+        self.vertex_index = graph.index
+        self.vertices = graph.ids
+        self.root = root
+
+    def save_snapshot(self, path):
+        """
+        Function to write the reverse graph and the root to a binary snapshot
+        that can be opened with graph_loader.load_snapshot.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+        """
+
+        self.radj.save(path, self.root)
+
     def construct_adjacency_lists(self):
         """
         Function to construct the adjacency lists associated with this
@@ -139,6 +359,13 @@ class RootReachability:
 
         self.root = self.data["root"]
         self.vertices = [node["id"] for node in self.data["nodes"]]
+        self.vertex_index = {}
+        for i, v in enumerate(self.vertices):
+            self.vertex_index.setdefault(v, i)
+
+        # The root is allowed to be missing from the list of nodes. Give it
+        # a position anyway so that the traversal can start from it.
+        self.vertex_index.setdefault(self.root, len(self.vertex_index))
 
         for edge in self.data["edges"]:
             _from = edge["from"]
@@ -150,16 +377,540 @@ class RootReachability:
             self.adj[_from].append(_to)
 
 
-    def get_orphan_nodes(self):
+    def construct_reverse_adjacency_lists(self):
+        """
+        Function to construct the reverse graph, indexed by integer vertex
+        position, from the current edge lists. Edges that refer to vertices
+        which are not part of the graph are ignored.
+        """
+
+        index = self.vertex_index
+        ids = [None] * len(index)
+        for v, i in index.items():
+            ids[i] = v
+
+        typecode = CSRGraph.typecode(len(ids))
+        sources = array(typecode)
+        targets = array(typecode)
+        for _from, _targets in self.adj.items():
+            if _from not in index:
+                continue
+            i = index[_from]
+            for _to in _targets:
+                if _to in index:
+                    sources.append(index[_to])
+                    targets.append(i)
+        self.radj = CSRGraph.from_edges(ids, sources, targets, index)
+
+    def condense(self):
+        """
+        Function to get the strongly connected components of the reverse
+        graph, computing them on first use.
+
+        Returns
+        -------
+        condensation : ComponentDAG
+            Condensation of the reverse graph.
+        """
+
+        if self.condensation is None:
+            self.condensation = ComponentDAG(self.radj)
+        return self.condensation
+
+    def mark_reachable(self, engine="linear", workers=None,
+                       track_parents=False, counters=None):
+        """
+        Function to mark the vertices that have a path to the root. A single
+        breadth-first search is performed from the root over the reverse
+        edges, so every vertex and edge is visited at most once.
+
+        Parameters
+        ----------
+        engine : str, default="linear"
+            "linear" expands one vertex at a time. "vectorized" expands a
+            whole level at a time with numpy. "parallel" spreads every level
+            over a process pool. "condensed" traverses the component graph
+            of the reverse graph, which is computed once and reused.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes,
+            defaults to the number of CPUs.
+        track_parents : bool, default=False
+            Only used by the "linear" engine. Whether to also record the
+            parent and depth arrays read by path_to_root, distance_to_root
+            and depth_histogram. Off by default since it slows the pass
+            down; those functions turn it on the first time they need it.
+        counters : dict, default=None
+            Dictionary to which the engine adds the number of vertices it
+            visits and edges it relaxes, and in which it raises the size of
+            its largest frontier, under the keys "vertices_visited",
+            "edges_relaxed" and "max_frontier". The "condensed" engine
+            counts components and edges of the component graph. Nothing is
+            counted if None.
+
+        Returns
+        -------
+        reached : bytearray
+            Flags indexed by integer vertex position. Non-zero if the vertex
+            can reach the root.
+        """
+
+        radj = self.radj
+        r = self.vertex_index[self.root]
+        # numpy is only imported once one of its engines is used, so that
+        # the other engines don't pay for it.
+        if engine == "vectorized":
+            from vectorized_reachability import reachable_mask
+            return bytearray(reachable_mask(radj, r, counters).tobytes())
+        if engine == "parallel":
+            from parallel_reachability import parallel_reachable_mask
+            return bytearray(parallel_reachable_mask(
+                radj, r, workers, counters=counters).tobytes())
+        if engine == "condensed":
+            return self.condense().reachable_vertices(r, counters)
+
+        reached = bytearray(len(radj))
+        reached[r] = 1
+        if not track_parents and counters is None:
+            queue = [r]
+            # The queue grows while we iterate over it.
+            for v in queue:
+                for w in radj[v]:
+                    if not reached[w]:
+                        reached[w] = 1
+                        queue.append(w)
+            return reached
+
+        parent = depth = None
+        if track_parents:
+            typecode = CSRGraph.typecode(len(radj))
+            parent = array(typecode, [-1]) * len(radj)
+            depth = array(typecode, [-1]) * len(radj)
+            depth[r] = 0
+        visited = relaxed = widest = 0
+        # Expand one level at a time. Every vertex is reached first from a
+        # vertex of the level before, which is its parent on a shortest path
+        # to the root.
+        frontier = [r]
+        d = 0
+        while frontier:
+            visited += len(frontier)
+            widest = max(widest, len(frontier))
+            d += 1
+            next_frontier = []
+            for v in frontier:
+                targets = radj[v]
+                relaxed += len(targets)
+                for w in targets:
+                    if not reached[w]:
+                        reached[w] = 1
+                        next_frontier.append(w)
+                        if parent is not None:
+                            parent[w] = v
+                            depth[w] = d
+            frontier = next_frontier
+        if track_parents:
+            self.parent = parent
+            self.depth = depth
+        if counters is not None:
+            add_counters(counters, visited, relaxed, widest)
+        return reached
+
+    def position(self, v):
+        """
+        Function to get the integer position of a vertex, running the
+        "linear" pass with parent tracking first if the parent array hasn't
+        been recorded yet.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        position : int
+            Integer position of the vertex.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist in the graph.
+        """
+
+        if v not in self.vertex_index:
+            raise ValueError("Vertex {} doesn't exist in the input "
+                             "structure.".format(v))
+        if self.parent is None:
+            self.mark_reachable(track_parents=True)
+        return self.vertex_index[v]
+
+    def path_to_root(self, v):
+        """
+        Function to get a shortest path from a vertex to the root by following
+        the recorded parents, in O(path length).
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        path : array-like
+            List of vertex ids from v to the root, both included. Empty if v
+            is an orphan node.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist in the graph.
+        """
+
+        i = self.position(v)
+        if self.depth[i] == -1:
+            return []
+        ids = self.radj.ids
+        parent = self.parent
+        path = [ids[i]]
+        while parent[i] != -1:
+            i = parent[i]
+            path.append(ids[i])
+        return path
+
+    def distance_to_root(self, v):
+        """
+        Function to get the number of edges on a shortest path from a vertex
+        to the root.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+
+        Returns
+        -------
+        distance : int
+            Number of edges, or -1 if v is an orphan node.
+
+        Raises
+        ------
+        ValueError
+            If the vertex doesn't exist in the graph.
+        """
+
+        return self.depth[self.position(v)]
+
+    def depth_histogram(self):
+        """
+        Function to count the vertices at every distance from the root.
+
+        Returns
+        -------
+        histogram : array-like
+            List whose entry d is the number of vertices d edges away from
+            the root. Entry 0 counts the root itself. Orphan nodes are not
+            counted.
+        """
+
+        if self.parent is None:
+            self.mark_reachable(track_parents=True)
+        histogram = []
+        for d in self.depth:
+            if d == -1:
+                continue
+            while len(histogram) <= d:
+                histogram.append(0)
+            histogram[d] += 1
+        return histogram
+
+    def get_orphan_nodes(self, engine="linear", recursive=False,
+                         workers=None):
         """
         Function to get the list of orphan nodes that cannot reach the root.
 
+        Parameters
+        ----------
+        engine : str, default="linear"
+            Algorithm used to find the orphan nodes. "linear" performs a
+            single traversal from the root over the reverse edges in
+            O(V + E). "vectorized" performs the same traversal one level at
+            a time with numpy. "parallel" spreads every level over a process
+            pool and falls back to "vectorized" for small graphs.
+            "condensed" traverses the reusable component graph. "dfs"
+            performs a dfs from every vertex.
+        recursive : bool, default=False
+            Only used by the "dfs" engine. Whether to use the recursive dfs,
+            which is limited by the interpreter recursion limit, instead of
+            the explicit-stack dfs.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes,
+            defaults to the number of CPUs.
+
+        Returns
+        -------
+        orphan_nodes : array-like
+            List of nodes that cannot reach the root.
+
+        Raises
+        ------
+        ValueError
+            If the engine is not recognized.
+        """
+
+        if engine == "dfs":
+            if self.compact:
+                raise ValueError("The dfs engine needs the edge lists, which "
+                                 "are not kept in compact mode.")
+            if self.instrumentation is None:
+                return self.get_orphan_nodes_dfs(recursive)
+            counters = {}
+            with self.phase("traversal"):
+                orphan_nodes = self.get_orphan_nodes_dfs(recursive, counters)
+            if counters:
+                self.record_traversal(counters)
+            return orphan_nodes
+        self.check_engine(engine)
+
+        reached = self.traverse(engine, workers)
+        root = self.root
+        with self.phase("collect"):
+            if self.vertices is self.radj.ids:
+                # Vertices are listed by position, so no id lookups are
+                # needed.
+                ids = self.vertices
+                r = self.vertex_index[root]
+                self.non_orphan_nodes = [ids[i] for i in range(len(ids)) if
+                                         reached[i] and i != r]
+                self.orphan_nodes = [ids[i] for i in range(len(ids)) if
+                                     not reached[i] and i != r]
+                return self.orphan_nodes
+
+            index = self.vertex_index
+            self.non_orphan_nodes = [v for v in self.vertices if
+                                     reached[index[v]] and v != root]
+            self.orphan_nodes = [v for v in self.vertices if
+                                 not reached[index[v]] and v != root]
+            return self.orphan_nodes
+
+    def traverse(self, engine, workers=None):
+        """
+        Function to run mark_reachable as the timed "traversal" phase and
+        record the counters it keeps if instrumentation is enabled.
+
+        Parameters
+        ----------
+        engine : str
+            Traversal engine, as in mark_reachable.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes.
+
+        Returns
+        -------
+        reached : bytearray
+            Flags returned by mark_reachable.
+        """
+
+        if self.instrumentation is None:
+            return self.mark_reachable(engine, workers)
+        counters = {}
+        with self.phase("traversal"):
+            reached = self.mark_reachable(engine, workers, counters=counters)
+        self.record_traversal(counters)
+        return reached
+
+    def check_engine(self, engine):
+        """
+        Function to check the name of a single-traversal engine.
+
+        Parameters
+        ----------
+        engine : str
+            Name of the engine.
+
+        Raises
+        ------
+        ValueError
+            If the engine is not recognized.
+        """
+
+        if engine not in ("linear", "vectorized", "parallel", "condensed"):
+            raise ValueError("Unknown engine: {}. Allowed engines are "
+                             "linear, vectorized, parallel, condensed and "
+                             "dfs.".format(engine))
+
+    def iter_orphan_nodes(self, engine="linear", chunk_size=None,
+                          workers=None):
+        """
+        Generator to yield the orphan nodes one at a time, or in chunks, as
+        the reachability flags are scanned. No list of all the orphan nodes
+        is built, so callers can stop early or stream the ids elsewhere.
+
+        Parameters
+        ----------
+        engine : str, default="linear"
+            Traversal engine, as in get_orphan_nodes. "dfs" is not supported.
+        chunk_size : int, default=None
+            If given, lists of up to this many nodes are yielded instead of
+            single nodes.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes.
+
+        Yields
+        ------
+        orphan_node : str or array-like
+            Node that cannot reach the root, or a list of such nodes.
+
+        Raises
+        ------
+        ValueError
+            If the engine is not recognized or chunk_size is not positive.
+        """
+
+        self.check_engine(engine)
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Chunk size must be positive.")
+
+        reached = self.traverse(engine, workers)
+        root = self.root
+        if self.vertices is self.radj.ids:
+            ids = self.vertices
+            r = self.vertex_index[root]
+            orphans = (ids[i] for i in range(len(ids)) if
+                       not reached[i] and i != r)
+        else:
+            index = self.vertex_index
+            orphans = (v for v in self.vertices if
+                       not reached[index[v]] and v != root)
+
+        if chunk_size is None:
+            yield from orphans
+            return
+        while True:
+            chunk = list(islice(orphans, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def has_orphans(self, engine="linear", workers=None):
+        """
+        Function to check whether any node cannot reach the root. The scan
+        stops at the first orphan node.
+
+        Parameters
+        ----------
+        engine : str, default="linear"
+            Traversal engine, as in get_orphan_nodes.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes.
+
+        Returns
+        -------
+        has_orphans : bool
+            True if there is at least one orphan node.
+        """
+
+        for _ in self.iter_orphan_nodes(engine, workers=workers):
+            return True
+        return False
+
+    def first_orphan_nodes(self, n, engine="linear", workers=None):
+        """
+        Function to get the first orphan nodes, in the order the vertices
+        are listed.
+
+        Parameters
+        ----------
+        n : int
+            Maximum number of nodes to return.
+        engine : str, default="linear"
+            Traversal engine, as in get_orphan_nodes.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes.
+
+        Returns
+        -------
+        orphan_nodes : array-like
+            List of up to n nodes that cannot reach the root.
+        """
+
+        return list(islice(self.iter_orphan_nodes(engine, workers=workers),
+                           n))
+
+    def write_orphan_nodes(self, f, engine="linear", chunk_size=65536,
+                           workers=None):
+        """
+        Function to write the orphan nodes to a file, one per line, a chunk
+        at a time.
+
+        Parameters
+        ----------
+        f : str or file
+            Path of the file, or a text file object.
+        engine : str, default="linear"
+            Traversal engine, as in get_orphan_nodes.
+        chunk_size : int, default=65536
+            Number of nodes written at a time.
+        workers : int, default=None
+            Only used by the "parallel" engine. Number of worker processes.
+
+        Returns
+        -------
+        count : int
+            Number of nodes written.
+        """
+
+        if isinstance(f, str):
+            with open(f, "w", encoding="utf-8") as stream:
+                return self.write_orphan_nodes(stream, engine, chunk_size,
+                                               workers)
+        count = 0
+        for chunk in self.iter_orphan_nodes(engine, chunk_size, workers):
+            f.write("\n".join(chunk))
+            f.write("\n")
+            count += len(chunk)
+        return count
+
+    def get_orphan_nodes_dfs(self, recursive=False, counters=None):
+        """
+        Function to get the list of orphan nodes that cannot reach the root
+        by performing a dfs from every vertex not settled yet. This is the
+        original algorithm and is kept as a reference engine.
+
+        Parameters
+        ----------
+        recursive : bool, default=False
+            Whether to use the original recursive dfs, which is quadratic and
+            raises RecursionError on long chains, instead of the
+            explicit-stack dfs. The explicit-stack dfs keeps the state of
+            every vertex in a single bytearray, and settles every vertex it
+            visits, so no vertex is visited by two searches.
+        counters : dict, default=None
+            Only used by the explicit-stack dfs. Dictionary to add the
+            traversal counters of the searches to, as in add_counters. The
+            frontier is the stack of vertices being searched.
+
         Returns
         -------
         orphan_nodes : array-like
             List of nodes that cannot reach the root.
         """
 
+        if not recursive:
+            index = self.vertex_index
+            # State of every vertex by position: unknown, reaches the root,
+            # or proven orphan by an exhaustive search.
+            state = bytearray(len(index))
+            state[index[self.root]] = REACHES_ROOT
+            for v in self.vertices:
+                if not state[index[v]]:
+                    self.dfs_iterative(v, state, counters)
+            self.non_orphan_nodes = [v for v in self.vertices if
+                                     state[index[v]] == REACHES_ROOT and
+                                     v != self.root]
+            self.orphan_nodes = [v for v in self.vertices if
+                                 state[index[v]] == ORPHAN]
+            return self.orphan_nodes
+
         # Loop through the vertices and perform dfs to see if the root can be
         # reached from the current vertex. If yes, add it to the list of
         # non-orphan nodes and continue.
@@ -224,6 +975,85 @@ class RootReachability:
                     if not marked[self.vertices.index(w)]:
                         self.dfs(w, marked)
 
+    def dfs_iterative(self, v, state, counters=None):
+        """
+        Function to perform depth-first search from a given vertex v using an
+        explicit stack instead of recursion, so the depth of the search is
+        not limited by the interpreter recursion limit. Vertices already
+        known to reach the root end the search, and settled vertices are not
+        entered again.
+
+        The strongly connected components of the visited vertices are found
+        as in Tarjan's algorithm. A component that is finished without the
+        root being found only has edges to orphans, so its vertices are
+        orphans too. When the root is found, every vertex not settled yet
+        can reach the vertex the search is at, and so the root. Every
+        vertex visited is therefore settled by the search, and the searches
+        from all the vertices take O(V + E) together.
+
+        Parameters
+        ----------
+        v : str
+            String denoting the vertex id.
+        state : bytearray
+            State of every vertex by position, updated in place. Every
+            vertex visited is marked as reaching the root or as an orphan.
+        counters : dict, default=None
+            Dictionary to add the traversal counters to, as in add_counters.
+
+        Returns
+        -------
+        done : bool
+            Whether the root can be reached from v.
+        """
+
+        adj = self.adj
+        index = self.vertex_index
+        i = index[v]
+        # Visit number and lowest visit number reachable through the
+        # unfinished components, by position.
+        number = {i: 0}
+        low = {i: 0}
+        # Vertices visited whose component isn't finished yet.
+        unsettled = [i]
+        stack = [(i, iter(adj.get(v, ())))]
+        relaxed = widest = 0
+        while stack:
+            i, edges = stack[-1]
+            widest = max(widest, len(stack))
+            for w in edges:
+                relaxed += 1
+                j = index[w]
+                if state[j] == REACHES_ROOT:
+                    for k in unsettled:
+                        state[k] = REACHES_ROOT
+                    if counters is not None:
+                        add_counters(counters, len(number), relaxed, widest)
+                    return True
+                if state[j]:
+                    continue
+                if j not in number:
+                    number[j] = low[j] = len(number)
+                    unsettled.append(j)
+                    stack.append((j, iter(adj.get(w, ()))))
+                    break
+                # j is visited and unsettled, so in an unfinished component.
+                if number[j] < low[i]:
+                    low[i] = number[j]
+            else:
+                stack.pop()
+                if stack and low[i] < low[stack[-1][0]]:
+                    low[stack[-1][0]] = low[i]
+                if low[i] == number[i]:
+                    while True:
+                        k = unsettled.pop()
+                        state[k] = ORPHAN
+                        if k == i:
+                            break
+        if counters is not None:
+            add_counters(counters, len(number), relaxed, widest)
+        return False
+
 if __name__ == "__main__":
     rr = RootReachability()
-    print("Deleted array: ", rr.get_orphan_nodes())
\ No newline at end of file
+    print("Deleted array: ", rr.get_orphan_nodes())
@@ -0,0 +1,25 @@
+import unittest
+from benchmark_reachability import GENERATORS, build_reachability, \
+    compare, run_case
+
+
+class testBenchmarkReachability(unittest.TestCase):
+    def test_generators(self):
+        for family in GENERATORS:
+            a = build_reachability(family, 500, seed=1)
+            b = build_reachability(family, 500, seed=1)
+            self.assertEqual(list(a.radj.targets), list(b.radj.targets))
+            self.assertLessEqual(abs(a.radj.num_edges() - 500), 50)
+            self.assertEqual(a.get_orphan_nodes(),
+                             a.get_orphan_nodes(engine="condensed"))
+        with self.assertRaises(ValueError):
+            build_reachability("unknown", 10)
+
+    def test_compare(self):
+        result = run_case("random", 300, "linear", repeat=1)
+        baseline = {"random/300/linear": dict(result)}
+        self.assertEqual([], compare([result], baseline))
+        baseline["random/300/linear"]["edges_per_second"] *= 2
+        baseline["random/300/linear"]["peak_rss"] //= 2
+        self.assertEqual(2, len(compare([result], baseline, 0.2)))
+        self.assertEqual([], compare([result], {}))
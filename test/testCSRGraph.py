@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from array import array
+from csr_graph import CSRGraph
+import numpy.testing as np_tst
+
+
+class testCSRGraph(unittest.TestCase):
+    def test_from_edges(self):
+        ids = ["M00", "M01", "M02"]
+        g = CSRGraph.from_edges(ids, array("i", [1, 0, 1, 2]),
+                                array("i", [2, 2, 0, 0]))
+        self.assertEqual(3, len(g))
+        self.assertEqual(4, g.num_edges())
+        np_tst.assert_array_equal([2], list(g[0]))
+        np_tst.assert_array_equal([2, 0], list(g[1]))
+        np_tst.assert_array_equal([0], list(g[2]))
+        self.assertTrue(g.has_edge(1, 0))
+        self.assertFalse(g.has_edge(0, 1))
+        self.assertEqual(1, g.index["M01"])
+
+    def test_transpose(self):
+        ids = ["M00", "M01", "M02"]
+        g = CSRGraph.from_edges(ids, array("i", [1, 0, 1, 2]),
+                                array("i", [2, 2, 0, 0]))
+        t = g.transpose()
+        self.assertEqual(sorted((w, v) for v, w in g.edges()),
+                         sorted(t.edges()))
+        self.assertIs(g.index, t.index)
+
+    def test_snapshot(self):
+        ids = ["M00", "M01", "Mé"]
+        g = CSRGraph.from_edges(ids, array("i", [1, 0, 1, 2]),
+                                array("i", [2, 2, 0, 0]))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.bin")
+            g.save(path, "M01")
+            loaded, root = CSRGraph.load(path)
+            self.assertEqual("M01", root)
+            np_tst.assert_array_equal(ids, list(loaded.ids))
+            self.assertEqual(list(g.edges()), list(loaded.edges()))
+            self.assertEqual(2, loaded.index["Mé"])
+            self.assertEqual(sorted(g.transpose().edges()),
+                             sorted(loaded.transpose().edges()))
+
+            with open(path, "wb") as f:
+                f.write(b"not a snapshot")
+            with self.assertRaises(ValueError):
+                CSRGraph.load(path)
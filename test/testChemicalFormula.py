@@ -0,0 +1,66 @@
+import unittest
+from chemical_formula import molar_mass, parse_formula, prewarm
+from mass_calculator import MassCalculator
+from mixture import Mixture
+
+
+class testChemicalFormula(unittest.TestCase):
+    def setUp(self):
+        self.table = MassCalculator.element_table
+        self.w = MassCalculator.atomic_weights
+
+    def test_parse(self):
+        self.assertEqual({1: 2, 16: 1, 8: 4},
+                         parse_formula("H2SO4", self.table))
+        self.assertEqual({20: 1, 8: 2, 1: 2},
+                         parse_formula("Ca(OH)2", self.table))
+        self.assertEqual({26: 7, 6: 18, 7: 18},
+                         parse_formula("Fe4[Fe(CN)6]3", self.table))
+        self.assertEqual({29: 1, 16: 1, 8: 9, 1: 10},
+                         parse_formula("CuSO4·5H2O", self.table))
+        self.assertEqual(parse_formula("CuSO4·5H2O", self.table),
+                         parse_formula("CuSO4*5H2O", self.table))
+        self.assertEqual({27: 1}, parse_formula("Co", self.table))
+        self.assertEqual({6: 1, 8: 1}, parse_formula("CO", self.table))
+        for formula in ("", "h2o", "H2O)", "(H2O", "()", "H0", "Xx2",
+                        "CuSO4·", "H2 O", "(H]", "[H)2"):
+            with self.assertRaises(ValueError, msg=formula):
+                parse_formula(formula, self.table)
+
+        # Nesting deeper than the recursion limit is parsed, or rejected,
+        # without a RecursionError.
+        self.assertEqual({1: 1}, parse_formula("(" * 5000 + "H" + ")" * 5000,
+                                               self.table))
+        with self.assertRaises(ValueError):
+            MassCalculator.resolve_name("(" * 5000 + "H")
+
+    def test_molar_mass(self):
+        expected = 2 * self.w["hydrogen"] + self.w["sulfur"] + \
+            4 * self.w["oxygen"]
+        self.assertAlmostEqual(expected, molar_mass("H2SO4", self.table))
+        molar_mass.cache_clear()
+        self.assertEqual(["bad"], prewarm(["H2O", "NaCl", "bad"],
+                                          self.table))
+        self.assertEqual(2, molar_mass.cache_info().currsize)
+        molar_mass("H2O", self.table)
+        self.assertEqual(1, molar_mass.cache_info().hits)
+
+    def test_mass_calculator(self):
+        water = molar_mass("H2O", self.table)
+        components = [{"name": "H2O", "mass": 2, "units": "mol"},
+                      {"name": "NaCl", "mass": 5, "units": "grams"},
+                      {"name": "carbon", "mass": 1, "units": "mol"}]
+        mc = MassCalculator(input_from_user=False, components=components)
+        total = 2 * water + 5 + self.w["carbon"]
+        self.assertEqual("{:.2f}".format(total), mc.calculate_mass()[0])
+        mass_g, _ = MassCalculator.calculate_mass_batch([components])
+        self.assertEqual("{:.2f}".format(total), "{:.2f}".format(mass_g[0]))
+        # Cobalt is an element, carbon monoxide a compound.
+        self.assertEqual(27, MassCalculator.resolve_name("Co")[0])
+        self.assertEqual("CO", MassCalculator.resolve_name("CO")[0])
+        with self.assertRaises(ValueError):
+            MassCalculator.resolve_name("H2Q")
+
+        mixture = Mixture(components)
+        self.assertAlmostEqual(2 * water, mixture.element_mass_g("H2O"))
+        self.assertIn("H2O", mixture.element_masses_g())
@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy.testing as np_tst
+from component_batch import convert_json, convert_ndjson, read_batch, \
+    write_batch
+from mass_calculator import MassCalculator
+
+
+class testComponentBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.batch")
+        self.lists = [
+            [{"name": "carbon", "mass": 1.6, "units": "kilograms"},
+             {"name": "S", "mass": 36, "units": "mol"},
+             {"name": 8, "mass": 871, "units": "grams"}],
+            [{"name": "H2O", "mass": 2.5, "units": "Kilomoles"}],
+            [],
+            [{"name": "CuSO4·5H2O", "mass": 3, "units": "millimoles"},
+             {"name": "carbon", "mass": 10000, "units": "millipound"},
+             {"name": "H2O", "mass": 1, "units": "gigaounces"}]]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(4, write_batch(self.lists, self.path))
+        records, factors, formulas, n_lists = read_batch(self.path)
+        self.assertEqual(4, n_lists)
+        self.assertEqual(["H2O", "CuSO4·5H2O"], formulas)
+        self.assertEqual(7, len(records))
+        np_tst.assert_array_equal([6, 16, 8, 119, 120, 6, 119],
+                                  records["element"])
+        np_tst.assert_array_equal([0, 0, 0, 1, 3, 3, 3], records["list"])
+        np_tst.assert_array_equal([1.6, 36, 871, 2.5, 3, 10000, 1],
+                                  records["mass"])
+        self.assertEqual(7, len(factors))
+        # Records are views into the mapped file.
+        self.assertFalse(records.flags.owndata)
+
+        mass_g, mass_lb = MassCalculator.calculate_mass_file(self.path)
+        expected_g, expected_lb = MassCalculator.calculate_mass_batch(
+            self.lists)
+        np_tst.assert_array_equal(expected_g, mass_g)
+        np_tst.assert_array_equal(expected_lb, mass_lb)
+        for components, g, lb in zip(self.lists, mass_g, mass_lb):
+            mc = MassCalculator(input_from_user=False, components=components)
+            self.assertEqual(mc.calculate_mass(),
+                             ("{:.2f}".format(g), "{:.2f}".format(lb)))
+
+        # Spellings of the same unit share a code.
+        write_batch([[{"name": "carbon", "mass": 1, "units": "grams"},
+                      {"name": "carbon", "mass": 2, "units": "Gram"}]],
+                    self.path)
+        records, factors, _, _ = read_batch(self.path)
+        self.assertEqual(1, len(factors))
+        np_tst.assert_array_equal([0, 0], records["units"])
+
+    def test_convert(self):
+        lines = [json.dumps({"components": components, "id": i})
+                 for i, components in enumerate(self.lists)]
+        self.assertEqual(4, convert_ndjson(io.StringIO(
+            "\n".join(lines[:2]) + "\n\n" + "\n".join(lines[2:])),
+            self.path))
+        expected = MassCalculator.calculate_mass_batch(self.lists)
+        np_tst.assert_array_equal(expected[0], MassCalculator
+                                  .calculate_mass_file(self.path)[0])
+
+        self.assertEqual(1, convert_json(io.StringIO(lines[0]), self.path))
+        np_tst.assert_array_equal(expected[0][:1], MassCalculator
+                                  .calculate_mass_file(self.path)[0])
+        self.assertEqual(4, convert_json(io.StringIO(
+            "[" + ",".join(lines) + "]"), self.path))
+        self.assertEqual(4, read_batch(self.path)[3])
+
+        # Invalid records fail the conversion and leave no file behind.
+        os.remove(self.path)
+        with self.assertRaises(ValueError) as e:
+            convert_ndjson(io.StringIO(lines[0] + "\n" + json.dumps(
+                {"components": [{"name": "oxygene", "mass": 1,
+                                 "units": "mol"}]})), self.path)
+        self.assertIn("Line 2", str(e.exception))
+        self.assertFalse(os.path.exists(self.path))
+        with self.assertRaises(ValueError):
+            write_batch([[{"name": "carbon", "mass": 1, "units": "litre"}]],
+                        self.path)
+        with self.assertRaises(ValueError):
+            write_batch([[{"name": "carbon", "mass": 1}]], self.path)
+        with self.assertRaises(Exception):
+            write_batch([[{"name": "carbon", "mass": "1", "units": "g"}]],
+                        self.path)
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a batch file at all, just some bytes here......")
+        with self.assertRaises(ValueError):
+            read_batch(self.path)
+        write_batch(self.lists, self.path)
+        with open(self.path, "ab") as f:
+            f.write(b"\0")
+        with self.assertRaises(ValueError):
+            read_batch(self.path)
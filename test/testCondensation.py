@@ -0,0 +1,44 @@
+import unittest
+from array import array
+from csr_graph import CSRGraph
+from condensation import ComponentDAG
+from root_reachability import RootReachability
+from test.testRootReachability import random_graph
+import numpy.testing as np_tst
+
+
+class testCondensation(unittest.TestCase):
+    def test_simple(self):
+        # 0 <-> 1 -> 2 <-> 3 -> 4, and 4 -> 4.
+        ids = ["M00", "M01", "M02", "M03", "M04"]
+        g = CSRGraph.from_edges(ids, array("i", [0, 1, 1, 2, 3, 3, 4]),
+                                array("i", [1, 0, 2, 3, 2, 4, 4]))
+        cd = ComponentDAG(g)
+        self.assertEqual(3, cd.count)
+        self.assertEqual(cd.component[0], cd.component[1])
+        self.assertEqual(cd.component[2], cd.component[3])
+        np_tst.assert_array_equal([2, 3],
+                                  sorted(cd.members(cd.component[2])))
+        self.assertEqual(2, cd.dag.num_edges())
+        np_tst.assert_array_equal([1, 1, 1, 1, 1],
+                                  list(cd.reachable_vertices(0)))
+        np_tst.assert_array_equal([0, 0, 1, 1, 1],
+                                  list(cd.reachable_vertices(3)))
+
+    def test_topological_order(self):
+        for seed in range(5):
+            inp, delete = random_graph(60, 120, seed)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            cd = rr.condense()
+            self.assertIs(cd, rr.condense())
+            rank = {c: i for i, c in enumerate(cd.order)}
+            for c, d in cd.dag.edges():
+                self.assertNotEqual(c, d)
+                self.assertLess(rank[c], rank[d])
+            # Vertices in one component reach each other.
+            for c in range(cd.count):
+                members = list(cd.members(c))
+                reached = cd.reachable_vertices(members[0])
+                for v in members:
+                    self.assertTrue(reached[v])
@@ -0,0 +1,65 @@
+import json
+import unittest
+from root_reachability import RootReachability
+from dominator_tree import DominatorTree
+from test.testRootReachability import random_graph
+import numpy.testing as np_tst
+
+
+def orphans(data, edge_to_delete=None):
+    """Brute force orphan set of a graph given as a dictionary."""
+    rr = RootReachability(input_from_user=False, json_input=json.dumps(data),
+                          edge_to_delete=None if edge_to_delete is None else
+                          json.dumps(edge_to_delete))
+    return set(rr.get_orphan_nodes())
+
+
+class testDominatorTree(unittest.TestCase):
+    def test_simple(self):
+        inp = """{"nodes": [{"id": "M00"}, {"id": "M01"}, {"id": "M02"}, {"id": "M03"}],"edges": [{"from": "M01","to": "M00"}, {"from": "M02","to": "M01"}, {"from": "M03","to": "M01"}, {"from": "M03","to": "M02"}, {"from": "M02","to": "M03"}],"root": "M00"}
+                """
+        delete = """{"from": "M02", "to": "M03"}"""
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        dt = DominatorTree(rr)
+        np_tst.assert_array_equal(["M01", "M02", "M03"],
+                                  sorted(dt.orphans_if_edge_deleted("M01",
+                                                                    "M00")))
+        np_tst.assert_array_equal([], dt.orphans_if_edge_deleted("M03",
+                                                                 "M02"))
+        np_tst.assert_array_equal(["M02", "M03"],
+                                  sorted(dt.orphans_if_node_deleted("M01")))
+        with self.assertRaises(ValueError):
+            dt.orphans_if_edge_deleted("M00", "M01")
+        with self.assertRaises(ValueError):
+            dt.orphans_if_node_deleted("M00")
+
+    def test_against_brute_force(self):
+        for seed in range(10):
+            inp, delete = random_graph(30, 50, seed)
+            data = json.loads(inp)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            before = set(rr.get_orphan_nodes())
+            dt = DominatorTree(rr)
+
+            # Every edge but the one already deleted.
+            remaining = data["edges"][1:]
+            data["edges"] = remaining
+            report = dt.edge_impact_report()
+            self.assertEqual(len(remaining), len(report))
+            for row in report:
+                edge = {"from": row["from"], "to": row["to"]}
+                expected = orphans(data, edge) - before
+                self.assertEqual(expected, set(dt.orphans_if_edge_deleted(
+                    edge["from"], edge["to"])))
+                self.assertEqual(len(expected), row["orphaned"])
+
+            # Delete a node by dropping all of its edges.
+            for node in data["nodes"][1:]:
+                v = node["id"]
+                data["edges"] = [e for e in remaining if v not in
+                                 (e["from"], e["to"])]
+                expected = orphans(data) - (before | {v})
+                self.assertEqual(expected,
+                                 set(dt.orphans_if_node_deleted(v)))
@@ -0,0 +1,111 @@
+import json
+import random
+import unittest
+from root_reachability import RootReachability
+from dynamic_reachability import DynamicReachability
+import numpy.testing as np_tst
+
+
+def brute_force(dr):
+    """Recompute the orphan nodes of a DynamicReachability from scratch."""
+    edges = [{"from": u, "to": w} for u in dr.out for w, count in
+             dr.out[u].items() for _ in range(count)]
+    data = {"nodes": [{"id": v} for v in dr.vertices], "edges": edges,
+            "root": dr.root}
+    rr = RootReachability(input_from_user=False, json_input=json.dumps(data))
+    return rr.get_orphan_nodes()
+
+
+class testDynamicReachability(unittest.TestCase):
+    def test_simple(self):
+        dr = DynamicReachability(["M00", "M01", "M02"],
+                                 [("M01", "M02"), ("M00", "M02"),
+                                  ("M01", "M00")], "M00")
+        np_tst.assert_array_equal(["M02"], dr.get_orphan_nodes())
+        dr.add_edge("M02", "M01")
+        np_tst.assert_array_equal([], dr.get_orphan_nodes())
+        dr.remove_edge("M01", "M00")
+        np_tst.assert_array_equal(["M01", "M02"], dr.get_orphan_nodes())
+        dr.add_node("M03")
+        dr.add_edge("M03", "M00")
+        dr.add_edge("M01", "M03")
+        np_tst.assert_array_equal([], dr.get_orphan_nodes())
+        dr.remove_node("M03")
+        np_tst.assert_array_equal(["M01", "M02"], dr.get_orphan_nodes())
+
+        with self.assertRaises(ValueError):
+            dr.remove_edge("M01", "M00")
+        with self.assertRaises(ValueError):
+            dr.add_edge("M01", "M04")
+        with self.assertRaises(ValueError):
+            dr.add_node("M01")
+        with self.assertRaises(ValueError):
+            dr.remove_node("M00")
+
+    def test_random_operations(self):
+        rng = random.Random(7)
+        ids = ["M{:02d}".format(i) for i in range(20)]
+        edges = [(rng.choice(ids), rng.choice(ids)) for _ in range(30)]
+        dr = DynamicReachability(ids, edges, ids[0])
+        np_tst.assert_array_equal(brute_force(dr), dr.get_orphan_nodes())
+
+        next_id = len(ids)
+        for _ in range(400):
+            vertices = list(dr.vertices)
+            op = rng.random()
+            if op < 0.45:
+                dr.add_edge(rng.choice(vertices), rng.choice(vertices))
+            elif op < 0.85:
+                present = [(u, w) for u in dr.out for w in dr.out[u]]
+                if present:
+                    dr.remove_edge(*rng.choice(present))
+            elif op < 0.93:
+                dr.add_node("M{:02d}".format(next_id))
+                next_id += 1
+            elif len(vertices) > 1:
+                dr.remove_node(rng.choice(vertices[1:]))
+            np_tst.assert_array_equal(brute_force(dr), dr.get_orphan_nodes())
+            for v, p in dr.parent.items():
+                self.assertIn(p, dr.out[v])
+                self.assertGreater(dr.depth[v], dr.depth[p])
+
+    def test_reattach(self):
+        # F hangs below A with a long chain below it, and also points to B
+        # and to the end of a longer path to the root.
+        chain = ["C{}".format(i) for i in range(1000)]
+        edges = [("A", "R"), ("B", "R"), ("E1", "R"), ("E2", "E1"),
+                 ("E3", "E2"), ("F", "A"), ("F", "E3"), ("F", "B"),
+                 (chain[0], "F")]
+        edges += [(chain[i + 1], chain[i]) for i in range(len(chain) - 1)]
+        vertices = ["R", "A", "B", "E1", "E2", "E3", "F"] + chain
+        dr = DynamicReachability(vertices, edges, "R")
+        self.assertEqual("A", dr.parent["F"])
+
+        # B reaches the root and is not below F, so F moves to it without
+        # visiting the chain.
+        dr.remove_edge("F", "A")
+        self.assertEqual("B", dr.parent["F"])
+        self.assertLess(dr.visited, 10)
+        np_tst.assert_array_equal([], dr.get_orphan_nodes())
+
+        # E3 is deeper than F but not below it.
+        dr.remove_edge("F", "B")
+        self.assertEqual("E3", dr.parent["F"])
+        np_tst.assert_array_equal(brute_force(dr), dr.get_orphan_nodes())
+        for v, p in dr.parent.items():
+            self.assertGreater(dr.depth[v], dr.depth[p])
+
+        # A cycle back into the chain isn't a way to the root.
+        dr.add_edge("F", chain[-1])
+        dr.remove_edge("F", "E3")
+        np_tst.assert_array_equal(["F"] + chain, dr.get_orphan_nodes())
+
+    def test_from_reachability(self):
+        inp = """{"nodes": [{"id": "M00"}, {"id": "M01"}, {"id": "M02"}],"edges": [{"from": "M01","to": "M02"}, {"from": "M00","to": "M02"}, {"from": "M01","to": "M00"}],"root": "M00"}
+                """
+        delete = """{"from": "M01", "to": "M02"}"""
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        dr = DynamicReachability.from_reachability(rr)
+        np_tst.assert_array_equal(rr.get_orphan_nodes(),
+                                  dr.get_orphan_nodes())
@@ -0,0 +1,39 @@
+import unittest
+from element_table import ElementTable
+from mass_calculator import MassCalculator
+import numpy as np
+import numpy.testing as np_tst
+
+
+class testElementTable(unittest.TestCase):
+    def test_lookup(self):
+        table = MassCalculator.element_table
+        self.assertEqual(118, len(table))
+        for key in ("iron", " Iron ", "IRON", "Fe", 26, "26"):
+            self.assertEqual(26, table.lookup(key), msg=key)
+        for key in ("fe", "FE", "ironn", 0, 119, True, 26.0,
+                    False, None, [26]):
+            self.assertIsNone(table.lookup(key), msg=key)
+        self.assertEqual(27, table.lookup("Co"))
+        self.assertEqual(79, table.lookup("Au"))
+        self.assertEqual(MassCalculator.atomic_weights["gold"],
+                         table.weight("gold"))
+        with self.assertRaises(ValueError):
+            table.weight("Xx")
+        self.assertEqual([6, 0, 8], list(table.lookup_many(
+            ["C", "unknown", 8])))
+        np_tst.assert_array_equal(table.weights, table.numpy_weights())
+        with self.assertRaises(ValueError):
+            ElementTable({"hydrogen": 1.00794}, ("H", "He"))
+
+    def test_mass_calculator(self):
+        components = [{"name": "Fe", "mass": 2, "units": "mol"},
+                      {"name": 6, "mass": 1, "units": "kilograms"},
+                      {"name": "Sulfur", "mass": 1, "units": "mol"}]
+        mc = MassCalculator(input_from_user=False, components=components)
+        self.assertEqual(("1143.76", "2.52"), mc.calculate_mass())
+        mass_g, _ = MassCalculator.calculate_mass_columns(
+            np.array([26, 6, 16]), [2, 1, 1], ["mol", "kilograms", "mol"])
+        self.assertEqual("1143.76", "{:.2f}".format(mass_g[0]))
+        with self.assertRaises(ValueError):
+            MassCalculator.calculate_mass_columns(np.array([0]), [1], ["mol"])
@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from root_reachability import RootReachability
+from graph_loader import load_edge_list, load_json, load_ndjson, \
+    load_snapshot
+from test.testRootReachability import random_graph
+import numpy.testing as np_tst
+
+
+class testGraphLoader(unittest.TestCase):
+    def test_json(self):
+        for seed in range(5):
+            inp, delete = random_graph(40, 60, seed)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            # A tiny window so that values straddle chunk boundaries.
+            loaded = load_json(io.StringIO(json.dumps(json.loads(inp),
+                                                      indent=4)),
+                               edge_to_delete=json.loads(delete),
+                               chunk_size=7)
+            np_tst.assert_array_equal(rr.get_orphan_nodes(),
+                                      loaded.get_orphan_nodes())
+
+        with self.assertRaises(ValueError):
+            load_json(io.StringIO('{"root": "M00", "nodes": [{"id": "M00"}'))
+
+    def test_json_malformed(self):
+        class CountingStream(io.StringIO):
+            reads = 0
+
+            def read(self, size=-1):
+                self.reads += 1
+                return super().read(size)
+
+        # A malformed first element fails without reading the rest.
+        nodes = ",".join('{{"id": "M{}"}}'.format(i) for i in range(200000))
+        stream = CountingStream('{"root": "M0", "nodes": [{"id" "M0"},' +
+                                nodes + '], "edges": []}')
+        with self.assertRaises(ValueError):
+            load_json(stream, chunk_size=1024)
+        self.assertLess(stream.reads, 5)
+
+        # A value much longer than the window is read in a few chunks.
+        long_id = "M" * 100000
+        stream = CountingStream(json.dumps(
+            {"root": long_id, "nodes": [{"id": long_id}], "edges": []}))
+        loaded = load_json(stream, chunk_size=7)
+        self.assertEqual([], loaded.get_orphan_nodes())
+        self.assertLess(stream.reads, 40)
+
+    def test_ndjson(self):
+        inp, delete = random_graph(40, 60, 0)
+        data = json.loads(inp)
+        lines = [json.dumps(e) for e in data["edges"]]
+        lines += [json.dumps(n) for n in data["nodes"]]
+        lines.append(json.dumps({"root": data["root"]}))
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        loaded = load_ndjson(io.BytesIO("\n".join(lines).encode()),
+                             edge_to_delete=json.loads(delete))
+        np_tst.assert_array_equal(rr.get_orphan_nodes(),
+                                  loaded.get_orphan_nodes())
+
+    def test_edge_list(self):
+        text = "# from\tto\nM01\tM02\nM00\tM02\nM01\tM00\nM03\n"
+        loaded = load_edge_list(io.StringIO(text), "M00",
+                                edge_to_delete={"from": "M01", "to": "M02"})
+        np_tst.assert_array_equal(["M02", "M03"], loaded.get_orphan_nodes())
+
+        with self.assertRaises(ValueError):
+            load_edge_list(io.StringIO(text), "M00",
+                           edge_to_delete={"from": "M02", "to": "M01"})
+
+    def test_undeclared_vertices(self):
+        # Edges to vertices that are not nodes are ignored, and the root
+        # doesn't have to be a node.
+        text = "\n".join([json.dumps({"from": "M01", "to": "X"}),
+                          json.dumps({"from": "M01", "to": "M00"}),
+                          json.dumps({"from": "M02", "to": "X"}),
+                          json.dumps({"id": "M01"}),
+                          json.dumps({"id": "M02"}),
+                          json.dumps({"root": "M00"})])
+        loaded = load_ndjson(io.StringIO(text))
+        np_tst.assert_array_equal(["M02"], loaded.get_orphan_nodes())
+        self.assertNotIn("X", loaded.vertex_index)
+
+        with self.assertRaises(ValueError):
+            load_ndjson(io.StringIO(json.dumps({"id": "M01"})))
+
+    def test_snapshot(self):
+        for seed in range(5):
+            inp, delete = random_graph(40, 60, seed)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "graph.bin")
+                rr.save_snapshot(path)
+                loaded = load_snapshot(path)
+                for engine in ("linear", "vectorized"):
+                    np_tst.assert_array_equal(
+                        rr.get_orphan_nodes(),
+                        loaded.get_orphan_nodes(engine=engine))
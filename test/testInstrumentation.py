@@ -0,0 +1,86 @@
+import unittest
+from instrumentation import Instrumentation
+from root_reachability import RootReachability
+from test.testRootReachability import chain_graph, random_graph
+
+
+class testInstrumentation(unittest.TestCase):
+    def test_phases(self):
+        events = []
+        instrumentation = Instrumentation(
+            hooks=[lambda kind, name, value: events.append((kind, name))])
+        inp, delete = random_graph(40, 60, 0)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete,
+                              instrumentation=instrumentation)
+        orphans = rr.get_orphan_nodes()
+        report = instrumentation.report()
+        for name in ("parse", "adjacency", "reverse_adjacency", "traversal",
+                     "collect"):
+            self.assertIn(name, report["phases"])
+            self.assertIn(("phase", name), events)
+        counters = report["counters"]
+        # Every vertex but the orphans is visited, along with the root.
+        self.assertEqual(len(rr.radj) - len(orphans),
+                         counters["vertices_visited"])
+        self.assertLessEqual(counters["edges_relaxed"], rr.radj.num_edges())
+        self.assertGreater(counters["peak_rss"], 0)
+
+        instrumentation.reset()
+        self.assertEqual({"phases": {}, "counters": {}},
+                         instrumentation.report())
+
+    def test_max_frontier(self):
+        instrumentation = Instrumentation()
+        inp, delete = chain_graph(100)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete,
+                              instrumentation=instrumentation)
+        rr.get_orphan_nodes()
+        self.assertEqual(1, instrumentation.counters["max_frontier"])
+
+    def test_engines(self):
+        inp, delete = random_graph(200, 400, 3)
+        counters = {}
+        for engine in ("linear", "vectorized", "parallel", "condensed",
+                       "dfs"):
+            instrumentation = Instrumentation()
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete,
+                                  instrumentation=instrumentation)
+            orphans = rr.get_orphan_nodes(engine=engine)
+            counters[engine] = instrumentation.counters
+            # The counters come from the traversal itself, not a second
+            # traversal recording parents.
+            self.assertIsNone(rr.parent)
+            for name in ("vertices_visited", "edges_relaxed",
+                         "max_frontier"):
+                self.assertGreater(counters[engine][name], 0)
+        visited = len(rr.radj) - len(orphans)
+        # The breadth-first engines do the same work.
+        for engine in ("linear", "vectorized", "parallel"):
+            self.assertEqual(visited, counters[engine]["vertices_visited"])
+            self.assertEqual(counters["linear"], dict(
+                counters[engine], peak_rss=counters["linear"]["peak_rss"]))
+        # The component graph is smaller, and the dfs visits every vertex
+        # but the root once.
+        self.assertLessEqual(counters["condensed"]["vertices_visited"],
+                             visited)
+        self.assertEqual(len(rr.radj) - 1,
+                         counters["dfs"]["vertices_visited"])
+
+        # Counting doesn't change the parents recorded.
+        rr.mark_reachable(track_parents=True)
+        parent, depth = rr.parent, rr.depth
+        counted = {}
+        rr.mark_reachable(track_parents=True, counters=counted)
+        self.assertEqual(parent, rr.parent)
+        self.assertEqual(depth, rr.depth)
+        self.assertEqual(max(rr.depth_histogram()), counted["max_frontier"])
+
+    def test_disabled(self):
+        inp, delete = random_graph(20, 30, 1)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        self.assertIsNone(rr.instrumentation)
+        rr.get_orphan_nodes()
@@ -1,5 +1,9 @@
+import io
+import json
 import unittest
-from mass_calculator import MassCalculator
+from mass_calculator import MassCalculator, process_ndjson
+import numpy as np
+import numpy.testing as np_tst
 
 class testMassCalculator(unittest.TestCase):
     def test_simple(self):
@@ -177,4 +181,105 @@ class testMassCalculator(unittest.TestCase):
         mc = MassCalculator(input_from_user=False, json_input=inp)
         mg, mlb = mc.calculate_mass()
         self.assertEquals("28349523125.00", mg)
-        self.assertEquals("62500000.00", mlb)
\ No newline at end of file
+        self.assertEquals("62500000.00", mlb)
+
+    def test_batch(self):
+        lists = [
+            [{"name": "carbon", "mass": 1.6, "units": "kilograms"},
+             {"name": "sulfur", "mass": 36, "units": "mol"},
+             {"name": "oxygen", "mass": 871, "units": "grams"}],
+            [{"name": "sulfur", "mass": 100, "units": "kilomoles"}],
+            [],
+            [{"name": "carbon", "mass": 10000, "units": "millipound"},
+             {"name": "carbon", "mass": 1, "units": "gigaounces"}]]
+        mass_g, mass_lb = MassCalculator.calculate_mass_batch(lists)
+        self.assertEqual(len(lists), len(mass_g))
+        for components, g, lb in zip(lists, mass_g, mass_lb):
+            mc = MassCalculator(input_from_user=False, json_input=json.dumps(
+                {"components": components}))
+            self.assertEqual(mc.calculate_mass(),
+                             ("{:.2f}".format(g), "{:.2f}".format(lb)))
+
+        mass_g, mass_lb = MassCalculator.calculate_mass_columns(
+            ["carbon", "carbon"], [1, 2], ["grams", "kilograms"])
+        np_tst.assert_array_equal([2001.0], mass_g)
+
+        with self.assertRaises(ValueError):
+            MassCalculator.calculate_mass_batch([[{"name": "carbon",
+                                                   "mass": 1}]])
+        with self.assertRaises(ValueError):
+            MassCalculator.calculate_mass_columns(["oxygene"], [1], ["mol"])
+        with self.assertRaises(ValueError):
+            MassCalculator.calculate_mass_columns(["carbon"], [1], ["litre"])
+        with self.assertRaises(ValueError):
+            MassCalculator.calculate_mass_columns(["carbon"], [1, 2],
+                                                  ["gram"])
+
+        # A bad row fails both paths with the same error.
+        for components in ([{"name": "carbon", "mass": 1, "units": "grams"},
+                            {"name": "carbon", "mass": "12",
+                             "units": "grams"}],
+                           [{"name": "carbon", "mass": 1, "units": "grams"},
+                            {"name": "carbonn", "mass": 1, "units": "g"}],
+                           [{"name": "carbon", "mass": 1,
+                             "units": "litres"}]):
+            mc = MassCalculator(input_from_user=False, components=components)
+            with self.assertRaises(Exception) as serial:
+                mc.calculate_mass()
+            with self.assertRaises(Exception) as batch:
+                MassCalculator.calculate_mass_batch([components])
+            self.assertIs(type(serial.exception), type(batch.exception))
+            self.assertEqual(str(serial.exception), str(batch.exception))
+
+        # Totals are floats even without any component.
+        for lists in ([], [[]], [[], []]):
+            mass_g, mass_lb = MassCalculator.calculate_mass_batch(lists)
+            self.assertEqual(np.float64, mass_g.dtype)
+            self.assertEqual(np.float64, mass_lb.dtype)
+            np_tst.assert_array_equal([0.0] * len(lists), mass_g)
+
+        # Columns given as numpy arrays are resolved with numpy.unique.
+        names = np.array(["carbon", "H2O", "carbon", "O"])
+        units = np.array(["grams", "mol", "Grams", "kilograms"])
+        mass_g, _ = MassCalculator.calculate_mass_columns(
+            names, np.array([1.0, 2.0, 3.0, 4.0]), units, [0, 1, 0, 1], 2)
+        np_tst.assert_array_equal(MassCalculator.calculate_mass_batch(
+            [[{"name": "carbon", "mass": 1.0, "units": "grams"},
+              {"name": "carbon", "mass": 3.0, "units": "Grams"}],
+             [{"name": "H2O", "mass": 2.0, "units": "mol"},
+              {"name": "O", "mass": 4.0, "units": "kilograms"}]])[0],
+            mass_g)
+
+    def test_unit_table(self):
+        table = MassCalculator.unit_table
+        self.assertEqual((None, 1000.0), table["kilomoles"])
+        self.assertEqual((453.59237, 0.001), table["millipounds"])
+        self.assertNotIn("ki%%lograms", table)
+        # Spellings outside the table go through the same checks.
+        self.assertNotIn("milligram\t", table)
+        self.assertEqual(table["milligram"],
+                         MassCalculator.resolve_units("milligram\t"))
+        with self.assertRaises(ValueError):
+            MassCalculator.resolve_units("ki%%lograms")
+        with self.assertRaises(ValueError):
+            MassCalculator.resolve_units("litres")
+
+    def test_ndjson(self):
+        components = [{"name": "carbon", "mass": 1.6, "units": "kilograms"},
+                      {"name": "sulfur", "mass": 36, "units": "mol"},
+                      {"name": "oxygen", "mass": 871, "units": "grams"}]
+        lines = [json.dumps({"id": "first", "components": components}), "",
+                 "not json",
+                 json.dumps({"components": [{"name": "carbon"}]}),
+                 json.dumps({"components": components, "other": 1})]
+        out = io.StringIO()
+        self.assertEqual(4, process_ndjson(io.StringIO("\n".join(lines)),
+                                           out))
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual({"id": "first", "mass_g": "3625.34",
+                          "mass_lb": "7.99"}, results[0])
+        self.assertEqual([3, 4, 5], [r["id"] for r in results[1:]])
+        self.assertTrue(all("error" in r for r in results[1:]))
+
+        mc = MassCalculator(input_from_user=False, components=components)
+        self.assertEqual(("3625.34", "7.99"), mc.calculate_mass())
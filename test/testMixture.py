@@ -0,0 +1,76 @@
+import math
+import random
+import unittest
+from unittest import mock
+from mass_calculator import MassCalculator
+from mixture import CompensatedSum, Mixture
+
+
+class testMixture(unittest.TestCase):
+    def test_compensated_sum(self):
+        s = CompensatedSum()
+        for x in (1e16, 1.0, -1e16):
+            s.add(x)
+        self.assertEqual(1.0, s.value())
+
+    def test_edits(self):
+        components = [{"name": "carbon", "mass": 1.6, "units": "kilograms"},
+                      {"name": "sulfur", "mass": 36, "units": "mol"},
+                      {"name": "oxygen", "mass": 871, "units": "grams"}]
+        mixture = Mixture(components)
+        self.assertEqual(("3625.34", "7.99"), mixture.calculate_mass())
+        self.assertAlmostEqual(1600.0, mixture.element_mass_g("C"))
+
+        key = mixture.add("carbon", 400, "grams")
+        self.assertAlmostEqual(2000.0, mixture.element_mass_g("carbon"))
+        mixture.scale(key, 2)
+        self.assertAlmostEqual(2400.0, mixture.element_mass_g("carbon"))
+        mixture.update(key, name="Fe", mass=1, units="mol")
+        self.assertAlmostEqual(55.845, mixture.element_mass_g(26))
+        self.assertAlmostEqual(1600.0, mixture.element_mass_g("carbon"))
+        mixture.remove(key)
+        self.assertEqual(("3625.34", "7.99"), mixture.calculate_mass())
+        self.assertEqual(0.0, mixture.element_mass_g("iron"))
+        self.assertEqual({"carbon", "sulfur", "oxygen"},
+                         set(mixture.element_masses_g()))
+
+        # Names are resolved once per edit, and stored codes not at all.
+        with mock.patch.object(MassCalculator, "resolve_name",
+                               wraps=MassCalculator.resolve_name) as resolve:
+            key = mixture.add("H2O", 1, "mol")
+            self.assertEqual(1, resolve.call_count)
+            self.assertAlmostEqual(871.0, mixture.element_mass_g(8))
+            self.assertAlmostEqual(18.015, mixture.element_mass_g("H2O"),
+                                   places=2)
+            self.assertEqual(1, resolve.call_count)
+        # Numbers that only hash like atomic numbers are still refused.
+        for name in (8.0, True):
+            with self.assertRaises(ValueError):
+                mixture.element_mass_g(name)
+        mixture.remove(key)
+
+        with self.assertRaises(KeyError):
+            mixture.remove(key)
+        with self.assertRaises(ValueError):
+            mixture.add("oxygene", 1, "grams")
+        with self.assertRaises(ValueError):
+            mixture.update(0, units="litres")
+        self.assertEqual(("3625.34", "7.99"), mixture.calculate_mass())
+        with self.assertRaises(ValueError):
+            Mixture([{"name": "carbon", "mass": 1}])
+
+    def test_drift(self):
+        rng = random.Random(0)
+        mixture = Mixture()
+        keys = []
+        for _ in range(20000):
+            if keys and rng.random() < 0.4:
+                mixture.remove(keys.pop(rng.randrange(len(keys))))
+            else:
+                keys.append(mixture.add("carbon", rng.uniform(0, 1e6) *
+                                        10 ** rng.randint(-6, 6), "grams"))
+        masses = [mixture.components[k][4] for k in keys]
+        self.assertEqual(math.fsum(masses), mixture.mass_g())
+        for k in keys:
+            mixture.remove(k)
+        self.assertEqual(0.0, mixture.mass_g())
@@ -0,0 +1,43 @@
+import json
+import unittest
+from root_reachability import RootReachability
+from multi_root_reachability import MultiRootReachability
+from test.testRootReachability import random_graph
+import numpy.testing as np_tst
+
+
+class testMultiRootReachability(unittest.TestCase):
+    def test_against_single_root(self):
+        for seed in range(5):
+            inp, delete = random_graph(100, 130, seed)
+            data = json.loads(inp)
+            # More than one word of roots.
+            roots = [node["id"] for node in data["nodes"][:70]]
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            mr = MultiRootReachability(rr, roots)
+            matrix = mr.reach_matrix()
+            for k, root in enumerate(roots):
+                data["root"] = root
+                single = RootReachability(input_from_user=False,
+                                          json_input=json.dumps(data),
+                                          edge_to_delete=delete)
+                expected = single.get_orphan_nodes()
+                np_tst.assert_array_equal(expected,
+                                          mr.get_orphan_nodes(root))
+                np_tst.assert_array_equal(
+                    expected, [v for v in rr.vertices if v != root and
+                               not matrix[rr.vertex_index[v], k]])
+
+    def test_simple(self):
+        inp = """{"nodes": [{"id": "M00"}, {"id": "M01"}, {"id": "M02"}, {"id": "M03"}],"edges": [{"from": "M01","to": "M00"}, {"from": "M02","to": "M01"}, {"from": "M01","to": "M02"}, {"from": "M03","to": "M03"}],"root": "M00"}
+                """
+        delete = """{"from": "M03", "to": "M03"}"""
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        mr = MultiRootReachability(rr, ["M00", "M02"])
+        np_tst.assert_array_equal(["M00", "M02"], mr.roots_reached("M01"))
+        np_tst.assert_array_equal(["M00"], mr.roots_reached("M00"))
+        np_tst.assert_array_equal(["M03"], mr.get_orphan_nodes())
+        with self.assertRaises(ValueError):
+            MultiRootReachability(rr, ["M04"])
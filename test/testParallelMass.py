@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from mass_calculator import process_ndjson
+from parallel_mass import count_lines, process_file_parallel, \
+    process_shard, read_shard, shard_file
+
+
+class testParallelMass(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.ndjson")
+        units = ["grams", "kilomoles", "pounds", "milliounce", "litres"]
+        with open(self.path, "w") as f:
+            for i in range(200):
+                components = [{"name": "carbon", "mass": i,
+                               "units": units[i % len(units)]}]
+                record = {"components": components}
+                if i % 3 == 0:
+                    record["id"] = "r{}".format(i)
+                f.write(json.dumps(record) + "\n")
+                if i % 50 == 0:
+                    f.write("\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shards(self):
+        shards = shard_file(self.path, 1000)
+        self.assertGreater(len(shards), 1)
+        self.assertEqual(0, shards[0][0])
+        self.assertEqual(os.path.getsize(self.path), shards[-1][1])
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(b"\n"[0], data[end - 1])
+
+    def test_matches_serial(self):
+        expected = io.StringIO()
+        with open(self.path) as f:
+            count = process_ndjson(f, expected)
+        expected = expected.getvalue().encode("utf-8")
+
+        out = io.BytesIO()
+        self.assertEqual(count, process_file_parallel(
+            self.path, out, workers=2, chunk_size=1000))
+        self.assertEqual(expected, out.getvalue())
+
+        # A window of one shard writes every shard before the next starts.
+        out = io.BytesIO()
+        self.assertEqual(count, process_file_parallel(
+            self.path, out, workers=2, chunk_size=1000, window=1))
+        self.assertEqual(expected, out.getvalue())
+
+        # Unordered output has the same lines, ids included.
+        for window in (1, None):
+            out = io.BytesIO()
+            self.assertEqual(count, process_file_parallel(
+                self.path, out, workers=2, chunk_size=1000, window=window,
+                ordered=False))
+            self.assertEqual(sorted(expected.splitlines()),
+                             sorted(out.getvalue().splitlines()))
+
+    def test_newlines(self):
+        # Lone carriage returns end lines in the serial path too, so the line
+        # numbers used as ids must agree.
+        with open(self.path, "rb") as f:
+            data = f.read()
+        lines = data.split(b"\n")
+        data = b"\r".join(lines[:40]) + b"\r\n" + b"\n".join(lines[40:])
+        with open(self.path, "wb") as f:
+            f.write(data + b"not json\n")
+
+        expected = io.StringIO()
+        with open(self.path, encoding="utf-8") as f:
+            count = process_ndjson(f, expected)
+        expected = expected.getvalue().encode("utf-8")
+        out = io.BytesIO()
+        self.assertEqual(count, process_file_parallel(
+            self.path, out, workers=2, chunk_size=700))
+        self.assertEqual(expected, out.getvalue())
+
+        # Counting lines agrees with processing them.
+        for start, end in shard_file(self.path, 700):
+            self.assertEqual(
+                process_shard((self.path, start, end))[3],
+                count_lines(read_shard(self.path, start, end)))
+        out = io.BytesIO()
+        self.assertEqual(count, process_file_parallel(
+            self.path, out, workers=2, chunk_size=700, ordered=False))
+        self.assertEqual(sorted(expected.splitlines()),
+                         sorted(out.getvalue().splitlines()))
@@ -0,0 +1,61 @@
+import gc
+import os
+import tempfile
+import unittest
+from graph_loader import load_snapshot
+from root_reachability import RootReachability
+from parallel_reachability import parallel_reachable_mask
+from vectorized_reachability import reachable_mask
+from test.testRootReachability import random_graph
+import numpy.testing as np_tst
+
+
+class testParallelReachability(unittest.TestCase):
+    def test_against_serial(self):
+        # Large enough for some frontiers to be split between the workers.
+        inp, delete = random_graph(20000, 60000, 3)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete, compact=True)
+        r = rr.vertex_index[rr.root]
+        serial, parallel = {}, {}
+        np_tst.assert_array_equal(reachable_mask(rr.radj, r, serial),
+                                  parallel_reachable_mask(rr.radj, r,
+                                                          workers=2,
+                                                          min_edges=0,
+                                                          counters=parallel))
+        # Vertices found by both workers are only expanded once.
+        self.assertEqual(serial, parallel)
+
+        # The workers map a snapshot of the graph, written once and removed
+        # along with the graph.
+        path = rr.radj.shared_path()
+        self.assertTrue(os.path.exists(path))
+        parallel_reachable_mask(rr.radj, r, workers=2, min_edges=0)
+        self.assertEqual(path, rr.radj.shared_path())
+        del rr
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_snapshot(self):
+        inp, delete = random_graph(20000, 60000, 4)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.csr")
+            rr.save_snapshot(path)
+            loaded = load_snapshot(path)
+            # A loaded graph is mapped from its own snapshot.
+            self.assertEqual(path, loaded.radj.shared_path())
+            r = loaded.vertex_index[loaded.root]
+            np_tst.assert_array_equal(
+                reachable_mask(loaded.radj, r),
+                parallel_reachable_mask(loaded.radj, r, workers=2,
+                                        min_edges=0))
+
+    def test_small_graph_fallback(self):
+        inp, delete = random_graph(40, 60, 1)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        np_tst.assert_array_equal(rr.get_orphan_nodes(),
+                                  rr.get_orphan_nodes(engine="parallel",
+                                                      workers=2))
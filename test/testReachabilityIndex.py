@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from root_reachability import RootReachability
+from reachability_index import ReachabilityIndex
+from test.testRootReachability import random_graph
+
+
+class testReachabilityIndex(unittest.TestCase):
+    def brute_force(self, rr, v):
+        # Vertices reached from v along the edges of the graph.
+        reached = {v}
+        queue = [v]
+        for u in queue:
+            for w in rr.adj.get(u, []):
+                if w not in reached:
+                    reached.add(w)
+                    queue.append(w)
+        return reached
+
+    def test_random(self):
+        for seed in range(5):
+            inp, delete = random_graph(50, 100, seed)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            index = ReachabilityIndex(rr)
+            self.assertGreaterEqual(index.build_seconds, 0)
+            self.assertGreater(index.nbytes(), 0)
+            for v in rr.vertices:
+                reached = self.brute_force(rr, v)
+                for w in rr.vertices:
+                    self.assertEqual(w in reached, index.reaches(v, w),
+                                     msg="{} -> {}".format(v, w))
+
+    def test_save_load(self):
+        inp, delete = random_graph(40, 90, 7)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        index = ReachabilityIndex(rr)
+        inp, delete = random_graph(40, 91, 7)
+        other = RootReachability(input_from_user=False, json_input=inp,
+                                 edge_to_delete=delete)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.idx")
+            index.save(path)
+            loaded = ReachabilityIndex(rr, path)
+            for v in rr.vertices:
+                for w in rr.vertices:
+                    self.assertEqual(index.reaches(v, w),
+                                     loaded.reaches(v, w))
+            del loaded
+            self.assertRaises(ValueError, ReachabilityIndex, other, path)
+
+    def test_unknown_vertex(self):
+        inp, delete = random_graph(10, 20, 1)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        index = ReachabilityIndex(rr)
+        self.assertRaises(ValueError, index.reaches, "missing",
+                          rr.vertices[0])
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from dominator_tree import DominatorTree
+from reachability_server import ReachabilityServer
+from root_reachability import RootReachability
+from test.testRootReachability import random_graph
+
+
+class testReachabilityServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        graphs = os.path.join(self.tmp.name, "graphs")
+        os.mkdir(graphs)
+        self.paths = []
+        for seed in range(2):
+            inp, _ = random_graph(40, 60, seed)
+            path = os.path.join(graphs, "graph{}.json".format(seed))
+            with open(path, "w") as f:
+                f.write(inp)
+            self.paths.append(path)
+        self.server = ReachabilityServer(self.paths[0], [graphs])
+        await self.server.start(
+            socket_path=os.path.join(self.tmp.name, "server.sock"))
+        self.reader, self.writer = await asyncio.open_unix_connection(
+            os.path.join(self.tmp.name, "server.sock"))
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.server.close()
+        self.assertEqual({}, self.server.clients)
+        self.tmp.cleanup()
+
+    async def request(self, **kwargs):
+        self.writer.write(json.dumps(kwargs).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def test_queries(self):
+        with open(self.paths[0]) as f:
+            rr = RootReachability(input_from_user=False, json_input=f.read())
+        dominators = DominatorTree(rr)
+
+        response = await self.request(op="orphans", id=1)
+        self.assertTrue(response["ok"])
+        self.assertEqual(1, response["id"])
+        self.assertEqual(1, response["version"])
+        self.assertGreaterEqual(response["latency_ms"], 0)
+        self.assertEqual(sorted(rr.get_orphan_nodes()),
+                         sorted(response["result"]))
+
+        for _from, targets in rr.adj.items():
+            for _to in targets:
+                response = await self.request(op="delete_edge", **{
+                    "from": _from, "to": _to})
+                self.assertEqual(
+                    sorted(dominators.orphans_if_edge_deleted(_from, _to)),
+                    sorted(response["result"]))
+
+        response = await self.request(op="path", node=rr.root)
+        self.assertEqual([rr.root], response["result"])
+        response = await self.request(op="delete_node", node="missing")
+        self.assertFalse(response["ok"])
+        response = await self.request(op="unknown")
+        self.assertFalse(response["ok"])
+
+    async def test_reload(self):
+        response = await self.request(op="reload", path=self.paths[1])
+        self.assertTrue(response["ok"])
+        self.assertEqual(2, response["version"])
+        response = await self.request(op="stats")
+        self.assertEqual(self.paths[1], response["result"]["path"])
+        self.assertEqual(2, response["version"])
+
+        # Only the original file and the reload directory are allowed.
+        outside = os.path.join(self.tmp.name, "outside.json")
+        with open(outside, "w") as f:
+            f.write("{\"secret\": 1}")
+        for path in (outside, os.path.join(self.paths[0], "..", "..",
+                                           "outside.json"), 5, ["a"]):
+            response = await self.request(op="reload", path=path)
+            self.assertFalse(response["ok"])
+            self.assertEqual(2, response["version"])
+        response = await self.request(op="reload", path=self.paths[0])
+        self.assertEqual(3, response["version"])
+
+        # Load errors don't quote the file.
+        with open(self.paths[1], "w") as f:
+            f.write("{\"secret\": 1}")
+        response = await self.request(op="reload", path=self.paths[1])
+        self.assertFalse(response["ok"])
+        self.assertNotIn("secret", response["error"])
+        self.assertEqual(3, response["version"])
+
+    async def test_bad_requests(self):
+        for line in (b"[1, 2]", b"not json", b"\"text\"", b"{\"op\": 5}",
+                     b"{\"op\": \"path\", \"node\": [1]}"):
+            self.writer.write(line + b"\n")
+            await self.writer.drain()
+            response = json.loads(await self.reader.readline())
+            self.assertFalse(response["ok"])
+        # The connection is still served.
+        response = await self.request(op="stats", id="x")
+        self.assertTrue(response["ok"])
+        self.assertEqual("x", response["id"])
+
+    async def test_close(self):
+        # Clients still connected are disconnected.
+        await self.request(op="stats")
+        await self.server.close()
+        self.assertEqual(b"", await self.reader.readline())
+
+    async def test_paths_precomputed(self):
+        rr = self.server.state.reachability
+        self.assertIsNotNone(rr.parent)
+        with unittest.mock.patch.object(rr, "mark_reachable") as mark:
+            for node in rr.radj.ids:
+                response = await self.request(op="path", node=node)
+                self.assertTrue(response["ok"])
+            mark.assert_not_called()
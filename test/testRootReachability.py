@@ -1,7 +1,36 @@
+import io
+import json
+import random
 import unittest
+from unittest import mock
 from root_reachability import RootReachability
 import numpy.testing as np_tst
 
+
+def random_graph(n_vertices, n_edges, seed):
+    """Build a random graph as a JSON string along with one of its edges."""
+    rng = random.Random(seed)
+    ids = ["M{:03d}".format(i) for i in range(n_vertices)]
+    edges = [{"from": rng.choice(ids), "to": rng.choice(ids)} for _ in
+             range(n_edges)]
+    data = {"nodes": [{"id": v} for v in ids], "edges": edges,
+            "root": ids[0]}
+    return json.dumps(data), json.dumps(edges[0])
+
+
+def chain_graph(length):
+    """Build a chain M<length> -> ... -> M1 -> M0 as a JSON string."""
+    ids = ["M{}".format(i) for i in range(length)]
+    edges = [{"from": ids[i + 1], "to": ids[i]} for i in range(length - 1)]
+    # A dangling vertex so that there is an edge to delete.
+    edges.append({"from": "X", "to": ids[-1]})
+    # List the far end first, so that the first search walks the whole chain.
+    nodes = [ids[-1]] + ids[:-1] + ["X"]
+    data = {"nodes": [{"id": v} for v in nodes],
+            "edges": edges, "root": ids[0]}
+    return json.dumps(data), json.dumps(edges[-1])
+
+
 class testRootReachability(unittest.TestCase):
     def test_simple(self):
         inp = """{"nodes": [{"id": "M00"}, {"id": "M01"}, {"id": "M02"}],"edges": [{"from": "M01","to": "M02"}, {"from": "M00","to": "M02"}, {"from": "M01","to": "M00"}],"root": "M00"}
@@ -192,4 +221,148 @@ class testRootReachability(unittest.TestCase):
         delete = """{"from": "M04", "to": "M02"}"""
         rr = RootReachability(input_from_user=False, json_input=inp,
                               edge_to_delete=delete)
-        np_tst.assert_array_equal(['M04', 'M11', 'M09'], rr.get_orphan_nodes())
\ No newline at end of file
+        np_tst.assert_array_equal(['M04', 'M11', 'M09'], rr.get_orphan_nodes())
+
+    def test_engines_agree(self):
+        for seed in range(20):
+            inp, delete = random_graph(40, 60, seed)
+            linear = RootReachability(input_from_user=False, json_input=inp,
+                                      edge_to_delete=delete)
+            dfs = RootReachability(input_from_user=False, json_input=inp,
+                                   edge_to_delete=delete)
+            np_tst.assert_array_equal(dfs.get_orphan_nodes(engine="dfs"),
+                                      linear.get_orphan_nodes())
+            np_tst.assert_array_equal(
+                linear.get_orphan_nodes(),
+                linear.get_orphan_nodes(engine="vectorized"))
+            np_tst.assert_array_equal(
+                linear.get_orphan_nodes(),
+                linear.get_orphan_nodes(engine="condensed"))
+
+    def test_unknown_engine(self):
+        inp, delete = random_graph(5, 5, 0)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        with self.assertRaises(ValueError):
+            rr.get_orphan_nodes(engine="bogus")
+
+    def test_long_chain(self):
+        inp, delete = chain_graph(200000)
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        np_tst.assert_array_equal(["X"], rr.get_orphan_nodes())
+
+        # The first dfs walks the whole chain, well past the recursion limit,
+        # and settles every vertex on it.
+        rr = RootReachability(input_from_user=False, json_input=inp,
+                              edge_to_delete=delete)
+        np_tst.assert_array_equal(["X"], rr.get_orphan_nodes(engine="dfs"))
+
+    def test_dfs_settles_once(self):
+        class CountingDict(dict):
+            calls = 0
+
+            def get(self, key, default=None):
+                self.calls += 1
+                return super().get(key, default)
+
+        # Every x_i reaches the root through y_i, and also points to a long
+        # chain that cannot reach it. The x_i are searched first.
+        k = 4000
+        xs = ["x{}".format(i) for i in range(k)]
+        ys = ["y{}".format(i) for i in range(k)]
+        chain = ["c{}".format(i) for i in range(k)]
+        edges = [(chain[i], chain[i + 1]) for i in range(k - 1)]
+        for x, y in zip(xs, ys):
+            edges += [(x, y), (x, chain[0]), (y, "R")]
+        data = {"nodes": [{"id": v} for v in xs + ys + chain + ["R"]],
+                "edges": [{"from": u, "to": w} for u, w in edges],
+                "root": "R"}
+        rr = RootReachability(input_from_user=False,
+                              json_input=json.dumps(data))
+        rr.adj = CountingDict(rr.adj)
+        np_tst.assert_array_equal(chain, rr.get_orphan_nodes(engine="dfs"))
+        # Every vertex is entered at most once.
+        self.assertLessEqual(rr.adj.calls, len(data["nodes"]))
+
+    def test_compact(self):
+        for seed in range(5):
+            inp, delete = random_graph(40, 60, seed)
+            full = RootReachability(input_from_user=False, json_input=inp,
+                                    edge_to_delete=delete)
+            compact = RootReachability(input_from_user=False,
+                                       json_input=inp, edge_to_delete=delete,
+                                       compact=True)
+            self.assertEqual({}, compact.data)
+            self.assertEqual({}, compact.adj)
+            np_tst.assert_array_equal(full.get_orphan_nodes(),
+                                      compact.get_orphan_nodes())
+            with self.assertRaises(ValueError):
+                compact.get_orphan_nodes(engine="dfs")
+
+        # The document is parsed one node and edge at a time, never whole.
+        with mock.patch("json.loads", side_effect=AssertionError):
+            compact = RootReachability(input_from_user=False,
+                                       json_input=inp, compact=True)
+        full = RootReachability(input_from_user=False, json_input=inp)
+        np_tst.assert_array_equal(full.get_orphan_nodes(),
+                                  compact.get_orphan_nodes())
+        with self.assertRaises(ValueError):
+            RootReachability(input_from_user=False, json_input=inp,
+                             edge_to_delete='{"from": "M00", "to": "X"}',
+                             compact=True)
+        with self.assertRaises(TypeError):
+            RootReachability(input_from_user=False, json_input=inp,
+                             edge_to_delete='["M00"]', compact=True)
+        with self.assertRaises(ValueError):
+            RootReachability(input_from_user=False, json_input="[1, 2]",
+                             compact=True)
+
+    def test_path_to_root(self):
+        for seed in range(5):
+            inp, delete = random_graph(40, 60, seed)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            orphans = rr.get_orphan_nodes()
+            # Parents are only recorded once a path is asked for.
+            self.assertIsNone(rr.parent)
+            self.assertEqual([rr.root], rr.path_to_root(rr.root))
+            histogram = [0]
+            for v in rr.vertices:
+                path = rr.path_to_root(v)
+                distance = rr.distance_to_root(v)
+                if v in orphans:
+                    self.assertEqual([], path)
+                    self.assertEqual(-1, distance)
+                    continue
+                self.assertEqual(v, path[0])
+                self.assertEqual(rr.root, path[-1])
+                self.assertEqual(distance, len(path) - 1)
+                for _from, _to in zip(path, path[1:]):
+                    self.assertIn(_to, rr.adj[_from])
+                while len(histogram) <= distance:
+                    histogram.append(0)
+                histogram[distance] += 1
+            histogram[0] = 1
+            self.assertEqual(histogram, rr.depth_histogram())
+        with self.assertRaises(ValueError):
+            rr.path_to_root("missing")
+
+    def test_iter_orphan_nodes(self):
+        for seed in range(5):
+            inp, delete = random_graph(40, 60, seed)
+            rr = RootReachability(input_from_user=False, json_input=inp,
+                                  edge_to_delete=delete)
+            orphans = rr.get_orphan_nodes()
+            self.assertEqual(orphans, list(rr.iter_orphan_nodes()))
+            chunks = list(rr.iter_orphan_nodes(chunk_size=3))
+            self.assertTrue(all(0 < len(c) <= 3 for c in chunks))
+            self.assertEqual(orphans, [v for c in chunks for v in c])
+            self.assertEqual(bool(orphans), rr.has_orphans())
+            self.assertEqual(orphans[:2], rr.first_orphan_nodes(2))
+            stream = io.StringIO()
+            self.assertEqual(len(orphans),
+                             rr.write_orphan_nodes(stream, chunk_size=4))
+            self.assertEqual(orphans, stream.getvalue().split())
+        with self.assertRaises(ValueError):
+            list(rr.iter_orphan_nodes(engine="dfs"))
@@ -0,0 +1,94 @@
+from instrumentation import add_counters
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def check_numpy():
+    """
+    Function to check that numpy is available.
+
+    Raises
+    ------
+    ImportError
+        If numpy is not installed.
+    """
+
+    if np is None:
+        raise ImportError("numpy is required for the vectorized engine.")
+
+
+def expand_frontier(offsets, targets, frontier):
+    """
+    Function to gather the targets of every vertex in a frontier at once.
+
+    Parameters
+    ----------
+    offsets : numpy.ndarray
+        Offsets array of a compressed sparse row graph.
+    targets : numpy.ndarray
+        Targets array of a compressed sparse row graph.
+    frontier : numpy.ndarray
+        Positions of the vertices to expand.
+
+    Returns
+    -------
+    neighbors : numpy.ndarray
+        Concatenated targets of the frontier, possibly with repetitions.
+    """
+
+    starts = offsets[frontier]
+    lengths = offsets[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return targets[:0]
+    # Position j of the output belongs to frontier vertex k and reads
+    # targets[starts[k] + j - first[k]], where first[k] is the exclusive
+    # prefix sum of the lengths.
+    first = np.cumsum(lengths) - lengths
+    idx = np.repeat(starts - first, lengths) + np.arange(total)
+    return targets[idx]
+
+
+def reachable_mask(graph, root, counters=None):
+    """
+    Function to mark the vertices reachable from a root with a
+    level-synchronous breadth-first search. Every level is expanded with
+    array operations, without a loop over vertices.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+        Graph to traverse. Pass the reverse graph to find the vertices that
+        can reach the root.
+    root : int
+        Position of the vertex to start from.
+    counters : dict, default=None
+        Dictionary to add the traversal counters to, as in add_counters.
+
+    Returns
+    -------
+    mask : numpy.ndarray
+        Boolean array indexed by vertex position. True if the vertex is
+        reachable from the root.
+    """
+
+    check_numpy()
+    offsets, targets = graph.numpy_arrays()
+    mask = np.zeros(len(graph), dtype=bool)
+    mask[root] = True
+    frontier = np.array([root], dtype=np.int64)
+    visited = relaxed = widest = 0
+    while frontier.size:
+        visited += frontier.size
+        widest = max(widest, frontier.size)
+        neighbors = expand_frontier(offsets, targets, frontier)
+        relaxed += neighbors.size
+        neighbors = neighbors[~mask[neighbors]]
+        mask[neighbors] = True
+        frontier = np.unique(neighbors)
+    if counters is not None:
+        add_counters(counters, visited, relaxed, widest)
+    return mask